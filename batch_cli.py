@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+batch_cli.py — Μαζική εκτέλεση Βημάτων 1–7 για πολλά σχολεία
+------------------------------------------------------------
+Παίρνει φακέλους ή globs με ρόστερ (.xlsx/.csv), τρέχει το Pipeline ανά σχολείο
+σε process pool με φραγμένο πλήθος workers και γράφει:
+  - <output-dir>/<όνομα>_<hash8>.scen/  (scenario store: ρόστερ + στήλες int8, βλ. scenario_store)
+  - <output-dir>/<όνομα>_<hash8>.xlsx   (αποτελέσματα ανά σχολείο· παραλείπεται με --no-excel)
+  - <output-dir>/manifest.json / manifest.csv  (χρόνοι, σκορ, status)
+
+Το manifest ενημερώνεται μετά από ΚΑΘΕ σχολείο. Σε επανεκκίνηση παραλείπονται
+όσα έχουν status "ok" με ίδιο περιεχόμενο (SHA-256) και ίδιες ρυθμίσεις.
+
+Χρήση:
+python batch_cli.py rosters/ "2026/**/*.xlsx" --output-dir out --workers 4
+"""
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from pipeline_engine import Pipeline, PipelineConfig, read_roster, write_results_excel
+from scenario_store import save_scenario_set
+
+INPUT_SUFFIXES = (".xlsx", ".csv")
+MANIFEST_JSON = "manifest.json"
+MANIFEST_CSV = "manifest.csv"
+
+# ------------------------ Είσοδοι ------------------------
+
+def discover_inputs(patterns: List[str]) -> List[Path]:
+    """Φάκελοι → όλα τα .xlsx/.csv (αναδρομικά). Αλλιώς glob (υποστηρίζει **)."""
+    found = set()
+    for pat in patterns:
+        p = Path(pat)
+        if p.is_dir():
+            for suffix in INPUT_SUFFIXES:
+                found.update(p.rglob(f"*{suffix}"))
+        else:
+            found.update(Path(x) for x in glob.glob(pat, recursive=True))
+    # Αγνόησε προσωρινά αρχεία του Excel (~$...)
+    return sorted(f.resolve() for f in found
+                  if f.is_file() and f.suffix.lower() in INPUT_SUFFIXES and not f.name.startswith("~$"))
+
+def file_sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# ------------------------ Manifest ------------------------
+
+def load_manifest(out_dir: Path) -> Dict[str, Dict[str, Any]]:
+    path = out_dir / MANIFEST_JSON
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {e["input"]: e for e in json.load(f)}
+
+def save_manifest(out_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Ατομική εγγραφή (tmp + replace) ώστε ένα crash να μην αφήνει μισό manifest."""
+    entries = sorted(manifest.values(), key=lambda e: e["input"])
+    tmp = out_dir / (MANIFEST_JSON + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, out_dir / MANIFEST_JSON)
+
+    flat = [{k: (json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v) for k, v in e.items()}
+            for e in entries]
+    tmp = out_dir / (MANIFEST_CSV + ".tmp")
+    pd.DataFrame(flat, dtype=object).to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, out_dir / MANIFEST_CSV)
+
+def is_done(entry: Optional[Dict[str, Any]], sha: str, config: Dict[str, Any], excel: bool = True) -> bool:
+    """Ολοκληρωμένο = ίδιο hash/config, υπάρχει η έξοδος και, αν ζητείται Excel, δεν ήταν εκτέλεση --no-excel."""
+    return (entry is not None and entry.get("status") == "ok" and entry.get("sha256") == sha
+            and entry.get("config") == config and Path(entry.get("output", "")).exists()
+            and (not excel or entry.get("output") != entry.get("store")))
+
+# ------------------------ Worker ------------------------
+
+def run_one(input_path: str, output_path: str, sha: str, config: Dict[str, Any],
+            store_path: Optional[str] = None) -> Dict[str, Any]:
+    """Εκτελείται σε ξεχωριστή διεργασία. Δεν πετά ποτέ εξαίρεση — επιστρέφει εγγραφή manifest.
+       Πρώτα γράφεται το (φθηνό) scenario store· το Excel μόνο αν output_path != store_path."""
+    entry: Dict[str, Any] = {"input": input_path, "sha256": sha, "output": output_path,
+                             "store": store_path, "config": config}
+    t0 = time.perf_counter()
+    try:
+        df = read_roster(input_path)
+        result = Pipeline(PipelineConfig(**config)).run(df)
+        if store_path:
+            save_scenario_set(result.to_scenario_set(), store_path)
+        if output_path != store_path:
+            write_results_excel(result, output_path)
+        best = next((s for s in result.scores if s["scenario_col"] == result.best), None)
+        entry.update(
+            status="ok",
+            students=len(df),
+            num_classes=result.num_classes,
+            scenarios=len(result.final),
+            best=result.best,
+            total_score=best["total_score"] if best else None,
+            broken_friendships=best["broken_friendships"] if best else None,
+            timings={k: round(v, 3) for k, v in result.timings.items()},
+            error=None,
+        )
+    except Exception as e:
+        entry.update(status="error", error=f"{type(e).__name__}: {e}")
+    entry["seconds"] = round(time.perf_counter() - t0, 3)
+    entry["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return entry
+
+# ------------------------ Batch ------------------------
+
+def run_batch(patterns: List[str], out_dir: str, config: Optional[PipelineConfig] = None,
+              workers: Optional[int] = None, force: bool = False, excel: bool = True,
+              log=print) -> Dict[str, Dict[str, Any]]:
+    out = Path(out_dir).resolve()   # απόλυτες διαδρομές στο manifest → resume από οποιονδήποτε cwd
+    out.mkdir(parents=True, exist_ok=True)
+    cfg = asdict(config or PipelineConfig())
+    manifest = load_manifest(out)
+
+    todo = []
+    for path in discover_inputs(patterns):
+        sha = file_sha256(path)
+        key = str(path)
+        if not force and is_done(manifest.get(key), sha, cfg, excel):
+            log(f"⏭  {path.name}: ήδη ολοκληρωμένο")
+            continue
+        store_path = str(out / f"{path.stem}_{sha[:8]}.scen")
+        todo.append((key, str(out / f"{path.stem}_{sha[:8]}.xlsx") if excel else store_path, sha, store_path))
+
+    if not todo:
+        log("Τίποτα προς εκτέλεση.")
+        return manifest
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    log(f"▶  {len(todo)} σχολεία, {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, key, out_path, sha, cfg, store_path): key
+                   for key, out_path, sha, store_path in todo}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            entry = fut.result()
+            manifest[entry["input"]] = entry
+            save_manifest(out, manifest)
+            mark = "✅" if entry["status"] == "ok" else "❌"
+            detail = f"score={entry.get('total_score')}" if entry["status"] == "ok" else entry["error"]
+            log(f"{mark} [{done}/{len(todo)}] {Path(entry['input']).name} ({entry['seconds']}s) {detail}")
+    return manifest
+
+# ------------------------------- CLI ----------------------------------------
+
+def _cli():
+    import argparse
+    parser = argparse.ArgumentParser(description="Μαζική εκτέλεση Βημάτων 1–7 (ένα ρόστερ ανά σχολείο).")
+    parser.add_argument("inputs", nargs="+", help="Φάκελοι ή globs με .xlsx/.csv")
+    parser.add_argument("--output-dir", required=True, help="Φάκελος αποτελεσμάτων & manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Μέγιστες παράλληλες διεργασίες (default: CPUs)")
+    parser.add_argument("--classes", type=int, default=None, help="Πλήθος τμημάτων (default: ⌈n/25⌉, τουλάχιστον 2)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--step4-max-nodes", type=int, default=50000)
+    parser.add_argument("--max-scenarios", type=int, default=5)
+    parser.add_argument("--force", action="store_true", help="Επανεκτέλεση και των ολοκληρωμένων")
+    parser.add_argument("--no-excel", action="store_true", help="Μόνο scenario store (χωρίς .xlsx)")
+    args = parser.parse_args()
+
+    cfg = PipelineConfig(num_classes=args.classes, seed=args.seed,
+                         step4_max_nodes=args.step4_max_nodes, max_scenarios=args.max_scenarios)
+    manifest = run_batch(args.inputs, args.output_dir, cfg, workers=args.workers, force=args.force,
+                         excel=not args.no_excel)
+    inputs = {str(p) for p in discover_inputs(args.inputs)}
+    failed = [e for k, e in manifest.items() if k in inputs and e.get("status") != "ok"]
+    if failed:
+        raise SystemExit(f"{len(failed)} σχολεία απέτυχαν — βλ. {Path(args.output_dir) / MANIFEST_JSON}")
+
+if __name__ == "__main__":
+    _cli()
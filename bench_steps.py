@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+bench_steps.py — Benchmark των Βημάτων 1–7 με συνθετικά ρόστερ
+--------------------------------------------------------------
+  - make_synthetic_roster: seeded ρόστερ με ελεγχόμενο πλήθος μαθητών, ποσοστό
+    παιδιών εκπαιδευτικών, Ζ/Ι, πυκνότητα φιλιών και συγκρούσεων.
+  - bench_chain: χρονομετρεί κάθε συνάρτηση βήματος σε ΜΙΑ αλυσίδα (έξοδος
+    βήματος k → είσοδος βήματος k+1), με τις ίδιες κλήσεις που κάνει το Pipeline.
+  - run_sweep: σάρωση μεγεθών × επαναλήψεις → JSON (min/median ανά βήμα)·
+    κάθε αλυσίδα σε δική της διεργασία με timeout (το Βήμα 2 κλιμακώνεται εκθετικά).
+  - compare_reports: λόγος χρόνων έναντι baseline JSON (regression check).
+
+Χρήση:
+python bench_steps.py --sizes 15 20 25 30 --repeat 3 --output bench.json
+python bench_steps.py --compare bench_baseline.json --timeout 60
+"""
+from __future__ import annotations
+import json
+import math
+import multiprocessing
+import platform
+import queue as queue_module
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from friends_parser import parse_friends_column
+from pipeline_engine import MAX_PER_CLASS, _decode, _encode
+from roster_normalize import normalize_roster
+from step_1_paidia_ekp_FIXED import step1_assign_teacher_children
+from step_2_zoiroi_idiaterotites_FIXED_v3_PATCHED import step2_apply_FIXED_v3
+from step3_amivaia_filia_FIXED import apply_step3_on_sheet
+from step4_filikoi_omades_beltiosi_FIXED import apply_step4_strict
+from step_5_ypoloipoi_mathites_FIXED_compat import step5_filikoi_omades
+from step_6_final_check_and_fix_PATCHED import apply_step6
+from step_7_final_score_FIXED_PATCHED import score_one_scenario
+
+BENCH_VERSION = 1
+DEFAULT_SIZES = (15, 20, 25, 30)
+DEFAULT_TIMEOUT = 120.0
+STEP_FUNCTIONS = {
+    "step1": "step1_assign_teacher_children",
+    "step2": "step2_apply_FIXED_v3",
+    "step3": "apply_step3_on_sheet",
+    "step4": "apply_step4_strict",
+    "step5": "step5_filikoi_omades",
+    "step6": "apply_step6",
+    "step7": "score_one_scenario",
+}
+
+# ------------------------ Συνθετικό ρόστερ ------------------------
+
+def make_synthetic_roster(n: int, seed: int = 0, teacher_share: float = 0.08, zi_share: float = 0.12,
+                          friend_density: float = 1.5, mutual_share: float = 0.6,
+                          conflict_density: float = 0.1, girls_share: float = 0.5,
+                          greek_share: float = 0.75) -> pd.DataFrame:
+    """Ρόστερ n μαθητών (ίδιο seed → ίδιο ρόστερ).
+       friend_density: μέσο πλήθος δηλωμένων φίλων ανά μαθητή· mutual_share: ποσοστό αμοιβαίων.
+       conflict_density: μέσο πλήθος συγκρούσεων ανά μαθητή (πάντα συμμετρικές).
+       zi_share: πιθανότητα για ΖΩΗΡΟΣ και (ανεξάρτητα) για ΙΔΙΑΙΤΕΡΟΤΗΤΑ.
+    """
+    rng = random.Random(seed)
+    names = [f"Μαθητής_{i:04d}" for i in range(n)]
+    friends: Dict[str, set] = {nm: set() for nm in names}
+    conflicts: Dict[str, set] = {nm: set() for nm in names}
+
+    # Κάθε «δεσμός» μετρά 1 δήλωση· οι αμοιβαίοι 2 → πλήθος δεσμών για τη ζητούμενη πυκνότητα
+    ties = int(round(n * friend_density / (1 + mutual_share))) if n > 1 else 0
+    for _ in range(ties):
+        a, b = rng.sample(names, 2)
+        friends[a].add(b)
+        if rng.random() < mutual_share:
+            friends[b].add(a)
+    for _ in range(int(round(n * conflict_density / 2)) if n > 1 else 0):
+        a, b = rng.sample(names, 2)
+        conflicts[a].add(b)
+        conflicts[b].add(a)
+
+    teachers = set(rng.sample(names, int(round(n * teacher_share))))
+    flag = lambda p: "Ν" if rng.random() < p else "Ο"
+    return pd.DataFrame({
+        "ΟΝΟΜΑ": names,
+        "ΦΥΛΟ": ["Κ" if rng.random() < girls_share else "Α" for _ in names],
+        "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ": ["Ν" if nm in teachers else "Ο" for nm in names],
+        "ΖΩΗΡΟΣ": [flag(zi_share) for _ in names],
+        "ΙΔΙΑΙΤΕΡΟΤΗΤΑ": [flag(zi_share) for _ in names],
+        "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ": [flag(greek_share) for _ in names],
+        "ΦΙΛΟΙ": [", ".join(sorted(friends[nm])) for nm in names],
+        "ΣΥΓΚΡΟΥΣΗ": [", ".join(sorted(conflicts[nm])) for nm in names],
+    })
+
+# ------------------------ Αλυσίδα βημάτων ------------------------
+
+def _timed(timings: Dict[str, float], step: str, fn: Callable, *args, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timings[step] = time.perf_counter() - t0
+
+def bench_chain(df: pd.DataFrame, num_classes: Optional[int] = None, seed: int = 42,
+                step2_max_results: int = 5, step4_max_results: int = 3,
+                step4_max_nodes: int = 50000) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """Ένα σενάριο από το Βήμα 1 ως το 7 → ({βήμα: δευτερόλεπτα}, {βήμα: σφάλμα}).
+       Αν ένα βήμα αποτύχει, το επόμενο παίρνει την ανάθεση του προηγούμενου (όπως το Pipeline)."""
+    roster = normalize_roster(df).reset_index(drop=True)
+    work = roster.assign(ΦΙΛΟΙ=[list(fs) for fs in parse_friends_column(roster["ΦΙΛΟΙ"])])
+    n = len(roster)
+    num_classes = num_classes or max(2, math.ceil(n / MAX_PER_CLASS))
+    labels = [f"Α{i + 1}" for i in range(num_classes)]
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    assigned = np.full(n, None, dtype=object)
+
+    def column(values) -> np.ndarray:
+        # Όπως το Pipeline: κενά → NaN (μέσω int8 κωδικών)
+        return _decode(_encode(list(values), labels), labels)
+
+    def attempt(step: str, fn: Callable, *args, **kwargs):
+        try:
+            return _timed(timings, step, fn, *args, **kwargs)
+        except Exception as e:
+            errors[step] = f"{type(e).__name__}: {e}"
+            return None
+
+    out = attempt("step1", step1_assign_teacher_children, roster, classes=labels,
+                  max_scenarios=1, random_seed=seed)
+    if out is not None and "ΒΗΜΑ1_ΣΕΝΑΡΙΟ_1" in out.columns:
+        assigned = column(out["ΒΗΜΑ1_ΣΕΝΑΡΙΟ_1"])
+
+    options = attempt("step2", step2_apply_FIXED_v3, work.assign(ΒΗΜΑ1_ΣΕΝΑΡΙΟ_1=assigned),
+                      num_classes=num_classes, step1_col_name="ΒΗΜΑ1_ΣΕΝΑΡΙΟ_1",
+                      seed=seed, max_results=step2_max_results)
+    if options:
+        assigned = column(options[0][1]["ΒΗΜΑ2_ΣΕΝΑΡΙΟ_1"])
+
+    res3 = attempt("step3", apply_step3_on_sheet, work.assign(ΒΗΜΑ2_ΣΕΝΑΡΙΟ_1=assigned),
+                   "ΒΗΜΑ2_ΣΕΝΑΡΙΟ_1", num_classes=num_classes)
+    if res3 is not None:
+        assigned = column(res3[0]["ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1"])
+
+    step_marks = np.full(n, np.nan)
+    groups = np.full(n, None, dtype=object)
+    placements = attempt("step4", apply_step4_strict, work.assign(ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1=assigned),
+                         assigned_column="ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1", num_classes=num_classes,
+                         max_results=step4_max_results, max_nodes=step4_max_nodes)
+    if placements:
+        assigned = assigned.copy()
+        row_of = {nm: i for i, nm in enumerate(roster["ΟΝΟΜΑ"])}
+        for g, (members, cls) in enumerate(placements[0][0].items()):
+            for student in members:
+                i = row_of[student]
+                assigned[i], step_marks[i], groups[i] = cls, 4, f"G{g}"
+
+    col5 = "ΒΗΜΑ5_ΣΕΝΑΡΙΟ_1"
+    random.seed(seed)
+    res5 = attempt("step5", step5_filikoi_omades, work.assign(**{col5: assigned}), col5, num_classes)
+    if res5 is not None:
+        after = column(res5[0][col5])
+        step_marks[pd.isna(assigned) & pd.notna(after)] = 5
+        assigned = after
+
+    frame6 = work.assign(**{col5: assigned, "ID": np.arange(n), "ΒΗΜΑ_ΤΟΠΟΘΕΤΗΣΗΣ": step_marks,
+                            "GROUP_ID": groups})
+    res6 = attempt("step6", apply_step6, frame6, class_col=col5, id_col="ID")
+    if res6 is not None:
+        assigned = column(res6["df"]["ΒΗΜΑ6_ΤΜΗΜΑ"])
+
+    attempt("step7", score_one_scenario, work.assign(ΣΕΝΑΡΙΟ_1=assigned), "ΣΕΝΑΡΙΟ_1",
+            num_classes=num_classes)
+    return timings, errors
+
+# ------------------------ Σάρωση & αναφορά ------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _chain_worker(queue, df: pd.DataFrame, chain_params: Dict[str, Any]) -> None:
+    queue.put(bench_chain(df, **chain_params))
+
+def _run_isolated(df: pd.DataFrame, chain_params: Dict[str, Any],
+                  timeout: float) -> Optional[Tuple[Dict[str, float], Dict[str, str]]]:
+    """bench_chain σε ξεχωριστή διεργασία· None αν ξεπεράσει το timeout (η διεργασία τερματίζεται)."""
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_chain_worker, args=(queue, df, chain_params), daemon=True)
+    proc.start()
+    try:
+        return queue.get(timeout=timeout)
+    except queue_module.Empty:
+        return None
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+
+def run_sweep(sizes=DEFAULT_SIZES, repeat: int = 3, seed: int = 0,
+              roster_params: Optional[Dict[str, Any]] = None, chain_params: Optional[Dict[str, Any]] = None,
+              timeout: Optional[float] = DEFAULT_TIMEOUT,
+              log: Optional[Callable[[str], None]] = print) -> Dict[str, Any]:
+    """Για κάθε μέγεθος: ίδιο seeded ρόστερ, `repeat` επαναλήψεις της αλυσίδας.
+       timeout (δευτ. ανά αλυσίδα): κάθε επανάληψη τρέχει σε δική της διεργασία· με την πρώτη
+       υπέρβαση το μέγεθος σημειώνεται "timeout" και τα μεγαλύτερα μεγέθη παραλείπονται."""
+    roster_params = dict(roster_params or {})
+    chain_params = dict(chain_params or {})
+    results = []
+    timed_out = None
+    for n in sizes:
+        if timed_out is not None:
+            results.append({"n": int(n), "step": None, "skipped": f"timeout στο n={timed_out}"})
+            if log:
+                log(f"n={n:<6} παραλείπεται (timeout στο n={timed_out})")
+            continue
+        df = make_synthetic_roster(n, seed=seed, **roster_params)
+        runs: Dict[str, List[float]] = {step: [] for step in STEP_FUNCTIONS}
+        errors: Dict[str, str] = {}
+        for _ in range(repeat):
+            out = bench_chain(df, **chain_params) if timeout is None else _run_isolated(df, chain_params, timeout)
+            if out is None:
+                timed_out = n
+                break
+            timings, errs = out
+            for step, sec in timings.items():
+                runs[step].append(sec)
+            errors.update(errs)
+        for step, secs in runs.items():
+            row = {"n": int(n), "step": step, "function": STEP_FUNCTIONS[step],
+                   "seconds": [round(s, 6) for s in secs],
+                   "min": round(min(secs), 6) if secs else None,
+                   "median": round(statistics.median(secs), 6) if secs else None}
+            if step in errors:
+                row["error"] = errors[step]
+            if timed_out == n:
+                row["timeout"] = timeout
+            results.append(row)
+            if log:
+                shown = f"{row['median'] * 1e3:9.1f} ms" if secs else "        —   "
+                log(f"n={n:<6} {step:<6} {shown}" + (f"  ⚠️ {errors[step]}" if step in errors else "")
+                    + (f"  ⏱️ timeout {timeout}s" if timed_out == n else ""))
+    return {
+        "version": BENCH_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "pandas": pd.__version__,
+                        "numpy": np.__version__, "platform": platform.platform(), "commit": _git_commit()},
+        "params": {"sizes": [int(n) for n in sizes], "repeat": repeat, "seed": seed, "timeout": timeout,
+                   "roster": roster_params, "chain": chain_params},
+        "results": results,
+    }
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 1.25) -> List[Dict[str, Any]]:
+    """Λόγος median τρέχοντος/baseline ανά (n, βήμα)· regression όταν λόγος > threshold."""
+    base = {(r["n"], r["step"]): r for r in baseline.get("results", []) if r.get("step")}
+    rows = []
+    for r in current.get("results", []):
+        b = base.get((r["n"], r.get("step")))
+        if not b or not b.get("median") or r.get("median") is None:
+            continue
+        ratio = r["median"] / b["median"]
+        rows.append({"n": r["n"], "step": r["step"], "baseline": b["median"], "current": r["median"],
+                     "ratio": round(ratio, 3), "regression": ratio > threshold})
+    return rows
+
+# ------------------------------- CLI ----------------------------------------
+
+def _cli():
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark Βημάτων 1–7 με συνθετικά ρόστερ.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Πλήθη μαθητών")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0, help="Seed ρόστερ")
+    parser.add_argument("--classes", type=int, default=None, help="Πλήθος τμημάτων (default: ⌈n/25⌉)")
+    parser.add_argument("--teacher-share", type=float, default=0.08)
+    parser.add_argument("--zi-share", type=float, default=0.12)
+    parser.add_argument("--friend-density", type=float, default=1.5)
+    parser.add_argument("--conflict-density", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Όριο δευτ. ανά αλυσίδα (0 = χωρίς όριο, στην ίδια διεργασία)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="Baseline JSON για σύγκριση")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Λόγος χρόνου που θεωρείται regression")
+    args = parser.parse_args()
+
+    report = run_sweep(
+        sizes=args.sizes, repeat=args.repeat, seed=args.seed,
+        roster_params={"teacher_share": args.teacher_share, "zi_share": args.zi_share,
+                       "friend_density": args.friend_density, "conflict_density": args.conflict_density},
+        chain_params={"num_classes": args.classes},
+        timeout=args.timeout or None,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Γράφτηκε: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            rows = compare_reports(report, json.load(f), threshold=args.threshold)
+        for r in rows:
+            mark = "❌" if r["regression"] else "  "
+            print(f"{mark} n={r['n']:<6} {r['step']:<6} ×{r['ratio']:.2f}  "
+                  f"({r['baseline'] * 1e3:.1f} → {r['current'] * 1e3:.1f} ms)")
+        if any(r["regression"] for r in rows):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+friends_parser.py — Ενιαίος, ασφαλής parser για κελιά ΦΙΛΟΙ / ΣΥΓΚΡΟΥΣΗ
+----------------------------------------------------------------------
+Δέχεται λίστα ή string («Α, Β», «Α|Β», «['Α', 'Β']» …) και επιστρέφει ονόματα
+χωρίς κενά. ast.literal_eval (ποτέ eval) δοκιμάζεται ΜΟΝΟ όταν το κελί
+ξεκινά με «[»· αλλιώς απευθείας split στους διαχωριστές (SAFE_SEP).
+
+Κάθε μοναδικό string αναλύεται μία φορά (lru_cache) και το αποτέλεσμα είναι
+κοινόχρηστο tuple με interned ονόματα· το parse_friends_column αναλύει μόνο
+τις μοναδικές τιμές μιας στήλης, άρα το κόστος πληρώνεται μία φορά ανά ρόστερ.
+
+Χρήση (ενδεικτικά):
+-------------------
+from friends_parser import parse_friends_cell, parse_friends_column
+
+parse_friends_cell("Μαρία, Γιώργος")          # ['Μαρία', 'Γιώργος']
+friends = parse_friends_column(df["ΦΙΛΟΙ"])    # ένα tuple ανά γραμμή
+"""
+from __future__ import annotations
+import ast
+import re
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import pandas as pd
+
+SAFE_SEP = re.compile(r"[,\|\;/·\n]+")
+PARSE_CACHE_SIZE = 65536
+
+def _names(items: Iterable) -> Tuple[str, ...]:
+    return tuple(sys.intern(t) for t in (str(x).strip() for x in items) if t)
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_cell_text(s: str) -> Tuple[str, ...]:
+    """Ανάλυση ενός string κελιού (cached ανά μοναδική τιμή)."""
+    s = s.strip()
+    if not s or s.lower() == "nan":
+        return ()
+    if s.startswith("["):
+        try:
+            v = ast.literal_eval(s)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            v = None
+        if isinstance(v, list):
+            return _names(v)
+    return _names(p for p in SAFE_SEP.split(s) if p.strip().lower() != "nan")
+
+def parse_friends(x) -> Tuple[str, ...]:
+    """Οποιοδήποτε κελί (λίστα/tuple, string, NaN/None) → tuple ονομάτων."""
+    if isinstance(x, (list, tuple)):
+        return _names(x)
+    if x is None or (not isinstance(x, str) and pd.isna(x)):
+        return ()
+    return parse_cell_text(str(x))
+
+def parse_friends_cell(x) -> List[str]:
+    """Όπως parse_friends, αλλά νέα λίστα (ασφαλής για τροποποίηση από τον caller)."""
+    return list(parse_friends(x))
+
+def parse_friends_column(values) -> List[Tuple[str, ...]]:
+    """Στήλη/iterable → ένα tuple ανά γραμμή. Αναλύονται μόνο οι μοναδικές τιμές."""
+    s = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        parsed = [parse_friends(c) for c in s.cat.categories] + [()]
+        return [parsed[k] for k in s.cat.codes]
+    try:
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    except TypeError:   # λίστες μέσα στη στήλη (μη hashable)
+        return [parse_friends(x) for x in s]
+    parsed = [parse_friends(u) for u in uniques] + [()]
+    return [parsed[k] for k in codes]
@@ -16,30 +16,13 @@ friendship_filters_fixed.py
 - Το όρισμα 'names' μπορεί να είναι η λίστα μαθητών που θες να ελέγξεις (π.χ. μόνο παιδιά εκπαιδευτικών).
 """
 
-import re, ast
-import pandas as pd
+import re
+
+from friends_parser import parse_friends_cell
 
 # ---------- Parsing ΦΙΛΟΙ με ασφάλεια ----------
 
-def parse_friends_cell(x):
-    """Επιστρέφει λίστα ονομάτων από κελί 'ΦΙΛΟΙ' με ασφάλεια (χωρίς substring pitfalls)."""
-    if isinstance(x, list):
-        return [str(s).strip() for s in x if str(s).strip()]
-    if pd.isna(x):
-        return []
-    s = str(x).strip()
-    if not s:
-        return []
-    # 1) Προσπάθησε να το ερμηνεύσεις ως Python list (π.χ. "['Α', 'Β']")
-    try:
-        v = ast.literal_eval(s)
-        if isinstance(v, list):
-            return [str(t).strip() for t in v if str(t).strip()]
-    except Exception:
-        pass
-    # 2) Αλλιώς χώρισε με ασφαλές regex σε οριοθέτες
-    parts = re.split(r"[,\|\;/·\n]+", s)
-    return [p.strip() for p in parts if p.strip() and p.strip().lower() != "nan"]
+# Ενιαίος cached parser: βλ. friends_parser.py
 
 # ---------- Ανίχνευση αμοιβαίας φιλίας ----------
 
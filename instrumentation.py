@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+instrumentation.py — Ελαφριά μέτρηση χρόνων (spans) και μετρητών ανά εκτέλεση
+----------------------------------------------------------------------------
+Ο τρέχων Profiler ζει σε ContextVar: τα βήματα καλούν απλώς count()/span()
+χωρίς να περνά τίποτα στις υπογραφές τους. Εκτός profiling() οι κλήσεις
+είναι no-op (ένα ContextVar.get()).
+
+Ονόματα μετρητών: «<βήμα>.<τι>», π.χ. step4.nodes, step4.prune.pop_diff,
+step6.candidates_evaluated, step2.df_copies.
+
+Χρήση (ενδεικτικά):
+-------------------
+from instrumentation import profiling, span, count
+
+with profiling() as prof:
+    with span("step4"):
+        count("step4.nodes")
+report = prof.report()   # {"wall_seconds", "spans": {...}, "counters": {...}}
+"""
+from __future__ import annotations
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+_CURRENT: ContextVar[Optional["Profiler"]] = ContextVar("profiler", default=None)
+
+class Profiler:
+    """Συσσωρεύει χρόνους spans (ανά όνομα, με ιεραρχία «γονέας/παιδί») και μετρητές."""
+
+    def __init__(self):
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._stack: list = []
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        path = "/".join([*self._stack, name])
+        self._stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            entry = self.spans.setdefault(path, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += time.perf_counter() - t0
+            entry["calls"] += 1
+
+    def count(self, name: str, k: int = 1) -> None:
+        self.counters[name] += k
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "wall_seconds": round(time.perf_counter() - self._t0, 6),
+            "spans": {p: {"seconds": round(v["seconds"], 6), "calls": int(v["calls"])}
+                      for p, v in self.spans.items()},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+@contextmanager
+def profiling(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """Ενεργοποιεί έναν Profiler (νέο ή δοσμένο) για τον τρέχοντα κώδικα/thread."""
+    prof = profiler if profiler is not None else Profiler()
+    token = _CURRENT.set(prof)
+    try:
+        yield prof
+    finally:
+        _CURRENT.reset(token)
+
+def current_profiler() -> Optional[Profiler]:
+    return _CURRENT.get()
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    prof = _CURRENT.get()
+    if prof is None:
+        yield
+        return
+    with prof.span(name):
+        yield
+
+def count(name: str, k: int = 1) -> None:
+    prof = _CURRENT.get()
+    if prof is not None:
+        prof.counters[name] += k
+
+def report_frame(report: Dict[str, Any]):
+    """(spans, counters) ως DataFrames για εμφάνιση (UI/Excel)."""
+    import pandas as pd
+    spans = pd.DataFrame([{"span": p, **v} for p, v in report.get("spans", {}).items()],
+                         columns=["span", "seconds", "calls"])
+    counters = pd.DataFrame(list(report.get("counters", {}).items()), columns=["counter", "value"])
+    return spans, counters
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+job_runner.py — Εκτέλεση του Pipeline στο παρασκήνιο (για το Streamlit UI)
+-------------------------------------------------------------------------
+Τοπικό process pool + πίνακας εργασιών στον δίσκο (JOB_DIR ή ιδιωτικός φάκελος χρήστη,
+βλ. private_dirs — τα input/result γίνονται unpickle):
+  <root>/<job_id>/job.json       status: queued → running → done | failed | cancelled
+  <root>/<job_id>/input.pkl      ρόστερ εισόδου
+  <root>/<job_id>/events.jsonl   progress events (μία γραμμή JSON ανά event)
+  <root>/<job_id>/result.pkl     PipelineResult (μόνο σε "done")
+
+Ο worker γράφει ο ίδιος status/events, άρα κάθε session (ή νέα διεργασία μετά
+από restart) βλέπει την κατάσταση μόνο με το job_id. Ο runner είναι singleton
+ανά διεργασία: πολλοί χρήστες μπαίνουν στην ίδια ουρά χωρίς να μπλοκάρει κανείς.
+
+Χρήση (ενδεικτικά):
+-------------------
+from job_runner import get_job_runner
+
+job_id = get_job_runner().submit(df, PipelineConfig(num_classes=2))
+events, offset = get_job_runner().events(job_id, offset)
+result = get_job_runner().result(job_id)      # PipelineResult ή None
+"""
+from __future__ import annotations
+import json
+import os
+import pickle
+import re
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from pipeline_engine import Pipeline, PipelineConfig, PipelineResult
+from private_dirs import default_private_dir, ensure_private_dir
+from stage_cache import get_stage_cache
+
+DEFAULT_WORKERS = 2
+ACTIVE = ("queued", "running")
+_JOB_ID_RE = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+JOB_FILE = "job.json"
+INPUT_FILE = "input.pkl"
+EVENTS_FILE = "events.jsonl"
+RESULT_FILE = "result.pkl"
+
+# ------------------------ Πίνακας εργασιών (δίσκος) ------------------------
+
+def _default_root() -> Path:
+    return default_private_dir("pipeline_jobs", "JOB_DIR")
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+def _read_job(job_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(job_dir / JOB_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_job(job_dir: Path, job: Dict[str, Any]) -> None:
+    """Ατομική εγγραφή (tmp + replace): οι αναγνώστες δεν βλέπουν ποτέ μισό JSON."""
+    tmp = job_dir / (JOB_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, job_dir / JOB_FILE)
+
+def _update_job(job_dir: Path, **fields) -> Dict[str, Any]:
+    job = _read_job(job_dir) or {}
+    job.update(fields)
+    _write_job(job_dir, job)
+    return job
+
+def _append_event(job_dir: Path, event: Dict[str, Any]) -> None:
+    # Μία write() ανά γραμμή σε append mode → οι αναγνώστες βλέπουν ολόκληρες γραμμές
+    with open(job_dir / EVENTS_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True   # υπάρχει, απλώς χωρίς δικαίωμα
+    return True
+
+# ------------------------ Worker ------------------------
+
+def run_job(job_dir: str) -> str:
+    """Εκτελείται στη διεργασία-worker. Δεν σηκώνει ποτέ exception· επιστρέφει το τελικό status."""
+    job_dir = Path(job_dir)
+    job = _read_job(job_dir) or {}
+    if job.get("status") == "cancelled":
+        return "cancelled"
+    _update_job(job_dir, status="running", started=_now(), worker_pid=os.getpid())
+    t0 = time.perf_counter()
+
+    def on_progress(stage: str, fraction: float, message: str) -> None:
+        _append_event(job_dir, {"t": round(time.perf_counter() - t0, 3), "stage": stage,
+                                "fraction": round(fraction, 4), "message": message})
+
+    try:
+        ensure_private_dir(job_dir.parent)
+        df = pd.read_pickle(job_dir / INPUT_FILE)
+        config = PipelineConfig(**job.get("config", {}))
+        result = Pipeline(config, progress=on_progress, cache=get_stage_cache()).run(df)
+        tmp = job_dir / (RESULT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, job_dir / RESULT_FILE)
+        best = result.scores[0] if result.scores else {}
+        _update_job(job_dir, status="done", finished=_now(), seconds=round(time.perf_counter() - t0, 3),
+                    best=result.best, best_total_score=best.get("total_score"), scenarios=len(result.final))
+        _append_event(job_dir, {"t": round(time.perf_counter() - t0, 3), "stage": "done",
+                                "fraction": 1.0, "message": f"καλύτερο: {result.best}"})
+        return "done"
+    except Exception as e:
+        _update_job(job_dir, status="failed", finished=_now(), seconds=round(time.perf_counter() - t0, 3),
+                    error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+        _append_event(job_dir, {"t": round(time.perf_counter() - t0, 3), "stage": "failed",
+                                "fraction": 1.0, "message": str(e)})
+        return "failed"
+
+# ------------------------ Runner ------------------------
+
+class JobRunner:
+    """Ουρά εργασιών πάνω σε ProcessPoolExecutor με φραγμένο πλήθος workers."""
+
+    def __init__(self, root: Optional[str] = None, workers: int = DEFAULT_WORKERS):
+        # PermissionError αν ο φάκελος δεν είναι ιδιωτικός: χωρίς δίσκο δεν υπάρχουν εργασίες
+        self.root = ensure_private_dir(Path(root) if root else _default_root())
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._recover()
+
+    def submit(self, df: pd.DataFrame, config: Optional[PipelineConfig] = None, label: str = "") -> str:
+        job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        job_dir = self.root / job_id
+        job_dir.mkdir(mode=0o700)
+        df.to_pickle(job_dir / INPUT_FILE)
+        (job_dir / EVENTS_FILE).touch()
+        _write_job(job_dir, {"job_id": job_id, "label": label, "status": "queued", "created": _now(),
+                             "config": asdict(config or PipelineConfig()), "rows": int(len(df)),
+                             "owner_pid": os.getpid()})
+        self._futures[job_id] = self._get_pool().submit(run_job, str(job_dir))
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return _read_job(self._dir(job_id)) if _JOB_ID_RE.match(job_id or "") else None
+
+    def events(self, job_id: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Νέα events από byte offset → (events, νέο offset). Μισή τελευταία γραμμή μένει για την επόμενη κλήση."""
+        if not _JOB_ID_RE.match(job_id or ""):
+            return [], offset
+        try:
+            with open(self._dir(job_id) / EVENTS_FILE, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        events = [json.loads(line) for line in data[:end].decode("utf-8").splitlines() if line.strip()]
+        return events, offset + end
+
+    def result(self, job_id: str) -> Optional[PipelineResult]:
+        job = self.status(job_id)
+        if not job or job.get("status") != "done":
+            return None
+        ensure_private_dir(self.root)
+        with open(self._dir(job_id) / RESULT_FILE, "rb") as f:
+            return pickle.load(f)
+
+    def list_jobs(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        jobs = [j for j in (_read_job(d) for d in self.root.iterdir() if d.is_dir()) if j]
+        jobs.sort(key=lambda j: j.get("created", ""), reverse=True)
+        return jobs[:limit] if limit else jobs
+
+    def cancel(self, job_id: str) -> bool:
+        """Ακυρώνει μόνο εργασίες στην ουρά· μια εργασία που τρέχει ολοκληρώνεται κανονικά."""
+        job = self.status(job_id)
+        if not job or job.get("status") != "queued":
+            return False
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        _update_job(self._dir(job_id), status="cancelled", finished=_now())
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    # ---- εσωτερικά ----
+
+    def _dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _recover(self) -> None:
+        """Εργασίες queued/running διεργασίας που δεν υπάρχει πια → failed (διακόπηκαν)."""
+        for job in self.list_jobs():
+            if job.get("status") not in ACTIVE:
+                continue
+            if _pid_alive(job.get("worker_pid") if job["status"] == "running" else job.get("owner_pid")):
+                continue
+            _update_job(self.root / job["job_id"], status="failed", finished=_now(),
+                        error="Η εργασία διακόπηκε (restart της εφαρμογής)")
+
+_DEFAULT_RUNNER: Optional[JobRunner] = None
+
+def get_job_runner() -> JobRunner:
+    global _DEFAULT_RUNNER
+    if _DEFAULT_RUNNER is None:
+        _DEFAULT_RUNNER = JobRunner(workers=int(os.environ.get("JOB_WORKERS", DEFAULT_WORKERS)))
+    return _DEFAULT_RUNNER
@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+pipeline_engine.py — Headless εκτέλεση Βημάτων 1–7 σε ένα πέρασμα
+-----------------------------------------------------------------
+Τρέχει όλη την αλυσίδα χωρίς UI, με ενιαίο «ρόστερ» και συμπαγείς πίνακες
+ανάθεσης ανά σενάριο (int8 κωδικοί + κοινός πίνακας ετικετών τμημάτων).
+Τα DataFrames που ζητούν τα υπάρχοντα modules φτιάχνονται μόνο τη στιγμή της
+κλήσης (ρόστερ + μία στήλη) και δεν κρατιούνται ανάμεσα στα βήματα.
+
+Χρήση (ενδεικτικά):
+-------------------
+from pipeline_engine import Pipeline, PipelineConfig
+
+result = Pipeline(PipelineConfig(num_classes=2, seed=42)).run(df)
+print(result.best, result.scores[0]["total_score"])
+final_results = result.to_app_results()   # ίδια μορφή με run_steps_5_6_7 του streamlit_app
+
+CLI:
+python pipeline_engine.py --input roster.xlsx --output results.xlsx --classes 2
+"""
+from __future__ import annotations
+import hashlib
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from step_1_paidia_ekp_FIXED import step1_assign_teacher_children
+from friends_parser import parse_friends_column
+from step_2_zoiroi_idiaterotites_FIXED_v3_PATCHED import step2_apply_FIXED_v3
+from step3_amivaia_filia_FIXED import apply_step3_on_sheet
+from step4_filikoi_omades_beltiosi_FIXED import apply_step4_relaxed, apply_step4_strict
+from step_5_ypoloipoi_mathites_FIXED_compat import step5_filikoi_omades
+from step_6_final_check_and_fix_PATCHED import apply_step6
+from step_7_final_score_FIXED_PATCHED import pick_best_scenario
+from stage_cache import StageCache, frame_fingerprint
+from instrumentation import count, profiling, span
+from roster_normalize import normalize_roster
+from scenario_store import ScenarioSet
+
+STAGES = ("step1", "step2", "step3", "step4", "step5", "step6", "step7")
+MAX_PER_CLASS = 25
+
+_ROW_ID = "__ROW_ID__"
+_STEP_COL = "ΒΗΜΑ_ΤΟΠΟΘΕΤΗΣΗΣ"
+_GROUP_COL = "GROUP_ID"
+_STEP6_AUDIT = ("ΒΗΜΑ6_ΚΙΝΗΣΗ", "ΑΙΤΙΑ_ΑΛΛΑΓΗΣ", "ΠΗΓΗ_ΒΗΜΑ")
+
+# Ποιες ρυθμίσεις επηρεάζουν την έξοδο κάθε σταδίου (για το κλειδί της StageCache)
+STAGE_PARAMS = {
+    "step1": ("step1_max_scenarios", "seed"),
+    "step2": ("step2_max_results", "step2_keep", "seed"),
+    "step3": (),
+    "step4": ("step4_max_results", "step4_max_nodes", "step4_keep", "step4_engine", "step4_relax"),
+    "step5": ("seed", "step5_method"),
+    "step6": ("step6_max_iter",),
+}
+
+# ------------------------ Ρυθμίσεις & τύποι αποτελεσμάτων ------------------------
+
+@dataclass
+class PipelineConfig:
+    """Παράμετροι εκτέλεσης. Τα *_keep ορίζουν το fan-out: πόσα σενάρια κρατάμε ανά γονικό σενάριο."""
+    num_classes: Optional[int] = None      # None → max(2, ⌈n/25⌉)
+    seed: int = 42
+    step1_max_scenarios: int = 5
+    step2_max_results: int = 5
+    step2_keep: int = 1
+    step4_max_results: int = 3
+    step4_max_nodes: int = 50000
+    step4_keep: int = 1
+    step4_engine: str = "auto"             # auto | batch | dp | dfs (βλ. step4_filikoi_omades_beltiosi_FIXED)
+    step4_relax: bool = True               # χαλάρωση ορίων κατά RELAX_LADDER αν τα αυστηρά δεν δίνουν λύση
+    step5_method: str = "bulk"             # bulk | sequential (βλ. step_5_ypoloipoi_mathites_FIXED_compat)
+    step6_max_iter: int = 5
+    max_scenarios: int = 5                 # ανώτατο πλήθος σεναρίων που περνούν από βήμα σε βήμα
+
+    def resolve_num_classes(self, n_students: int) -> int:
+        if self.num_classes is not None:
+            return int(self.num_classes)
+        return max(2, math.ceil(n_students / MAX_PER_CLASS))
+
+@dataclass
+class ScenarioState:
+    """Ένα σενάριο σε κάποιο στάδιο: κωδικοί τμήματος ανά μαθητή (−1 = ατοποθέτητος)."""
+    sid: int
+    codes: np.ndarray                                   # int8, μήκος n
+    parent: Optional[int] = None                        # sid του σεναρίου του προηγούμενου βήματος
+    history: Dict[str, np.ndarray] = field(default_factory=dict)  # στάδιο → κωδικοί
+    placement_step: Optional[np.ndarray] = None         # int8: 4/5 για Βήματα 4/5, 0 αλλιώς
+    group_ids: Optional[np.ndarray] = None              # int32: δείκτης ομάδας Βήματος 4, −1 αλλιώς
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    audit: Dict[str, pd.Categorical] = field(default_factory=dict)  # στήλες ελέγχου Βήματος 6 (κωδικοί + κατηγορίες)
+
+    @property
+    def name(self) -> str:
+        return f"ΣΕΝΑΡΙΟ_{self.sid}"
+
+@dataclass
+class StageResult:
+    stage: str
+    scenarios: List[ScenarioState]
+    seconds: float
+    errors: List[Tuple[str, str]] = field(default_factory=list)   # (σενάριο, μήνυμα)
+
+@dataclass
+class PipelineResult:
+    roster: pd.DataFrame                     # κανονικοποιημένο ρόστερ (χωρίς στήλες σεναρίων)
+    labels: List[str]                        # κοινός πίνακας ετικετών: κωδικός k → labels[k]
+    num_classes: int
+    stages: Dict[str, StageResult]
+    scores: List[Dict[str, Any]]             # Step 7, ταξινομημένα με την ιεραρχία του pick_best_scenario
+    best: Optional[str]
+    profile: Dict[str, Any] = field(default_factory=dict)   # instrumentation: spans + μετρητές της εκτέλεσης
+
+    @property
+    def final(self) -> List[ScenarioState]:
+        return self.stages["step6"].scenarios if "step6" in self.stages else []
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return {k: v.seconds for k, v in self.stages.items()}
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return _decode(codes, self.labels)
+
+    def categorical(self, codes: np.ndarray) -> pd.Categorical:
+        """Αποκωδικοποίηση χωρίς αντιγραφή ετικετών: οι κωδικοί μένουν int8, −1 → NaN."""
+        return pd.Categorical.from_codes(codes, categories=self.labels)
+
+    def _change_column(self, before: np.ndarray, after: np.ndarray) -> pd.Categorical:
+        # «STAY» ή «Α1→Α2»: κείμενο μόνο για τα μοναδικά ζεύγη (κωδ. L−1 = χωρίς τμήμα → "nan")
+        L = len(self.labels) + 1
+        b = np.where(before >= 0, before, L - 1).astype(np.int64)
+        a = np.where(after >= 0, after, L - 1).astype(np.int64)
+        codes, pairs = pd.factorize(np.where(b == a, -1, b * L + a))
+        names = list(self.labels) + ["nan"]
+        return pd.Categorical.from_codes(codes, categories=[
+            "STAY" if p < 0 else f"{names[p // L]}→{names[p % L]}" for p in pairs])
+
+    def scenario_frame(self, scenario: ScenarioState) -> pd.DataFrame:
+        """DataFrame ενός τελικού σεναρίου: ρόστερ + στήλες ΒΗΜΑ1..ΒΗΜΑ6 + στήλες ελέγχου Βήματος 6.
+           Εδώ (και μόνο εδώ) οι κωδικοί γίνονται ετικέτες — ως Categorical."""
+        df = self.roster.copy()
+        k = scenario.sid
+        cols: Dict[str, Any] = {}
+        for step in range(1, 6):
+            codes = scenario.history.get(f"step{step}")
+            if codes is not None:
+                cols[f"ΒΗΜΑ{step}_ΣΕΝΑΡΙΟ_{k}"] = self.categorical(codes)
+        if scenario.placement_step is not None:
+            cols[_STEP_COL] = np.where(scenario.placement_step > 0, scenario.placement_step, np.nan)
+        if scenario.group_ids is not None:
+            cols[_GROUP_COL] = np.array([f"G{g}" if g >= 0 else None for g in scenario.group_ids], dtype=object)
+        before = scenario.history["step5"]
+        cols["ΤΜΗΜΑ_ΠΡΙΝ_ΒΗΜΑ6"] = self.categorical(before)
+        for c, v in scenario.audit.items():
+            cols[c] = v
+        cols["ΤΜΗΜΑ_ΜΕΤΑ_ΒΗΜΑ6"] = self.categorical(scenario.codes)
+        cols["ΜΕΤΑΒΟΛΗ_ΤΜΗΜΑΤΟΣ"] = self._change_column(before, scenario.codes)
+        cols["ΒΗΜΑ6_ΤΜΗΜΑ"] = self.categorical(scenario.codes)
+        return df.assign(**cols)
+
+    def to_scenario_set(self) -> ScenarioSet:
+        """Checkpoint: ρόστερ μία φορά + μία στήλη int8 ανά σενάριο και βήμα ("ΣΕΝΑΡΙΟ_k/stepN")."""
+        ss = ScenarioSet(roster=self.roster, labels=list(self.labels),
+                         meta={"num_classes": self.num_classes, "best": self.best, "scores": self.scores,
+                               "timings": self.timings})
+        for sc in self.final:
+            for stage in STAGES:
+                if stage in sc.history:
+                    ss.add(f"{sc.name}/{stage}", sc.history[stage])
+        return ss
+
+    def to_app_results(self) -> Dict[str, Dict[str, Any]]:
+        """Μορφή συμβατή με το final_results του streamlit_app (display/download)."""
+        by_name = {s["scenario_col"]: s for s in self.scores}
+        out = {}
+        for sc in self.final:
+            out[sc.name] = {
+                "df": self.scenario_frame(sc),
+                "step5_penalty": sc.metrics.get("step5_penalty", 0),
+                "step6_summary": sc.metrics.get("step6_summary", {}),
+                "final_score": by_name.get(sc.name, {}),
+                "final_column": "ΒΗΜΑ6_ΤΜΗΜΑ",
+                "profile": self.profile,
+            }
+        return out
+
+# ------------------------ Κωδικοποίηση ------------------------
+
+def _encode(values, labels: List[str]) -> np.ndarray:
+    """Ετικέτες → int8 (−1 για NaN/κενό). Άγνωστες ετικέτες προστίθενται στο τέλος του labels."""
+    pos = {lab: k for k, lab in enumerate(labels)}
+    out = np.full(len(values), -1, dtype=np.int8)
+    for i, v in enumerate(values):
+        if v is None or (isinstance(v, float) and np.isnan(v)) or (isinstance(v, str) and not v.strip()):
+            continue
+        key = str(v).strip()
+        if key not in pos:
+            pos[key] = len(labels)
+            labels.append(key)
+        out[i] = pos[key]
+    return out
+
+def _decode(codes: np.ndarray, labels: List[str]) -> np.ndarray:
+    lut = np.array(list(labels) + [np.nan], dtype=object)
+    return lut[np.where(codes >= 0, codes, len(labels))]
+
+# ------------------------ Pipeline ------------------------
+
+ProgressFn = Callable[[str, float, str], None]
+
+class Pipeline:
+    """Εκτελεί Βήματα 1–7 διαδοχικά πάνω σε ένα ρόστερ.
+       progress(stage, fraction, message) καλείται (προαιρετικά) στην αρχή/τέλος κάθε σταδίου.
+    """
+
+    def __init__(self, config: Optional[PipelineConfig] = None, progress: Optional[ProgressFn] = None,
+                 cache: Optional[StageCache] = None):
+        self.config = config or PipelineConfig()
+        self.progress = progress
+        self.cache = cache
+
+    # ---- δημόσιο API ----
+
+    def run(self, df: pd.DataFrame) -> PipelineResult:
+        """Εκτέλεση υπό profiling: χρόνοι/μετρητές όλων των βημάτων στο result.profile."""
+        with profiling() as prof:
+            with span("pipeline"):
+                result = self._run(df)
+        result.profile = prof.report()
+        return result
+
+    def _run(self, df: pd.DataFrame) -> PipelineResult:
+        cfg = self.config
+        with span("prepare"):
+            roster = self._prepare_roster(df)
+            self._work = roster.assign(ΦΙΛΟΙ=[list(fs) for fs in parse_friends_column(roster["ΦΙΛΟΙ"])])
+        self._roster = roster
+        self._name_rows = self._work.groupby("ΟΝΟΜΑ", sort=False).indices
+        self._roster_key = hashlib.sha256(frame_fingerprint(roster)).hexdigest() if self.cache is not None else None
+        self.num_classes = cfg.resolve_num_classes(len(roster))
+        self.labels = [f"Α{i+1}" for i in range(self.num_classes)]
+
+        stages: Dict[str, StageResult] = {}
+        scenarios: List[ScenarioState] = []
+        for idx, stage in enumerate(STAGES[:-1]):
+            self._emit(stage, idx / len(STAGES), "έναρξη")
+            t0 = time.perf_counter()
+            errors: List[Tuple[str, str]] = []
+            with span(stage):
+                scenarios = self._run_stage(stage, scenarios, errors)
+            scenarios = scenarios[:cfg.max_scenarios]
+            for j, sc in enumerate(scenarios, start=1):
+                sc.sid = j
+                sc.history[stage] = sc.codes
+            stages[stage] = StageResult(stage, scenarios, time.perf_counter() - t0, errors)
+            if not scenarios:
+                raise RuntimeError(f"Το {stage} δεν παρήγαγε κανένα σενάριο: {errors}")
+
+        self._emit("step7", (len(STAGES) - 1) / len(STAGES), "έναρξη")
+        t0 = time.perf_counter()
+        with span("step7"):
+            scores, best = self._step7(scenarios)
+        stages["step7"] = StageResult("step7", scenarios, time.perf_counter() - t0)
+        self._emit("step7", 1.0, "ολοκληρώθηκε")
+
+        return PipelineResult(roster=roster, labels=list(self.labels), num_classes=self.num_classes,
+                              stages=stages, scores=scores, best=best)
+
+    # ---- προετοιμασία ----
+
+    @staticmethod
+    def _prepare_roster(df: pd.DataFrame) -> pd.DataFrame:
+        # Λείπουσες σημαίες → «Ο»· ΦΥΛΟ/σημαίες ως Categorical (roster_normalize)
+        roster = normalize_roster(df).reset_index(drop=True)
+        if "ΟΝΟΜΑ" not in roster.columns:
+            raise KeyError("Δεν βρέθηκε στήλη 'ΟΝΟΜΑ'.")
+        if "ΦΥΛΟ" not in roster.columns:
+            raise KeyError("Δεν βρέθηκε στήλη 'ΦΥΛΟ'.")
+        if "ΦΙΛΟΙ" not in roster.columns:
+            roster["ΦΙΛΟΙ"] = ""
+        return roster
+
+    def _emit(self, stage: str, fraction: float, message: str) -> None:
+        if self.progress is not None:
+            self.progress(stage, fraction, message)
+
+    def _run_stage(self, stage: str, scenarios: List[ScenarioState], errors: List[Tuple[str, str]]) -> List[ScenarioState]:
+        """Εκτέλεση σταδίου μέσω της StageCache (αν δόθηκε). Κλειδί: ρόστερ, ρυθμίσεις σταδίου,
+           πίνακας ετικετών και ΟΛΟΙ οι πίνακες των σεναρίων εισόδου (κωδικοί, ιστορικό, ομάδες)."""
+        fn = getattr(self, f"_{stage}")
+        if self.cache is None:
+            return fn(scenarios, errors)
+        params = {"roster": self._roster_key, "num_classes": self.num_classes, "labels": self.labels,
+                  **{name: getattr(self.config, name) for name in STAGE_PARAMS[stage]}}
+        arrays = []
+        for sc in scenarios:
+            arrays.append(sc.codes)
+            arrays.extend(sc.history[s] for s in STAGES if s in sc.history)
+            for extra in (sc.placement_step, sc.group_ids):
+                arrays.append(extra if extra is not None else np.empty(0, dtype=np.int8))
+        key = self.cache.make_key(stage, params, arrays=arrays)
+        hit = self.cache.get(key)
+        if hit is not None:
+            count(f"{stage}.cache_hits")
+            out, cached_errors, labels = hit
+            errors.extend(cached_errors)
+            self.labels = labels   # ίδιες ετικέτες εισόδου → ίδια (ίσως επεκταμένη) λίστα
+            return out
+        out = fn(scenarios, errors)
+        self.cache.put(key, (out, list(errors), list(self.labels)))
+        return out
+
+    def _frame(self, **cols) -> pd.DataFrame:
+        """Προσωρινό DataFrame για κλήση υπάρχοντος module (ρόστερ με ΦΙΛΟΙ ως λίστες + στήλες)."""
+        return self._work.assign(**cols)
+
+    def _child(self, parent: ScenarioState, codes: np.ndarray, **kwargs) -> ScenarioState:
+        return ScenarioState(sid=0, codes=codes, parent=parent.sid, history=dict(parent.history),
+                             placement_step=kwargs.pop("placement_step", parent.placement_step),
+                             group_ids=kwargs.pop("group_ids", parent.group_ids),
+                             metrics={**parent.metrics, **kwargs.pop("metrics", {})},
+                             audit=kwargs.pop("audit", parent.audit))
+
+    # ---- στάδια ----
+
+    def _step1(self, _scenarios, errors) -> List[ScenarioState]:
+        cfg = self.config
+        n = len(self._work)
+        # Το Βήμα 1 διαβάζει τα ΦΙΛΟΙ ως κείμενο → αρχικό ρόστερ
+        out = step1_assign_teacher_children(self._roster, classes=self.labels,
+                                            max_scenarios=cfg.step1_max_scenarios, random_seed=cfg.seed)
+        result = []
+        for k in range(1, cfg.step1_max_scenarios + 1):
+            col = f"ΒΗΜΑ1_ΣΕΝΑΡΙΟ_{k}"
+            if col not in out.columns:
+                break
+            codes = _encode(out[col].tolist(), self.labels)
+            if (codes >= 0).any():
+                result.append(ScenarioState(sid=k, codes=codes))
+        if not result:
+            # Χωρίς παιδιά εκπαιδευτικών (ή χωρίς έγκυρη κατανομή): ένα κενό σενάριο
+            result.append(ScenarioState(sid=1, codes=np.full(n, -1, dtype=np.int8)))
+        return result
+
+    def _step2(self, scenarios, errors) -> List[ScenarioState]:
+        cfg = self.config
+        result = []
+        for sc in scenarios:
+            col = f"ΒΗΜΑ1_ΣΕΝΑΡΙΟ_{sc.sid}"
+            try:
+                options = step2_apply_FIXED_v3(self._frame(**{col: _decode(sc.codes, self.labels)}),
+                                               num_classes=self.num_classes, step1_col_name=col,
+                                               seed=cfg.seed, max_results=cfg.step2_max_results)
+            except Exception as e:
+                errors.append((sc.name, f"{type(e).__name__}: {e}"))
+                continue
+            out_col = f"ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{sc.sid}"
+            for _, df2, metrics in options[:cfg.step2_keep]:
+                result.append(self._child(sc, _encode(df2[out_col].tolist(), self.labels),
+                                          metrics={"step2": metrics}))
+        return result
+
+    def _step3(self, scenarios, errors) -> List[ScenarioState]:
+        result = []
+        for sc in scenarios:
+            col = f"ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{sc.sid}"
+            try:
+                df3, meta = apply_step3_on_sheet(self._frame(**{col: _decode(sc.codes, self.labels)}),
+                                                 col, num_classes=self.num_classes)
+            except Exception as e:
+                errors.append((sc.name, f"{type(e).__name__}: {e}"))
+                continue
+            codes = _encode(df3[f"ΒΗΜΑ3_ΣΕΝΑΡΙΟ_{sc.sid}"].tolist(), self.labels)
+            result.append(self._child(sc, codes, metrics={"step3": meta}))
+        return result
+
+    def _step4(self, scenarios, errors) -> List[ScenarioState]:
+        cfg = self.config
+        n = len(self._work)
+        result = []
+        for sc in scenarios:
+            col = f"ΒΗΜΑ3_ΣΕΝΑΡΙΟ_{sc.sid}"
+            kwargs = dict(assigned_column=col, num_classes=self.num_classes, max_results=cfg.step4_max_results,
+                          max_nodes=cfg.step4_max_nodes, engine=cfg.step4_engine)
+            try:
+                frame = self._frame(**{col: _decode(sc.codes, self.labels)})
+                if cfg.step4_relax:
+                    out = apply_step4_relaxed(frame, **kwargs)
+                    placements, level = out["results"], out["level"]
+                else:
+                    placements, level = apply_step4_strict(frame, **kwargs), 0
+            except Exception as e:
+                errors.append((sc.name, f"{type(e).__name__}: {e}"))
+                continue
+            if not placements:
+                # Καμία πλήρως αμοιβαία ομάδα (ή καμία αποδεκτή τοποθέτηση) → pass-through
+                result.append(self._child(sc, sc.codes.copy(), placement_step=np.zeros(n, dtype=np.int8),
+                                          group_ids=np.full(n, -1, dtype=np.int32),
+                                          metrics={"step4_penalty": None, "step4_relax_level": None}))
+                continue
+            for placed, pen in placements[:cfg.step4_keep]:
+                codes = sc.codes.copy()
+                step = np.zeros(n, dtype=np.int8)
+                groups = np.full(n, -1, dtype=np.int32)
+                for g, (members, cls) in enumerate(placed.items()):
+                    code = self.labels.index(cls)
+                    for student in members:
+                        rows = self._name_rows.get(student, [])
+                        codes[rows] = code
+                        step[rows] = 4
+                        groups[rows] = g
+                result.append(self._child(sc, codes, placement_step=step, group_ids=groups,
+                                          metrics={"step4_penalty": int(pen), "step4_relax_level": level}))
+        return result
+
+    def _step5(self, scenarios, errors) -> List[ScenarioState]:
+        result = []
+        for sc in scenarios:
+            col = f"ΒΗΜΑ5_ΣΕΝΑΡΙΟ_{sc.sid}"
+            random.seed(self.config.seed)
+            try:
+                df5, pen = step5_filikoi_omades(self._frame(**{col: _decode(sc.codes, self.labels)}),
+                                                col, self.num_classes, method=self.config.step5_method)
+            except Exception as e:
+                errors.append((sc.name, f"{type(e).__name__}: {e}"))
+                continue
+            codes = _encode(df5[col].tolist(), self.labels)
+            step = sc.placement_step.copy()
+            step[(sc.codes < 0) & (codes >= 0)] = 5
+            result.append(self._child(sc, codes, placement_step=step, metrics={"step5_penalty": int(pen)}))
+        return result
+
+    def _step6(self, scenarios, errors) -> List[ScenarioState]:
+        result = []
+        for sc in scenarios:
+            col = f"ΒΗΜΑ5_ΣΕΝΑΡΙΟ_{sc.sid}"
+            frame = self._frame(**{
+                col: _decode(sc.codes, self.labels),
+                _ROW_ID: np.arange(len(sc.codes)),
+                _STEP_COL: np.where(sc.placement_step > 0, sc.placement_step, np.nan),
+                _GROUP_COL: np.array([f"G{g}" if g >= 0 else None for g in sc.group_ids], dtype=object),
+            })
+            try:
+                out = apply_step6(frame, class_col=col, id_col=_ROW_ID, step_col=_STEP_COL,
+                                  group_col=_GROUP_COL, max_iter=self.config.step6_max_iter)
+            except Exception as e:
+                # π.χ. < 2 τμήματα: το Βήμα 6 δεν εφαρμόζεται, κρατάμε το Βήμα 5
+                result.append(self._child(sc, sc.codes.copy(), metrics={
+                    "step6_summary": {"status": "SKIPPED", "error": f"{type(e).__name__}: {e}"}}))
+                continue
+            df6 = out["df"]
+            audit = {c: pd.Categorical(df6[c]) for c in _STEP6_AUDIT if c in df6.columns}
+            result.append(self._child(sc, _encode(df6["ΒΗΜΑ6_ΤΜΗΜΑ"].tolist(), self.labels),
+                                      audit=audit, metrics={"step6_summary": out["summary"]}))
+        return result
+
+    def _step7(self, scenarios) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        names = [sc.name for sc in scenarios]
+        frame = self._work.assign(**{sc.name: _decode(sc.codes, self.labels) for sc in scenarios})
+        picked = pick_best_scenario(frame, names, num_classes=self.num_classes,
+                                    k_best=len(names), random_seed=self.config.seed)
+        best = picked["best"]["scenario_col"] if picked["best"] else None
+        return picked["scores"], best
+
+# ------------------------------- Έξοδος ----------------------------------------
+
+def read_roster(path: str, sheet: Optional[str] = None) -> pd.DataFrame:
+    if str(path).lower().endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path, sheet_name=sheet or 0)
+
+def write_results_excel(result: PipelineResult, out_path: str) -> str:
+    """Ένα sheet ανά τελικό σενάριο + sheet «Σύνοψη» με τα σκορ του Βήματος 7."""
+    with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
+        for name, res in result.to_app_results().items():
+            res["df"].to_excel(writer, sheet_name=name[:31], index=False)
+        pd.DataFrame(result.scores).drop(
+            columns=["population_counts", "boys_counts", "girls_counts", "good_greek_counts"], errors="ignore"
+        ).to_excel(writer, sheet_name="Σύνοψη", index=False)
+    return out_path
+
+# ------------------------------- CLI ----------------------------------------
+
+def _cli():
+    import argparse
+    parser = argparse.ArgumentParser(description="Εκτέλεση Βημάτων 1–7 χωρίς UI.")
+    parser.add_argument("--input", required=True, help="Είσοδος Excel (.xlsx) ή CSV")
+    parser.add_argument("--output", required=True, help="Έξοδος Excel (.xlsx)")
+    parser.add_argument("--sheet", default=None, help="Όνομα φύλλου (default: πρώτο φύλλο)")
+    parser.add_argument("--classes", type=int, default=None, help="Πλήθος τμημάτων (default: ⌈n/25⌉, τουλάχιστον 2)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--step2-keep", type=int, default=1)
+    parser.add_argument("--step4-keep", type=int, default=1)
+    parser.add_argument("--step4-max-nodes", type=int, default=50000)
+    parser.add_argument("--step4-engine", choices=("auto", "batch", "dp", "dfs"), default="auto")
+    parser.add_argument("--step4-strict", action="store_true", help="Χωρίς χαλάρωση ορίων στο Βήμα 4")
+    parser.add_argument("--step5-method", choices=("bulk", "sequential"), default="bulk")
+    parser.add_argument("--max-scenarios", type=int, default=5)
+    args = parser.parse_args()
+
+    df = read_roster(args.input, sheet=args.sheet)
+
+    cfg = PipelineConfig(num_classes=args.classes, seed=args.seed, step2_keep=args.step2_keep,
+                         step4_keep=args.step4_keep, step4_max_nodes=args.step4_max_nodes,
+                         step4_engine=args.step4_engine, step4_relax=not args.step4_strict,
+                         step5_method=args.step5_method,
+                         max_scenarios=args.max_scenarios)
+    result = Pipeline(cfg, progress=lambda st, f, msg: print(f"[{f:4.0%}] {st}: {msg}")).run(df)
+
+    write_results_excel(result, args.output)
+    print(f"Καλύτερο σενάριο: {result.best}  →  {args.output}")
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+private_dirs.py — Ιδιωτικοί φάκελοι ανά χρήστη για caches/εργασίες
+------------------------------------------------------------------
+Οι caches (roster_cache, stage_cache) και ο job_runner κάνουν unpickle ό,τι
+βρουν στον φάκελό τους, άρα ο φάκελος δεν πρέπει να είναι κοινός/προβλέψιμος
+(π.χ. κάτω από το κοινό temp dir): όποιος μπορεί να γράψει εκεί ένα .pkl
+εκτελεί κώδικα στη διεργασία του Streamlit. Default: $XDG_CACHE_HOME (ή
+~/.cache)/class_allocation/<όνομα>, με mode 0o700· κάθε φάκελος ελέγχεται
+(ιδιοκτήτης = τρέχων χρήστης, όχι εγγράψιμος από group/others) πριν χρησιμοποιηθεί.
+
+Χρήση (ενδεικτικά):
+-------------------
+from private_dirs import default_private_dir, ensure_private_dir
+
+root = ensure_private_dir(default_private_dir("stage_cache", "STAGE_CACHE_DIR"))
+"""
+from __future__ import annotations
+import os
+import stat
+from pathlib import Path
+
+APP_DIR = "class_allocation"
+
+def default_private_dir(name: str, env_var: str) -> Path:
+    """$env_var αν ορίζεται, αλλιώς <cache χρήστη>/class_allocation/<name>."""
+    if os.environ.get(env_var):
+        return Path(os.environ[env_var])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / APP_DIR / name
+
+def ensure_private_dir(path) -> Path:
+    """
+    Δημιουργεί τον φάκελο (0o700) ή ελέγχει τον υπάρχοντα: όχι symlink, ιδιοκτήτης ο τρέχων
+    χρήστης, χωρίς δικαίωμα εγγραφής για group/others (αλλιώς PermissionError). Δικαιώματα
+    ανάγνωσης για άλλους αφαιρούνται. Σε συστήματα χωρίς uid (Windows) μόνο δημιουργία.
+    """
+    path = Path(path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return path
+    st = path.lstat()
+    if stat.S_ISLNK(st.st_mode) or not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"Ο φάκελος {path} δεν είναι κανονικός φάκελος")
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"Ο φάκελος {path} ανήκει σε άλλον χρήστη (uid {st.st_uid})")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Ο φάκελος {path} είναι εγγράψιμος από άλλους χρήστες")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+roster_cache.py — Content-addressed cache για ανεβασμένα ρόστερ
+---------------------------------------------------------------
+Κλειδί = SHA-256 των bytes του αρχείου + namespace της εφαρμογής (κάθε app
+κανονικοποιεί λίγο διαφορετικά). Τιμή = κανονικοποιημένο DataFrame (οι φίλοι
+αναλύονται από τον κοινό cached parser του friends_parser). Δύο επίπεδα:
+  - LRU στη μνήμη (επιβιώνει στα reruns του Streamlit, ίδια διεργασία),
+  - pickle στον δίσκο (επιβιώνει σε restart· ROSTER_CACHE_DIR ή ιδιωτικός φάκελος
+    χρήστη, βλ. private_dirs).
+
+Χρήση (ενδεικτικά):
+-------------------
+from roster_cache import load_roster_cached
+
+df = load_roster_cached(uploaded_file, normalize=_normalize, namespace="streamlit_app")
+"""
+from __future__ import annotations
+import hashlib
+import io
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from private_dirs import default_private_dir, ensure_private_dir
+
+CACHE_VERSION = 3   # 2: κανονικοποίηση μέσω roster_normalize (Categorical), 3: χωρίς γράφο φιλιών
+DEFAULT_MEMORY_ITEMS = 16
+DEFAULT_DISK_ITEMS = 256
+
+# ------------------------ Cache ------------------------
+
+def _default_cache_dir() -> Path:
+    return default_private_dir("roster_cache", "ROSTER_CACHE_DIR")
+
+class RosterCache:
+    """LRU στη μνήμη + pickles στον δίσκο, με κλειδί το περιεχόμενο του αρχείου."""
+
+    def __init__(self, max_items: int = DEFAULT_MEMORY_ITEMS, cache_dir: Optional[str] = None,
+                 max_disk_items: int = DEFAULT_DISK_ITEMS):
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(data: bytes, namespace: str) -> str:
+        return f"{hashlib.sha256(data).hexdigest()}-{namespace}-v{CACHE_VERSION}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._disk_get(key)
+        if entry is not None:
+            self.disk_hits += 1
+            self._mem_put(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._mem_put(key, entry)
+        self._disk_put(key, entry)
+
+    def clear(self) -> None:
+        self._mem.clear()
+
+    # ---- εσωτερικά ----
+
+    def _mem_put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        try:
+            ensure_private_dir(self.cache_dir)   # μόνο δικός μας φάκελος: το αρχείο γίνεται unpickle
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)  # «πρόσφατα χρησιμοποιημένο» για το κλάδεμα
+            return entry
+        except Exception:
+            # Ανύπαρκτο ή χαλασμένο αρχείο → απλώς miss
+            return None
+
+    def _disk_put(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            ensure_private_dir(self.cache_dir)
+            tmp = self._disk_path(key).with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._disk_path(key))
+            self._disk_prune()
+        except OSError:
+            pass  # read-only FS κ.λπ.: μένει μόνο η μνήμη
+
+    def _disk_prune(self) -> None:
+        files = sorted(self.cache_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        for p in files[:max(0, len(files) - self.max_disk_items)]:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+_DEFAULT_CACHE: Optional[RosterCache] = None
+
+def get_roster_cache() -> RosterCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = RosterCache()
+    return _DEFAULT_CACHE
+
+# ------------------------ Φόρτωση ------------------------
+
+def read_upload_bytes(uploaded_file) -> Tuple[bytes, str]:
+    """Bytes + όνομα από Streamlit UploadedFile, file-like ή path."""
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        return Path(uploaded_file).read_bytes(), os.fspath(uploaded_file)
+    name = getattr(uploaded_file, "name", "")
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue(), name
+    data = uploaded_file.read()
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return data, name
+
+def read_table(data: bytes, name: str) -> pd.DataFrame:
+    if name.lower().endswith(".csv"):
+        return pd.read_csv(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data))
+
+def load_roster_cached(uploaded_file, normalize: Callable[[pd.DataFrame], pd.DataFrame],
+                       namespace: str, cache: Optional[RosterCache] = None) -> pd.DataFrame:
+    """Επιστρέφει το κανονικοποιημένο df. Είναι αντίγραφο — ο caller μπορεί να το αλλάξει."""
+    cache = cache or get_roster_cache()
+    data, name = read_upload_bytes(uploaded_file)
+    key = cache.make_key(data, namespace)
+    entry = cache.get(key)
+    if entry is None:
+        cache.misses += 1
+        roster = normalize(read_table(data, name))
+        entry = {"roster": roster}
+        cache.put(key, entry)
+    return entry["roster"].copy()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+roster_normalize.py — Ενιαία κανονικοποίηση ρόστερ (στήλες + τιμές)
+-------------------------------------------------------------------
+Μία μηχανή για όλες τις εφαρμογές και τα βήματα:
+  - Στήλες: πίνακας ακριβών ψευδωνύμων (COLUMN_FIXES) + μεταγλωττισμένα
+    patterns ανά κανονική στήλη, με σειρά προτεραιότητας. Το αποτέλεσμα
+    για κάθε σύνολο ονομάτων στηλών μένει σε cache.
+  - Τιμές: factorize → αντιστοίχιση ΜΟΝΟ των μοναδικών τιμών → Categorical.
+    ΦΥΛΟ ∈ {Α, Κ}, σημαίες ∈ {Ν, Ο} (λείπουσα σημαία = «Ο»).
+
+Τρέχει μία φορά στο ingest· ένα ήδη κανονικοποιημένο df (is_normalized)
+περνά από τα βήματα χωρίς νέα κανονικοποίηση.
+
+Χρήση (ενδεικτικά):
+-------------------
+from roster_normalize import normalize_roster
+
+df = normalize_roster(pd.read_excel("roster.xlsx"))
+"""
+from __future__ import annotations
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+FLAG_COLS = ("ΖΩΗΡΟΣ", "ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ", "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ")
+CANONICAL_COLS = ("ΟΝΟΜΑ", "ΦΥΛΟ", *FLAG_COLS, "ΦΙΛΟΙ", "ΣΥΓΚΡΟΥΣΗ")
+
+GENDER_DTYPE = pd.CategoricalDtype(["Α", "Κ"])
+FLAG_DTYPE = pd.CategoricalDtype(["Ν", "Ο"])
+
+# Ακριβή ψευδώνυμα (και mojibake από λάθος encoding)
+COLUMN_FIXES = {
+    "Î–Î©Î—Î¡ÎŸÎ£": "ΖΩΗΡΟΣ",
+    "ΖΩΗΡΟΙ": "ΖΩΗΡΟΣ",
+    "Î™Î”Î™Î‘Î™Î¤Î•Î¡ÎŸÎ¤Î—Î¤Î‘": "ΙΔΙΑΙΤΕΡΟΤΗΤΑ",
+    "ΙΔΙΑΙΤΕΡΟΤΗΤΕΣ": "ΙΔΙΑΙΤΕΡΟΤΗΤΑ",
+    "Î Î‘Î™Î”Î™_Î•ÎšÎ Î‘Î™Î”Î•Î¥Î¤Î™ÎšÎŸÎ¥": "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ",
+    "ΠΑΙΔΙ ΕΚΠΑΙΔΕΥΤΙΚΟΥ": "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ",
+    "ÎŸÎ�ÎŸÎœÎ‘": "ΟΝΟΜΑ",
+    "ΟΝΟΜΑΤΕΠΩΝΥΜΟ": "ΟΝΟΜΑ",
+    "ΣΥΓΚΡΟΥΣΗ/CONFLICT": "ΣΥΓΚΡΟΥΣΗ",
+    "ΓΝΩΣΗ ΕΛΛ.": "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ",
+    "ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ": "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ",
+}
+
+# Χαλαρό matching (πάνω σε UPPER, με ' '/'-' → '_'), με σειρά προτεραιότητας
+COLUMN_PATTERNS = [
+    ("ΟΝΟΜΑ", ("ΟΝΟΜΑ", "ONOMA", "NAME", "ΜΑΘΗΤΗΣ", "ΜΑΘΗΤΡΙΑ", "STUDENT")),
+    ("ΦΥΛΟ", ("ΦΥΛΟ", "FYLO", "GENDER", "SEX")),
+    ("ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ", ("ΓΝΩΣΗ", "ΓΝΩΣΕΙΣ", "ΕΛΛΗΝΙΚ", "ELLINIK", "GREEK")),
+    ("ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ", ("ΠΑΙΔΙ", "PAIDI", "ΕΚΠΑΙΔΕΥΤΙΚ", "EKPEDEFTIK", "TEACHER", "ΔΑΣΚΑΛ")),
+    ("ΦΙΛΟΙ", ("ΦΙΛΟΙ", "ΦΙΛΟΣ", "FILOI", "FRIEND")),
+    ("ΖΩΗΡΟΣ", ("ΖΩΗΡ", "ZOIR", "ACTIVE", "ENERGY")),
+    ("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", ("ΙΔΙΑΙΤΕΡΟΤΗΤ", "IDIETEROTIT", "SPECIAL")),
+    ("ΣΥΓΚΡΟΥΣΗ", ("ΣΥΓΚΡΟΥΣ", "SYGKROUS", "CONFLICT")),
+]
+_COMPILED_PATTERNS = [(canon, re.compile("|".join(map(re.escape, pats)))) for canon, pats in COLUMN_PATTERNS]
+
+YES_VALUES = frozenset({"Ν", "ΝΑΙ", "NAI", "YES", "Y", "TRUE", "T", "Τ", "1", "1.0", "ΑΙΣ"})
+GENDER_VALUES = {
+    "Α": "Α", "A": "Α", "ΑΓΟΡΙ": "Α", "ΑΓΟΡΙΟΥ": "Α", "BOY": "Α", "MALE": "Α", "M": "Α",
+    "Κ": "Κ", "K": "Κ", "ΚΟΡΙΤΣΙ": "Κ", "ΚΟΡΙΤΣΙΟΥ": "Κ", "GIRL": "Κ", "FEMALE": "Κ", "F": "Κ",
+}
+
+# ------------------------ Στήλες ------------------------
+
+def _canonical_column(name: Hashable) -> Optional[str]:
+    raw = str(name).strip()
+    if raw in CANONICAL_COLS:
+        return raw
+    if raw in COLUMN_FIXES:
+        return COLUMN_FIXES[raw]
+    key = raw.upper().replace(" ", "_").replace("-", "_")
+    if key in CANONICAL_COLS:
+        return key
+    for canon, rx in _COMPILED_PATTERNS:
+        if rx.search(key):
+            return canon
+    return None
+
+@lru_cache(maxsize=256)
+def resolve_columns(columns: Tuple[Hashable, ...]) -> Dict[Hashable, str]:
+    """rename map για ένα σύνολο στηλών. Κάθε κανονική στήλη δίνεται μία φορά:
+       προτιμάται η ήδη κανονική, αλλιώς η πρώτη που ταιριάζει."""
+    taken = {c for c in columns if c in CANONICAL_COLS}
+    rename: Dict[Hashable, str] = {}
+    for c in columns:
+        if c in CANONICAL_COLS:
+            continue
+        canon = _canonical_column(c)
+        if canon is not None and canon not in taken:
+            rename[c] = canon
+            taken.add(canon)
+    return rename
+
+# ------------------------ Τιμές ------------------------
+
+def value_key(value: object) -> str:
+    """Κλειδί αναζήτησης τιμής: strip + κεφαλαία + χωρίς τόνους/διαλυτικά («Αγόρι» → «ΑΓΟΡΙ»)."""
+    s = unicodedata.normalize("NFD", str(value).strip().upper())
+    return unicodedata.normalize("NFC", "".join(ch for ch in s if not unicodedata.combining(ch)))
+
+def _to_categorical(values: pd.Series, table, dtype: pd.CategoricalDtype,
+                    default: Optional[str]) -> pd.Categorical:
+    """Αντιστοίχιση μόνο των μοναδικών τιμών (όχι ανά γραμμή). Άγνωστα/κενά → default (ή NaN)."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    pos = {cat: k for k, cat in enumerate(dtype.categories)}
+    fallback = pos[default] if default is not None else -1
+    lut = np.array([pos.get(table(value_key(u)), fallback) for u in uniques] + [fallback],
+                   dtype=np.int8)
+    return pd.Categorical.from_codes(lut[codes], dtype=dtype)   # codes == −1 → lut[−1] = fallback
+
+def _yes_no(key: str) -> str:
+    return "Ν" if key in YES_VALUES else "Ο"
+
+def is_normalized(df: pd.DataFrame) -> bool:
+    """True αν το df έχει ήδη περάσει από normalize_roster (ΦΥΛΟ/σημαίες ως Categorical)."""
+    if "ΦΥΛΟ" in df.columns and df["ΦΥΛΟ"].dtype != GENDER_DTYPE:
+        return False
+    return all(c in df.columns and df[c].dtype == FLAG_DTYPE for c in FLAG_COLS)
+
+def normalize_roster(df: pd.DataFrame, gender_default: Optional[str] = None,
+                     fill_missing_flags: bool = True) -> pd.DataFrame:
+    """Επιστρέφει ΝΕΟ df: κανονικά ονόματα στηλών, ΟΝΟΜΑ stripped, ΦΥΛΟ/σημαίες Categorical.
+       gender_default: τιμή για άγνωστο/κενό ΦΥΛΟ (None → NaN).
+    """
+    if is_normalized(df) and not resolve_columns(tuple(df.columns)):
+        return df.copy()
+    out = df.rename(columns=resolve_columns(tuple(df.columns)))
+    if "ΟΝΟΜΑ" in out.columns:
+        out["ΟΝΟΜΑ"] = out["ΟΝΟΜΑ"].astype(str).str.strip()
+    if "ΦΥΛΟ" in out.columns and out["ΦΥΛΟ"].dtype != GENDER_DTYPE:
+        out["ΦΥΛΟ"] = _to_categorical(out["ΦΥΛΟ"], GENDER_VALUES.get, GENDER_DTYPE, gender_default)
+    for col in FLAG_COLS:
+        if col in out.columns:
+            if out[col].dtype != FLAG_DTYPE:
+                out[col] = _to_categorical(out[col], _yes_no, FLAG_DTYPE, "Ο")
+        elif fill_missing_flags:
+            out[col] = pd.Categorical(np.full(len(out), "Ο", dtype=object), dtype=FLAG_DTYPE)
+    return out
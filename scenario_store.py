@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+scenario_store.py — Συμπαγής αποθήκευση συνόλων σεναρίων (checkpoints)
+---------------------------------------------------------------------
+Το ρόστερ γράφεται ΜΙΑ φορά· κάθε σενάριο/βήμα είναι μία στήλη int8
+(κωδικός k → labels[k], −1 = χωρίς τμήμα). Φάκελος με:
+  meta.json                      ετικέτες, ονόματα στηλών, format, ελεύθερα metadata
+  roster.parquet | roster.json   ρόστερ
+  codes.parquet  | codes.npy     πίνακας n × στήλες (int8)
+
+Με pyarrow → Parquet· αλλιώς NumPy .npy (Fortran order, ώστε κάθε στήλη να είναι
+συνεχής) που φορτώνεται με memory-map, δηλαδή σχεδόν χωρίς αντιγραφή.
+Το Excel είναι πλέον μόνο τελική, προαιρετική μετατροπή (export_excel).
+
+Χρήση (ενδεικτικά):
+-------------------
+from scenario_store import save_scenario_set, load_scenario_set
+
+save_scenario_set(result.to_scenario_set(), "out/school.scen")
+ss = load_scenario_set("out/school.scen")
+ss.decode("ΣΕΝΑΡΙΟ_1/step6")
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+
+# ------------------------ Σύνολο σεναρίων ------------------------
+
+@dataclass
+class ScenarioSet:
+    roster: pd.DataFrame
+    labels: List[str]
+    columns: List[str] = field(default_factory=list)               # π.χ. "ΣΕΝΑΡΙΟ_1/step3"
+    codes: np.ndarray = field(default_factory=lambda: np.empty((0, 0), dtype=np.int8))
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.codes.size == 0 and not self.columns:
+            self.codes = np.empty((len(self.roster), 0), dtype=np.int8, order="F")
+
+    def add(self, name: str, codes: np.ndarray) -> None:
+        codes = np.asarray(codes, dtype=np.int8)
+        if codes.shape != (len(self.roster),):
+            raise ValueError(f"Η στήλη {name} έχει {codes.shape[0]} γραμμές, το ρόστερ {len(self.roster)}")
+        if name in self.columns:
+            raise ValueError(f"Η στήλη {name} υπάρχει ήδη")
+        self.codes = np.asfortranarray(np.column_stack([self.codes, codes]))
+        self.columns.append(name)
+
+    def column(self, name: str) -> np.ndarray:
+        """Κωδικοί int8 μίας στήλης (view — όχι αντίγραφο)."""
+        return self.codes[:, self.columns.index(name)]
+
+    def decode(self, name: str) -> np.ndarray:
+        lut = np.array(list(self.labels) + [np.nan], dtype=object)
+        codes = self.column(name)
+        return lut[np.where(codes >= 0, codes, len(self.labels))]
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Ρόστερ + αποκωδικοποιημένες στήλες (για εμφάνιση/Excel)."""
+        names = self.columns if columns is None else columns
+        return self.roster.assign(**{name: self.decode(name) for name in names})
+
+# ------------------------ Εγγραφή / Ανάγνωση ------------------------
+
+def _json_default(o):
+    return o.item() if isinstance(o, np.generic) else str(o)
+
+def _resolve_format(fmt: str) -> str:
+    if fmt == "auto":
+        return "parquet" if PYARROW_AVAILABLE else "npy"
+    if fmt == "parquet" and not PYARROW_AVAILABLE:
+        raise ImportError("Το format 'parquet' χρειάζεται pyarrow (pip install pyarrow)")
+    if fmt not in ("parquet", "npy"):
+        raise ValueError(f"Άγνωστο format: {fmt}")
+    return fmt
+
+def save_scenario_set(ss: ScenarioSet, path: str, fmt: str = "auto") -> Path:
+    """Ατομική εγγραφή: γράφει σε <path>.tmp και μετά το μετονομάζει."""
+    fmt = _resolve_format(fmt)
+    out = Path(path)
+    tmp = out.with_name(out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    roster_file = "roster.json"
+    if fmt == "parquet":
+        codes_table = pa.table({name: ss.codes[:, j] for j, name in enumerate(ss.columns)})
+        pq.write_table(codes_table, tmp / "codes.parquet")
+        try:
+            pq.write_table(pa.Table.from_pandas(ss.roster, preserve_index=False), tmp / "roster.parquet")
+            roster_file = "roster.parquet"
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # μικτοί τύποι σε στήλη (π.χ. αριθμοί + κείμενο) → JSON
+    else:
+        np.save(tmp / "codes.npy", np.asfortranarray(ss.codes, dtype=np.int8))
+    if roster_file == "roster.json":
+        ss.roster.to_json(tmp / roster_file, orient="split", index=False, force_ascii=False)
+
+    meta = {"version": STORE_VERSION, "format": fmt, "roster_file": roster_file, "rows": len(ss.roster),
+            "labels": list(ss.labels), "columns": list(ss.columns), "meta": ss.meta}
+    with open(tmp / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2, default=_json_default)
+
+    shutil.rmtree(out, ignore_errors=True)
+    os.replace(tmp, out)
+    return out
+
+def load_scenario_set(path: str, mmap: bool = True) -> ScenarioSet:
+    """mmap=True: ο πίνακας κωδικών (.npy) διαβάζεται με memory-map, μόνο για ανάγνωση."""
+    root = Path(path)
+    with open(root / META_FILE, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"Μη υποστηριζόμενη έκδοση scenario store: {meta.get('version')}")
+
+    if meta["roster_file"] == "roster.parquet":
+        roster = pq.read_table(root / "roster.parquet", memory_map=mmap).to_pandas()
+    else:
+        roster = pd.read_json(root / "roster.json", orient="split", dtype=False)
+
+    if meta["format"] == "parquet":
+        table = pq.read_table(root / "codes.parquet", memory_map=mmap)
+        codes = np.empty((meta["rows"], len(meta["columns"])), dtype=np.int8, order="F")
+        for j, name in enumerate(meta["columns"]):
+            codes[:, j] = table.column(name).to_numpy()
+    else:
+        codes = np.load(root / "codes.npy", mmap_mode="r" if mmap else None)
+
+    return ScenarioSet(roster=roster, labels=meta["labels"], columns=meta["columns"],
+                       codes=codes, meta=meta.get("meta", {}))
+
+def export_excel(ss: ScenarioSet, out_path: str, columns: Optional[List[str]] = None) -> None:
+    """Τελική μετατροπή σε Excel: ρόστερ + αποκωδικοποιημένες στήλες σε ένα φύλλο."""
+    ss.to_frame(columns).to_excel(out_path, sheet_name="Σενάρια", index=False, engine="xlsxwriter")
+
+# ------------------------------- CLI ----------------------------------------
+
+def _cli():
+    import argparse
+    parser = argparse.ArgumentParser(description="Μετατροπή scenario store σε Excel.")
+    parser.add_argument("store", help="Φάκελος scenario store")
+    parser.add_argument("output", help="Αρχείο .xlsx")
+    args = parser.parse_args()
+    export_excel(load_scenario_set(args.store), args.output)
+    print(f"✅ Γράφτηκε: {args.output}")
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+stage_cache.py — Memoization αποτελεσμάτων ανά βήμα
+---------------------------------------------------
+Κλειδί = SHA-256(όνομα βήματος, παράμετροι [num_classes, seed, budgets…], πίνακες εισόδου).
+Τιμή   = συμπαγή αποτελέσματα (πίνακες ανάθεσης + metrics), αποθηκευμένα ως pickle bytes.
+
+Η μνήμη είναι LRU με όριο σε bytes· ό,τι εκτοπίζεται «χύνεται» στον δίσκο
+(STAGE_CACHE_DIR ή ιδιωτικός φάκελος χρήστη, βλ. private_dirs· επίσης με όριο bytes)
+και επανέρχεται σε επόμενο get.
+Έτσι η αλλαγή παραμέτρων των τελευταίων βημάτων δεν ξανατρέχει τα πρώτα.
+
+Χρήση (ενδεικτικά):
+-------------------
+from stage_cache import get_stage_cache, memoize_frame_stage
+
+df2, info = memoize_frame_stage(get_stage_cache(), "step2", df, {"num_classes": 2}, compute)
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from private_dirs import default_private_dir, ensure_private_dir
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+
+_MISSING = object()
+
+# ------------------------ Fingerprints ------------------------
+
+def array_fingerprint(a: np.ndarray) -> bytes:
+    a = np.ascontiguousarray(a)
+    if a.dtype == object:
+        # object arrays (ετικέτες/NaN): σταθερή αναπαράσταση ανεξάρτητη από pickle
+        return "\x1f".join("\x00" if v is None or (isinstance(v, float) and np.isnan(v)) else repr(v)
+                           for v in a.ravel().tolist()).encode("utf-8")
+    return str(a.dtype).encode() + str(a.shape).encode() + a.tobytes()
+
+def frame_fingerprint(df: pd.DataFrame) -> bytes:
+    """Περιεχόμενο + ονόματα/σειρά στηλών. Κελιά-λίστες (ΦΙΛΟΙ) μετρούν μέσω str()."""
+    cols = [str(c) for c in df.columns]
+    hashed = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+    return json.dumps(cols, ensure_ascii=False).encode("utf-8") + hashed.tobytes()
+
+# ------------------------ Cache ------------------------
+
+def _default_spill_dir() -> Path:
+    return default_private_dir("stage_cache", "STAGE_CACHE_DIR")
+
+class StageCache:
+    """LRU με όριο bytes στη μνήμη + spill στον δίσκο."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, spill_dir: Optional[str] = None,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else _default_spill_dir()
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "spills": 0}
+
+    @staticmethod
+    def make_key(stage: str, params: Dict[str, Any], arrays: Iterable[np.ndarray] = (),
+                 frame: Optional[pd.DataFrame] = None) -> str:
+        h = hashlib.sha256()
+        h.update(f"v{CACHE_VERSION}|{stage}|".encode())
+        h.update(json.dumps(params, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+        if frame is not None:
+            h.update(b"|frame|")
+            h.update(frame_fingerprint(frame))
+        for a in arrays:
+            h.update(b"|arr|")
+            h.update(array_fingerprint(np.asarray(a)))
+        return f"{stage}-{h.hexdigest()}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        blob = self._mem.get(key)
+        if blob is not None:
+            self._mem.move_to_end(key)
+            self.stats["hits"] += 1
+            return pickle.loads(blob)
+        blob = self._disk_get(key)
+        if blob is not None:
+            self.stats["disk_hits"] += 1
+            self._mem_put(key, blob)
+            return pickle.loads(blob)
+        self.stats["misses"] += 1
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        # Αποθήκευση ως bytes: ακριβές μέγεθος για το όριο και «φρέσκα» αντικείμενα σε κάθε get
+        self._mem_put(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def clear(self) -> None:
+        self._mem.clear()
+        self._mem_bytes = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._mem_bytes
+
+    # ---- εσωτερικά ----
+
+    def _mem_put(self, key: str, blob: bytes) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old)
+        self._mem[key] = blob
+        self._mem_bytes += len(blob)
+        while self._mem_bytes > self.max_bytes and len(self._mem) > 1:
+            k, b = self._mem.popitem(last=False)
+            self._mem_bytes -= len(b)
+            self._spill(k, b)
+
+    def _path(self, key: str) -> Path:
+        return self.spill_dir / f"{key}.pkl"
+
+    def _spill(self, key: str, blob: bytes) -> None:
+        try:
+            ensure_private_dir(self.spill_dir)
+            tmp = self._path(key).with_suffix(".tmp")
+            tmp.write_bytes(blob)
+            os.replace(tmp, self._path(key))
+            self.stats["spills"] += 1
+            self._disk_prune()
+        except OSError:
+            pass  # χωρίς δίσκο: απλώς χάνεται
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            ensure_private_dir(self.spill_dir)   # μόνο δικός μας φάκελος: τα bytes γίνονται unpickle
+            blob = path.read_bytes()
+            os.utime(path)
+            return blob
+        except OSError:
+            return None
+
+    def _disk_prune(self) -> None:
+        files = sorted(self.spill_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for p in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                total -= p.stat().st_size
+                p.unlink()
+            except OSError:
+                pass
+
+_DEFAULT_CACHE: Optional[StageCache] = None
+
+def get_stage_cache() -> StageCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = StageCache()
+    return _DEFAULT_CACHE
+
+# ------------------------ DataFrame stages ------------------------
+
+def memoize_frame_stage(cache: Optional[StageCache], stage: str, df: pd.DataFrame, params: Dict[str, Any],
+                        compute: Callable[[pd.DataFrame], Tuple[Optional[pd.DataFrame], Any]]
+                        ) -> Tuple[Optional[pd.DataFrame], Any]:
+    """Για βήματα που παίρνουν/επιστρέφουν DataFrame με τις ίδιες γραμμές (ίδια σειρά).
+       Στην cache μπαίνουν ΜΟΝΟ οι στήλες που προστέθηκαν/άλλαξαν + το extra (metrics).
+    """
+    if cache is None:
+        return compute(df)
+    key = cache.make_key(stage, params, frame=df)
+    hit = cache.get(key, _MISSING)
+    if hit is not _MISSING:
+        columns, changed, extra = hit
+        if columns is None:
+            return None, extra
+        out = df[[c for c in columns if c in df.columns and c not in changed]].copy()
+        for c, values in changed.items():
+            out[c] = values
+        return out[columns], extra
+
+    # Αντίγραφο: ένα compute που αλλάζει το frame επιτόπου δεν πρέπει να χαλάει τη βάση της σύγκρισης
+    out, extra = compute(df.copy())
+    if out is None:
+        cache.put(key, (None, None, extra))
+        return None, extra
+    changed = {c: out[c].to_numpy() for c in out.columns
+               if c not in df.columns or not out[c].equals(df[c])}
+    cache.put(key, (list(out.columns), changed, extra))
+    return out, extra
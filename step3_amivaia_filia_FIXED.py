@@ -17,6 +17,7 @@ from step_3_helpers_FIXED import (
     parse_friends_string, are_mutual_pair, mutual_dyads,
     count_broken_dyads, calculate_penalty_score_step3, select_best_scenarios
 )
+from instrumentation import count
 
 def _class_fits(df: pd.DataFrame, col: str, class_name: str, add: int=1) -> bool:
     return (df[col]==class_name).sum() + add <= 25
@@ -28,6 +29,7 @@ def apply_step3_on_sheet(df2: pd.DataFrame, scenario_col: str, num_classes: int)
     - meta: {"broken": int, "penalty": int}
     Κανόνας: τοποθετούμε ΜΟΝΟ δυάδες (u,v) όπου u είναι unplaced, v είναι placed, και είναι αμοιβαία φίλοι.
     """
+    count("step3.df_copies")
     df = df2.copy()
     # νέα στήλη
     new_col = re.sub(r"^ΒΗΜΑ2", "ΒΗΜΑ3", scenario_col)
@@ -53,12 +55,16 @@ def apply_step3_on_sheet(df2: pd.DataFrame, scenario_col: str, num_classes: int)
     degree = {u: len([1 for x in candidates if x[0]==u]) for u in unplaced_names}
     candidates.sort(key=lambda t: (degree.get(t[0], 99), t[2]))
 
+    count("step3.candidates", len(candidates))
     used_u = set()
     for u, v, cl in candidates:
         if u in used_u:
             continue
-        if _class_fits(df, new_col, cl, add=1):
+        if not _class_fits(df, new_col, cl, add=1):
+            count("step3.prune.capacity")
+        else:
             df.loc[df["ΟΝΟΜΑ"]==u, new_col] = cl
+            count("step3.placed")
             used_u.add(u)
             # ενημέρωσε και το placed ώστε αν έχει κι άλλος φίλος τον u, τώρα να θεωρείται placed
             placed[u] = cl
@@ -2,13 +2,26 @@
 """
 Step 4 — Fully mutual groups placement (BELTIOSI, FIXED)
 Change: gender_diff_max default from 3 → 4 (reject only if gender diff > 4)
+Groups with the same (size, good, boys, girls) signature are indistinguishable, so both
+engines decide only HOW MANY groups of each type go to each class and expand the counts
+back into concrete groups at the end.
+Engines: "batch" (every type split evaluated with NumPy in chunks, best max_results),
+"dp" (knapsack-style DP over per-class count vectors, best max_results), "dfs" (DFS over
+types, stops at max_results), "auto" (batch up to BATCH_MAX_COMBOS splits, else dp; dfs if
+the DP state budget is exceeded).
+Relaxation: apply_step4_relaxed walks RELAX_LADDER (strict accept() first) in one bounded pass —
+states/leaves held back by a stricter level are kept as a frontier and resumed when the next
+level is tried, so the search never restarts from the root; the result reports the level used.
 """
 
 import itertools
-from collections import defaultdict
-from copy import deepcopy
+import math
+from collections import OrderedDict, defaultdict
+import numpy as np
 import pandas as pd
 
+from instrumentation import count
+
 # -------------------- Utilities --------------------
 
 def is_fully_mutual(group, df):
@@ -115,86 +128,432 @@ def penalty(cnt, good, boys, girls, classes):
     p += max(0, abs(girls[classes[0]] - girls[classes[1]]) - 1)
     return p
 
-# -------------------- Main: improved exhaustive with strong pruning --------------------
+# -------------------- Group types: buckets, bounds, expansion --------------------
+
+DIFF_LIMITS = (2, 4, 4, 4)   # pop, good, boys, girls — same as accept()
+# apply_step4_relaxed: levels tried in order (each at least as loose as the previous one);
+# population balance is relaxed only after good/gender
+RELAX_LADDER = (
+    DIFF_LIMITS,
+    (2, 5, 5, 5),
+    (3, 5, 5, 5),
+    (3, 6, 6, 6),
+    (4, 8, 8, 8),
+)
+TT_MAX_ENTRIES = 100000      # LRU bound of the DFS transposition table
+BATCH_MAX_COMBOS = 1_000_000 # engine="auto" uses the batched engine up to this many type splits
+BATCH_CHUNK = 65536          # placements evaluated per NumPy batch
+
+def _group_vector(g, df):
+    sub = df[df['ΟΝΟΜΑ'].isin(g)]
+    return (len(g), int((sub['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ']=='Ν').sum()),
+            int((sub['ΦΥΛΟ']=='Α').sum()), int((sub['ΦΥΛΟ']=='Κ').sum()))
 
-def apply_step4_strict(df, assigned_column='ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1', num_classes=2, max_results=5, max_nodes=200000):
+def _group_types(groups, vectors):
     """
-    Exhaustively enumerate placements of fully mutual groups, but with strict acceptance and pruning.
-    Returns a list of tuples: (placed_dict, penalty_score)
+    Groups with the same (size, good, boys, girls) signature are indistinguishable for
+    accept/penalty: [(signature, [groups...])] in first-appearance order.
     """
-    classes = [f'Α{i+1}' for i in range(num_classes)]
-    base_cnt = {c: int((df[assigned_column]==c).sum()) for c in classes}
-    base_good= {c: int(((df[assigned_column]==c) & (df['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ']=='Ν')).sum()) for c in classes}
-    base_boys= {c: int(((df[assigned_column]==c) & (df['ΦΥΛΟ']=='Α')).sum()) for c in classes}
-    base_girls={c: int(((df[assigned_column]==c) & (df['ΦΥΛΟ']=='Κ')).sum()) for c in classes}
+    buckets = {}
+    for g, v in zip(groups, vectors):
+        buckets.setdefault(v, []).append(g)
+    return list(buckets.items())
 
-    groups = create_fully_mutual_groups(df, assigned_column)
-    if not groups:
-        return []
+def _state_bounds(types, base, C, limits=DIFF_LIMITS):
+    """
+    remaining[i] = totals of types after i; [lo, hi] = range every class must end in:
+    with final total T and max diff L, ceil((T-(C-1)L)/C) .. floor((T+(C-1)L)/C) (cnt <= 25).
+    """
+    remaining = [tuple(sum(v[d] * len(gs) for v, gs in types[i+1:]) for d in range(4))
+                 for i in range(len(types))]
+    total = [sum(b[d] for b in base) + sum(v[d] * len(gs) for v, gs in types) for d in range(4)]
+    lo = [-(-(total[d] - (C-1) * limits[d]) // C) for d in range(4)]
+    hi = [(total[d] + (C-1) * limits[d]) // C for d in range(4)]
+    hi[0] = min(hi[0], 25)
+    return remaining, lo, hi
 
-    # Heuristic order: larger & more "informative" groups first
-    def gkey(g):
-        sub = df[df['ΟΝΟΜΑ'].isin(g)]
-        good = int((sub['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ']=='Ν').sum())
-        boys = int((sub['ΦΥΛΟ']=='Α').sum())
-        girls= int((sub['ΦΥΛΟ']=='Κ').sum())
-        # prioritize: size desc, |boys-girls| desc, good desc
-        return (-len(g), -abs(boys-girls), -good)
-    groups = sorted(groups, key=gkey)
+def _add_split(state, split, v):
+    return tuple(tuple(vec[d] + k * v[d] for d in range(4)) for vec, k in zip(state, split))
 
+def _in_bounds(state, rem, lo, hi):
+    return not any(vec[d] > hi[d] or vec[d] + rem[d] < lo[d] for vec in state for d in range(4))
+
+def _thresholds(limits):
+    """(pop, good, boys, girls) limits → accept() keyword thresholds."""
+    return {"pop_diff_max": limits[0], "good_diff_max": limits[1], "gender_diff_max": limits[2]}
+
+def _ladder_bounds(types, base, C, ladder):
+    """remaining per type index and one (lo, hi) pair per ladder level."""
+    bounds = []
+    for limits in ladder:
+        remaining, lo, hi = _state_bounds(types, base, C, limits)
+        bounds.append((lo, hi))
+    return remaining, bounds
+
+def _bound_level(state, rem, bounds):
+    """First ladder level whose bounds the state satisfies, else None."""
+    for level, (lo, hi) in enumerate(bounds):
+        if _in_bounds(state, rem, lo, hi):
+            return level
+    return None
+
+def _score(state, classes, ladder=(DIFF_LIMITS,)):
+    """(first accepting ladder level, penalty()) of a final state, else None."""
+    cnt, good, boys, girls = ({c: state[k][d] for k, c in enumerate(classes)} for d in range(4))
+    for level, limits in enumerate(ladder):
+        if accept(cnt, good, boys, girls, **_thresholds(limits)):
+            return level, penalty(cnt, good, boys, girls, classes)
+    return None
+
+def _compositions(m, k):
+    """All ways to split m identical groups over k classes (tuples of length k)."""
+    if k == 1:
+        yield (m,)
+        return
+    for first in range(m, -1, -1):
+        for rest in _compositions(m - first, k - 1):
+            yield (first,) + rest
+
+def _distinct_orders(seq):
+    """Distinct permutations of a multiset (lazy)."""
+    if not seq:
+        yield ()
+        return
+    for x in dict.fromkeys(seq):
+        rest = list(seq)
+        rest.remove(x)
+        for tail in _distinct_orders(rest):
+            yield (x,) + tail
+
+def _placements(types, splits, classes):
+    """Concrete {group: class} dicts for per-type class counts (lazy, canonical one first)."""
+    if not types:
+        yield {}
+        return
+    (_, gs), split = types[0], splits[0]
+    seq = [c for c, k in zip(classes, split) for _ in range(k)]
+    for order in _distinct_orders(seq):
+        head = {tuple(g): c for g, c in zip(gs, order)}
+        for tail in _placements(types[1:], splits[1:], classes):
+            yield {**head, **tail}
+
+def _expand(found, types, groups, classes, max_results):
+    """
+    [(penalty, splits)] best first → [(placed_dict, penalty)]. Within each penalty level the
+    count solutions take turns (diversity); more placements of the same solution (same-type
+    groups swapped between classes) are used before moving to a worse penalty.
+    """
     results = []
-    nodes = 0
+    for pen, level in itertools.groupby(found, key=lambda t: t[0]):
+        gens = [_placements(types, splits, classes) for _, splits in level]
+        while gens and len(results) < max_results:
+            for gen in list(gens):
+                placed = next(gen, None)
+                if placed is None:
+                    gens.remove(gen)
+                elif len(results) < max_results:
+                    results.append((placed, pen))
+        if len(results) >= max_results:
+            break
+    order = [tuple(g) for g in groups]
+    results = [({g: placed[g] for g in order}, pen) for placed, pen in results]
+    count("step4.solutions", len(results))
+    return results
+
+# -------------------- Engines --------------------
 
-    placed = {}
+def _dp_paths(layers, i, state):
+    """Lazily yield the split sequences (types 0..i-1) that reach `state` in layer i."""
+    if i == 0:
+        yield []
+        return
+    for parent, split in layers[i][state]:
+        for splits in _dp_paths(layers, i - 1, parent):
+            yield splits + [split]
+
+def _step4_dp(types, base, classes, max_results, max_states, ladder=(DIFF_LIMITS,)):
+    """
+    Knapsack-style DP over per-class count vectors: each type is split over the classes
+    exactly (compositions), states outside _state_bounds dropped. Each state keeps up to
+    max_results back-pointers (k-best): the penalty depends only on the final state, so
+    different split sequences reaching it tie, and max_results pointers are enough to
+    rebuild max_results distinct sequences whenever that many exist.
+    Levels of the ladder are tried in order; states only inside a looser level's bounds wait
+    in `pending` and are released (and expanded) when that level is reached.
+    Returns (level, [(penalty, splits)]) with the best max_results accepted solutions of the
+    first level that has any ((None, []) if none), or None if more than max_states states
+    were needed.
+    """
+    C = len(classes)
+    n = len(types)
+    remaining, bounds = _ladder_bounds(types, base, C, ladder)
+    layers = [{base: []}] + [{} for _ in types]   # state → [(parent, split), …] (≤ max_results)
+    pending = [{} for _ in range(n + 1)]          # state → (bound level, back-pointers)
+    new = [[base]] + [[] for _ in types]   # states of each layer not expanded yet
+    n_states = 0
+    scores = {}
+
+    for level in range(len(ladder)):
+        for i in range(n + 1):
+            for state, (tag, ptrs) in list(pending[i].items()):
+                if tag <= level:
+                    del pending[i][state]
+                    layers[i][state] = ptrs
+                    new[i].append(state)
+                    if level:
+                        count("step4.relax.released")
+            if i == n:
+                break
+            v, gs = types[i]
+            added = 0
+            for state in new[i]:
+                for split in _compositions(len(gs), C):
+                    child = _add_split(state, split, v)
+                    seen = layers[i+1].get(child)
+                    if seen is None and child in pending[i+1]:
+                        seen = pending[i+1][child][1]
+                    if seen is not None:
+                        if len(seen) < max_results:
+                            seen.append((state, split))
+                        continue
+                    tag = _bound_level(child, remaining[i], bounds)
+                    if tag is not None:
+                        pending[i+1][child] = (tag, [(state, split)])
+                        added += 1
+            new[i] = []
+            n_states += added
+            count("step4.dp_states", added)
+            if n_states > max_states:
+                count("step4.prune.max_nodes")
+                return None
+
+        scored = []
+        for state in layers[n]:
+            if state not in scores:
+                scores[state] = _score(state, classes, ladder)
+                if scores[state] is None:
+                    count("step4.prune.accept")
+            if scores[state] is not None and scores[state][0] <= level:
+                scored.append((scores[state][1], state))
+        if not scored:
+            continue
+        scored.sort(key=lambda t: t[0])
 
-    def dfs(idx, cnt, good, boys, girls):
+        found = []
+        for pen, state in scored:
+            for splits in itertools.islice(_dp_paths(layers, n, state), max_results - len(found)):
+                found.append((pen, splits))
+            if len(found) >= max_results:
+                break
+        return level, found
+    return None, []
+
+def _step4_batch(types, base, classes, max_results, chunk=BATCH_CHUNK, ladder=(DIFF_LIMITS,)):
+    """
+    Exhaustive, batched: every combination of type splits is a mixed-radix index; chunks of
+    indices are decoded to split counts, per-class vectors = base + Σ splits·signature, and
+    accept/penalty are evaluated with array math. Each combination gets the first ladder
+    level that accepts it; keeps a running top-max_results (level, penalty, index).
+    Returns (level, [(penalty, splits)]) for the best level, (None, []) if none accepts.
+    """
+    C = len(classes)
+    comps = [np.array(list(_compositions(len(gs), C)), dtype=np.int32) for _, gs in types]
+    # contrib[t][k] = per-class (C, 4) vectors added by split k of type t
+    contrib = [c[:, :, None] * np.array(v, dtype=np.int32)[None, None, :] for c, (v, _) in zip(comps, types)]
+    radix = [len(c) for c in comps]
+    total = int(np.prod(radix, dtype=np.int64))
+    limits = np.array(ladder, dtype=np.int32)                        # (levels, 4)
+    base_arr = np.array(base, dtype=np.int32)                        # (C, 4)
+    best_lvl = np.empty(0, dtype=np.int32)
+    best_pen = np.empty(0, dtype=np.int32)
+    best_idx = np.empty(0, dtype=np.int64)
+
+    for start in range(0, total, chunk):
+        idx = np.arange(start, min(start + chunk, total), dtype=np.int64)
+        vec = np.broadcast_to(base_arr, (len(idx), C, 4)).copy()    # (n, C, 4)
+        rest = idx.copy()
+        for t in range(len(types) - 1, -1, -1):
+            digit = rest % radix[t]
+            rest //= radix[t]
+            vec += contrib[t][digit]
+        cap = (vec[:, :, 0] <= 25).all(axis=1)
+        spread = vec.max(axis=1) - vec.min(axis=1)                   # (n, 4)
+        lvl = np.full(len(idx), len(ladder), dtype=np.int32)
+        for level in range(len(ladder) - 1, -1, -1):
+            lvl[cap & (spread <= limits[level]).all(axis=1)] = level
+        ok = lvl < len(ladder)
+        count("step4.batch_evaluated", len(idx))
+        if not ok.any():
+            continue
+        d = np.abs(vec[ok, 0, :] - vec[ok, 1, :])
+        pen = (np.maximum(0, d - np.array([1, 2, 1, 1], dtype=np.int32))).sum(axis=1)
+        best_lvl = np.concatenate([best_lvl, lvl[ok]])
+        best_pen = np.concatenate([best_pen, pen.astype(np.int32)])
+        best_idx = np.concatenate([best_idx, idx[ok]])
+        keep = np.lexsort((best_idx, best_pen, best_lvl))[:max_results]
+        best_lvl, best_pen, best_idx = best_lvl[keep], best_pen[keep], best_idx[keep]
+
+    if not len(best_lvl):
+        return None, []
+    level = int(best_lvl[0])
+    found = []
+    for pen, i in zip(best_pen[best_lvl == level].tolist(), best_idx[best_lvl == level].tolist()):
+        digits = []
+        for t in range(len(types) - 1, -1, -1):
+            digits.append(i % radix[t])
+            i //= radix[t]
+        splits = [tuple(int(x) for x in comps[t][dg]) for t, dg in enumerate(digits[::-1])]
+        found.append((pen, splits))
+    return level, found
+
+def _step4_dfs(types, base, classes, max_results, max_nodes, ladder=(DIFF_LIMITS,)):
+    """
+    DFS over group types: each level tries every split of the type's groups over the classes
+    (multiset compositions, most balanced first) instead of branching per group.
+    Different prefixes often reach the same per-class state; a transposition table keyed by
+    (ladder level, type index, class vectors sorted — accept/bounds are symmetric in the
+    classes) remembers fully explored subtrees without an accepted leaf and skips them
+    (LRU, TT_MAX_ENTRIES). Children/leaves that only a looser ladder level admits go to a
+    frontier; the next level resumes from those nodes instead of the root.
+    Stops after max_results accepted count solutions or max_nodes nodes (over all levels).
+    Returns (level, [(penalty, splits)]) best first, (None, []) if nothing was accepted.
+    """
+    C = len(classes)
+    remaining, bounds = _ladder_bounds(types, base, C, ladder)
+    found = []
+    splits = []
+    frontier = []   # (level, type index, state, splits) held back by a stricter level
+    nodes = 0
+    dead = OrderedDict()
+    level = 0
+
+    def dfs(idx, state):
         nonlocal nodes
         nodes += 1
         if nodes > max_nodes:
+            count("step4.prune.max_nodes")
             return
-        # quick cap check
-        if any(v>25 for v in cnt.values()):
+        if idx == len(types):
+            scored = _score(state, classes, ladder)
+            if scored is None:
+                count("step4.prune.accept")
+            elif scored[0] <= level:
+                found.append((scored[1], list(splits)))
+            else:
+                frontier.append((scored[0], idx, state, list(splits)))
             return
-
-        if idx == len(groups):
-            if accept(cnt, good, boys, girls):
-                p = penalty(cnt, good, boys, girls, classes)
-                results.append((deepcopy(placed), p))
+        key = (level, idx, tuple(sorted(state)))
+        if key in dead:
+            dead.move_to_end(key)
+            count("step4.tt_hits")
             return
+        n_found = len(found)
+        expand(idx, state)
+        if len(found) == n_found and nodes <= max_nodes:
+            dead[key] = True
+            if len(dead) > TT_MAX_ENTRIES:
+                dead.popitem(last=False)
 
-        g = groups[idx]
-        sub = df[df['ΟΝΟΜΑ'].isin(g)]
-        gsize = len(g)
-        ggood = int((sub['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ']=='Ν').sum())
-        gboys = int((sub['ΦΥΛΟ']=='Α').sum())
-        ggirls= int((sub['ΦΥΛΟ']=='Κ').sum())
-
-        # Try target class with lower current population first
-        order = sorted(classes, key=lambda c: (cnt[c], good[c], boys[c]+girls[c]))
-
-        for c in order:
-            # simulate
-            cnt[c]   += gsize
-            good[c]  += ggood
-            boys[c]  += gboys
-            girls[c] += ggirls
-            placed[tuple(g)] = c
-
-            # fast pre-prune: if pop diff already >2 discard branch
-            if (max(cnt.values()) - min(cnt.values())) <= 2:
-                dfs(idx+1, cnt, good, boys, girls)
-
-            # revert
-            placed.pop(tuple(g), None)
-            cnt[c]   -= gsize
-            good[c]  -= ggood
-            boys[c]  -= gboys
-            girls[c] -= ggirls
-
-            if len(results) >= max_results:
+    def expand(idx, state):
+        v, gs = types[idx]
+        children = []
+        for split in _compositions(len(gs), C):
+            new = _add_split(state, split, v)
+            tag = _bound_level(new, remaining[idx], bounds)
+            if tag is None:
+                count("step4.prune.bounds")
+            elif tag > level:
+                frontier.append((tag, idx + 1, new, splits + [split]))
+            else:
+                children.append((max(vec[0] for vec in new) - min(vec[0] for vec in new), split, new))
+        # Try the most balanced populations first
+        children.sort(key=lambda t: t[0])
+        for _, split, new in children:
+            splits.append(split)
+            dfs(idx + 1, new)
+            splits.pop()
+            if len(found) >= max_results or nodes > max_nodes:
                 return
 
-    dfs(0, base_cnt.copy(), base_good.copy(), base_boys.copy(), base_girls.copy())
+    dfs(0, base)
+    while not found and nodes <= max_nodes and level + 1 < len(ladder):
+        level += 1
+        roots = [f for f in frontier if f[0] <= level]
+        frontier = [f for f in frontier if f[0] > level]
+        count("step4.relax.released", len(roots))
+        for _, idx, state, prefix in roots:
+            splits[:] = prefix
+            dfs(idx, state)
+            if len(found) >= max_results or nodes > max_nodes:
+                break
+    count("step4.nodes", min(nodes, max_nodes))
+    found.sort(key=lambda t: t[0])
+    return (level if found else None), found
+
+# -------------------- Main --------------------
 
-    results_sorted = sorted(results, key=lambda t: t[1])[:max_results]
-    return results_sorted
+def _step4_solve(df, assigned_column, num_classes, max_results, max_nodes, engine, ladder):
+    """Shared body of apply_step4_strict / apply_step4_relaxed → (level or None, placements)."""
+    if engine not in ("auto", "batch", "dfs", "dp"):
+        raise ValueError(f"Unknown engine: {engine!r} (auto | batch | dfs | dp)")
+    classes = [f'Α{i+1}' for i in range(num_classes)]
+    base_cnt = {c: int((df[assigned_column]==c).sum()) for c in classes}
+    base_good= {c: int(((df[assigned_column]==c) & (df['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ']=='Ν')).sum()) for c in classes}
+    base_boys= {c: int(((df[assigned_column]==c) & (df['ΦΥΛΟ']=='Α')).sum()) for c in classes}
+    base_girls={c: int(((df[assigned_column]==c) & (df['ΦΥΛΟ']=='Κ')).sum()) for c in classes}
+
+    groups = create_fully_mutual_groups(df, assigned_column)
+    count("step4.groups", len(groups))
+    if not groups:
+        return None, []
+
+    # Heuristic order: larger & more "informative" groups first
+    vectors = {tuple(g): _group_vector(g, df) for g in groups}
+    def gkey(g):
+        size, good, boys, girls = vectors[tuple(g)]
+        # prioritize: size desc, |boys-girls| desc, good desc
+        return (-size, -abs(boys-girls), -good)
+    groups = sorted(groups, key=gkey)
+    types = _group_types(groups, [vectors[tuple(g)] for g in groups])
+    count("step4.types", len(types))
+
+    base = tuple((base_cnt[c], base_good[c], base_boys[c], base_girls[c]) for c in classes)
+    solved = None
+    combos = math.prod(math.comb(len(gs) + num_classes - 1, num_classes - 1) for _, gs in types)
+    if engine == "batch" or (engine == "auto" and num_classes >= 2 and combos <= BATCH_MAX_COMBOS):
+        solved = _step4_batch(types, base, classes, max_results, ladder=ladder)
+    elif engine in ("dp", "auto"):
+        solved = _step4_dp(types, base, classes, max_results, max_nodes, ladder=ladder)
+    if solved is None and engine in ("dfs", "auto"):
+        # "auto": DP state budget exceeded → bounded DFS (first max_results found)
+        solved = _step4_dfs(types, base, classes, max_results, max_nodes, ladder=ladder)
+    level, found = solved or (None, [])
+    return level, _expand(found, types, groups, classes, max_results)
+
+def apply_step4_strict(df, assigned_column='ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1', num_classes=2, max_results=5, max_nodes=200000,
+                       engine="auto"):
+    """
+    Place fully mutual groups under strict acceptance; groups are handled by type (signature).
+    engine: "auto" | "batch" | "dp" | "dfs" (see module docstring); max_nodes bounds DFS nodes / DP states.
+    Returns a list of tuples: (placed_dict, penalty_score)
+    """
+    return _step4_solve(df, assigned_column, num_classes, max_results, max_nodes, engine, (DIFF_LIMITS,))[1]
+
+def apply_step4_relaxed(df, assigned_column='ΒΗΜΑ3_ΣΕΝΑΡΙΟ_1', num_classes=2, max_results=5, max_nodes=200000,
+                        engine="auto", ladder=RELAX_LADDER):
+    """
+    Like apply_step4_strict, but if the strict thresholds admit nothing the next ladder level
+    (pop, good, boys, girls limits) is tried, resuming from the held-back frontier.
+    Returns {"results": [(placed_dict, penalty_score)], "level": index into ladder or None,
+             "thresholds": accept() keyword thresholds of that level or None}.
+    """
+    ladder = tuple(tuple(limits) for limits in ladder)
+    if not ladder or any(len(limits) != 4 or limits[2] != limits[3] for limits in ladder):
+        raise ValueError("ladder: non-empty sequence of (pop, good, boys, girls) limits, boys == girls")
+    if any(b < a for prev, cur in zip(ladder, ladder[1:]) for a, b in zip(prev, cur)):
+        raise ValueError("ladder: each level must be at least as loose as the previous one")
+    level, results = _step4_solve(df, assigned_column, num_classes, max_results, max_nodes, engine, ladder)
+    if level:
+        count("step4.relaxed")
+    return {"results": results, "level": level,
+            "thresholds": _thresholds(ladder[level]) if level is not None else None}
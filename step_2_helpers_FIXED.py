@@ -1,65 +1,17 @@
 
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Set
-import pandas as pd, re, ast
+from typing import Dict, Set
+import pandas as pd
 
-COLUMN_FIXES = {
-    "Î–Î©Î—Î¡ÎŸÎ£": "ΖΩΗΡΟΣ",
-    "ΖΩΗΡΟΙ": "ΖΩΗΡΟΣ",
-    "Î™Î”Î™Î‘Î™Î¤Î•Î¡ÎŸÎ¤Î—Î¤Î‘": "ΙΔΙΑΙΤΕΡΟΤΗΤΑ",
-    "ΙΔΙΑΙΤΕΡΟΤΗΤΕΣ": "ΙΔΙΑΙΤΕΡΟΤΗΤΑ",
-    "Î Î‘Î™Î”Î™_Î•ÎšÎ Î‘Î™Î”Î•Î¥Î¤Î™ÎšÎŸÎ¥": "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ",
-    "ΠΑΙΔΙ ΕΚΠΑΙΔΕΥΤΙΚΟΥ": "ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ",
-    "ÎŸÎ�ÎŸÎœÎ‘": "ΟΝΟΜΑ",
-    "ΟΝΟΜΑΤΕΠΩΝΥΜΟ": "ΟΝΟΜΑ",
-    "ΣΥΓΚΡΟΥΣΗ/CONFLICT": "ΣΥΓΚΡΟΥΣΗ",
-    "ΓΝΩΣΗ ΕΛΛ.": "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ",
-    "ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ": "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ",
-}
-
-SAFE_SEP = re.compile(r"[,\|\;/·\n]+")
+from roster_normalize import YES_VALUES, normalize_roster, value_key
+from friends_parser import parse_friends_cell
 
 def norm_yesno(val: object) -> str:
-    s = str(val).strip().upper()
-    return "Ν" if s in {"Ν","ΝΑΙ","YES","TRUE","1","Y","Τ","ΑΙΣ","NAI"} else "Ο"
+    return "Ν" if value_key(val) in YES_VALUES else "Ο"
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    rename = {}
-    for c in df.columns:
-        cc = str(c).strip()
-        if cc in COLUMN_FIXES:
-            rename[c] = COLUMN_FIXES[cc]
-        elif cc.upper() == "GENDER":
-            rename[c] = "ΦΥΛΟ"
-        elif "ΦΙΛ" in cc.upper() and cc != "ΦΙΛΟΙ":
-            rename[c] = "ΦΙΛΟΙ"
-    if rename:
-        df = df.rename(columns=rename)
-    # Value normalization for the key boolean-like cols
-    for col in ["ΖΩΗΡΟΣ","ΙΔΙΑΙΤΕΡΟΤΗΤΑ","ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ","ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ"]:
-        if col in df.columns:
-            df[col] = df[col].map(norm_yesno)
-    if "ΟΝΟΜΑ" in df.columns:
-        df["ΟΝΟΜΑ"] = df["ΟΝΟΜΑ"].astype(str).str.strip()
-    return df
-
-def parse_friends_cell(x) -> List[str]:
-    if isinstance(x, list):
-        return [str(s).strip() for s in x if str(s).strip()]
-    if pd.isna(x):
-        return []
-    s = str(x).strip()
-    if not s:
-        return []
-    try:
-        v = ast.literal_eval(s)
-        if isinstance(v, list):
-            return [str(t).strip() for t in v if str(t).strip()]
-    except Exception:
-        pass
-    parts = SAFE_SEP.split(s)
-    return [p.strip() for p in parts if p.strip() and p.strip().lower() != "nan"]
+    # Ενιαία μηχανή (roster_normalize): ήδη κανονικοποιημένο df → απλό αντίγραφο
+    return normalize_roster(df, fill_missing_flags=False)
 
 def are_mutual_friends(df: pd.DataFrame, a: str, b: str) -> bool:
     ra = df[df["ΟΝΟΜΑ"].astype(str) == str(a)]
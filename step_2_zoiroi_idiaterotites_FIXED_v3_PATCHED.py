@@ -5,7 +5,8 @@ Step 2 — Ζωηροί & Ιδιαιτερότητες (Fixed v3, **patched**)
   όπου k είναι ο αριθμός από το step1_col_name (π.χ. ΒΗΜΑ1_ΣΕΝΑΡΙΟ_2 -> k=2).
 - Όλα τα υπόλοιπα παραμένουν συμβατά.
 """
-from typing import List, Dict, Tuple, Any, Set
+from collections import Counter
+from typing import List, Dict, Tuple, Any, Set, Optional
 import pandas as pd
 import random
 import re
@@ -13,10 +14,14 @@ import re
 from step_2_helpers_FIXED import (
     normalize_columns, parse_friends_cell, scope_step2, mutual_pairs_in_scope
 )
+from instrumentation import count
 
 RANDOM_SEED = 42
 random.seed(RANDOM_SEED)
 
+# Όριο κόμβων του DSATUR prechecks· πέρα από αυτό η απόφαση αφήνεται στην κύρια αναζήτηση
+PRECHECK_MAX_NODES = 20000
+
 
 def _pair_conflict_penalty(aZ, aI, bZ, bI) -> int:
     if aI and bI:
@@ -120,59 +125,152 @@ def _compute_targets_global(
     }
 
 
-def _prereject(assign_map, next_name, next_cl, df, step1_col, class_labels, targets) -> bool:
-    """Γρήγορο pruning πριν από απόπειρα ανάθεσης."""
-    Zc = targets["Z_step1"].copy()
-    Ic = targets["I_step1"].copy()
-    tmp = assign_map.copy()
-    if next_name and next_cl:
-        tmp[next_name] = next_cl
+def _extract_step1_id(step1_col_name: str) -> int:
+    """
+    Επιστρέφει τον αριθμό k από «ΒΗΜΑ1_ΣΕΝΑΡΙΟ_k» ή «V1_ΣΕΝΑΡΙΟ_k».
+    Αν δεν βρεθεί, επιστρέφει 1.
+    """
+    m = re.search(r'(?:ΒΗΜΑ1_|V1_)ΣΕΝΑΡΙΟ[_\s]*(\d+)', str(step1_col_name))
+    if not m:
+        return 1
+    return int(m.group(1))
 
-    # Προσωρινή καταμέτρηση Ζ/Ι αν μπει το next
-    for n, cl in tmp.items():
-        row = df[df["ΟΝΟΜΑ"] == n].iloc[0]
-        if str(row.get("ΖΩΗΡΟΣ", "")).strip() == "Ν":
-            Zc[cl] += 1
-        if str(row.get("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "")).strip() == "Ν":
-            Ic[cl] += 1
 
-    # Upper bounds per targets
+def _interchangeable_classes(df: pd.DataFrame, step1_col: str, class_labels: List[str],
+                             to_place: List[str], scope: Set[str]) -> List[List[str]]:
+    """
+    Ομάδες τμημάτων που είναι ισοδύναμα για την αναζήτηση του Βήματος 2 (ίδια σειρά με class_labels).
+    Δύο τμήματα είναι εναλλάξιμα όταν έχουν ίδια σύνθεση Βήματος 1 (πλήθη ανά Ζ/Ι/παιδί εκπαιδευτικού)
+    και ΚΑΝΕΝΑ από τα μέλη τους δεν έχει σύγκρουση ή αμοιβαία φιλία (στο scope) με μαθητή προς τοποθέτηση·
+    τότε κάθε ανάθεση και η «μετονομασία» της έχουν ίδιο pruning και ίδια μετρικά.
+    """
+    movers = set(to_place)
+    yes = lambda v: str(v).strip() == "Ν"
+    related: Set[str] = set()
+    fixed: Dict[str, List[Tuple[str, bool, bool, bool]]] = {cl: [] for cl in class_labels}
+    for _, r in df.iterrows():
+        name = str(r.get("ΟΝΟΜΑ", "")).strip()
+        conf = set(parse_friends_cell(r.get("ΣΥΓΚΡΟΥΣΗ", ""))) if "ΣΥΓΚΡΟΥΣΗ" in df.columns else set()
+        cl = r.get(step1_col)
+        if pd.notna(cl) and str(cl) in fixed:
+            fixed[str(cl)].append((name, yes(r.get("ΖΩΗΡΟΣ", "")), yes(r.get("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "")),
+                                   yes(r.get("ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ", ""))))
+            if conf & movers:
+                related.add(name)
+        elif name in movers:
+            related |= conf
+    for a, b in mutual_pairs_in_scope(df, scope):
+        if a in movers:
+            related.add(b)
+        if b in movers:
+            related.add(a)
+
+    groups: Dict[Any, List[str]] = {}
     for cl in class_labels:
-        if Zc[cl] > targets["Z"]["max"]:
-            return False
-        if Ic[cl] > targets["I"]["max"]:
-            return False
+        members = fixed[cl]
+        if any(name in related for name, *_ in members):
+            key = ("distinct", cl)
+        else:
+            key = frozenset(Counter(tuple(flags) for _, *flags in members).items())
+        groups.setdefault(key, []).append(cl)
+    return list(groups.values())
 
-    # Γρήγορος έλεγχος συγκρούσεων με fixed/partial της ίδιας τάξης
-    if next_name and next_cl and "ΣΥΓΚΡΟΥΣΗ" in df.columns:
-        mask_next = (df["ΟΝΟΜΑ"] == next_name)
-        next_conf_cell = df.loc[mask_next, "ΣΥΓΚΡΟΥΣΗ"]
-        toks_next = set(parse_friends_cell(next_conf_cell.values[0] if not next_conf_cell.empty else ""))
 
-        fixed_same = df[(pd.notna(df[step1_col])) & (df[step1_col] == next_cl)]
-        if any((n in toks_next) for n in fixed_same["ΟΝΟΜΑ"].astype(str).tolist()):
-            return False
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
 
-        for n2, cl2 in tmp.items():
-            if cl2 != next_cl:
+def _dsatur_colorable(domains: List[int], conf_mask: List[int],
+                      max_nodes: int = PRECHECK_MAX_NODES) -> Optional[bool]:
+    """
+    Χρωματισμός-λίστας του γράφου συγκρούσεων (κόμβοι = μαθητές, χρώματα = τμήματα, πεδία =
+    προ-χρωματισμοί από fixed συγκρούσεις) με DSATUR backtracking: επόμενος ο πιο «κορεσμένος»
+    κόμβος (λιγότερα διαθέσιμα χρώματα, μετά περισσότεροι αχρωμάτιστοι γείτονες).
+    True/False = απόφαση, None = ξεπεράστηκε το max_nodes.
+    """
+    nodes = [j for j in range(len(domains)) if conf_mask[j]]
+    color = {j: -1 for j in nodes}
+    budget = [max_nodes]
+
+    def avail(j: int) -> int:
+        d = domains[j]
+        for u in nodes:
+            if conf_mask[j] >> u & 1 and color[u] >= 0:
+                d &= ~(1 << color[u])
+        return d
+
+    def solve(left: List[int]) -> Optional[bool]:
+        if not left:
+            return True
+        budget[0] -= 1
+        if budget[0] < 0:
+            return None
+        j = min(left, key=lambda u: (_popcount(avail(u)),
+                                     -sum(1 for w in left if conf_mask[u] >> w & 1)))
+        d = avail(j)
+        if not d:
+            return False
+        rest = [u for u in left if u != j]
+        unknown = False
+        for k in range(d.bit_length()):
+            if not d >> k & 1:
                 continue
-            mask_n2 = (df["ΟΝΟΜΑ"] == n2)
-            n2_conf_cell = df.loc[mask_n2, "ΣΥΓΚΡΟΥΣΗ"]
-            toks2 = set(parse_friends_cell(n2_conf_cell.values[0] if not n2_conf_cell.empty else ""))
-            if (next_name in toks2) or (n2 in toks_next):
-                return False
-    return True
+            color[j] = k
+            res = solve(rest)
+            color[j] = -1
+            if res:
+                return True
+            unknown |= res is None
+        return None if unknown else False
 
+    return solve(nodes)
 
-def _extract_step1_id(step1_col_name: str) -> int:
+
+def _clique_overflow(domains: List[int], conf_mask: List[int]) -> bool:
     """
-    Επιστρέφει τον αριθμό k από «ΒΗΜΑ1_ΣΕΝΑΡΙΟ_k» ή «V1_ΣΕΝΑΡΙΟ_k».
-    Αν δεν βρεθεί, επιστρέφει 1.
+    Άπληστες κλίκες συγκρούσεων (μία ανά κόμβο): αν κάποια έχει περισσότερα μέλη από τα
+    τμήματα που επιτρέπουν συνολικά τα πεδία των μελών της, η τοποθέτηση είναι αδύνατη.
     """
-    m = re.search(r'(?:ΒΗΜΑ1_|V1_)ΣΕΝΑΡΙΟ[_\s]*(\d+)', str(step1_col_name))
-    if not m:
-        return 1
-    return int(m.group(1))
+    for j in range(len(conf_mask)):
+        clique, colors = 1 << j, domains[j]
+        for u in sorted((u for u in range(len(conf_mask)) if conf_mask[j] >> u & 1),
+                        key=lambda u: -_popcount(conf_mask[u])):
+            if clique & ~conf_mask[u] == 0:
+                clique |= 1 << u
+                colors |= domains[u]
+        if _popcount(clique) > _popcount(colors):
+            return True
+    return False
+
+
+def _step2_precheck(domains: List[int], conf_mask: List[int], isZ: List[bool], isI: List[bool],
+                    z_cnt: List[int], i_cnt: List[int], targets: Dict[str, Any]) -> Optional[str]:
+    """
+    Γρήγορος έλεγχος αδυνατότητας πριν από την αναζήτηση. Επιστρέφει τον λόγο
+    (step1_over_max | zi_capacity | empty_domain | conflict_clique | conflict_coloring) ή None.
+    """
+    for flags, counts, t in ((isZ, z_cnt, targets["Z"]), (isI, i_cnt, targets["I"])):
+        if max(counts, default=0) > t["max"]:
+            return "step1_over_max"
+        movers = sum(flags)
+        if sum(t["max"] - c for c in counts) < movers or sum(max(0, t["q"] - c) for c in counts) > movers:
+            return "zi_capacity"
+    if not all(domains):
+        return "empty_domain"
+    if _clique_overflow(domains, conf_mask):
+        return "conflict_clique"
+    if _dsatur_colorable(domains, conf_mask) is False:
+        return "conflict_coloring"
+    return None
+
+
+def _selection_key(ped_cnt: int, broken: int, total: int) -> Tuple[int, int, int]:
+    """
+    Ενιαίο κλειδί των κριτηρίων επιλογής (μικρότερο = καλύτερο):
+    με 0 παιδαγωγικές συγκρούσεις → (broken, total)· αλλιώς → (total, broken).
+    Τα σενάρια με 0 συγκρούσεις προηγούνται πάντα.
+    """
+    return (0, broken, total) if ped_cnt == 0 else (1, total, broken)
 
 
 def step2_apply_FIXED_v3(
@@ -182,11 +280,17 @@ def step2_apply_FIXED_v3(
     *,
     seed: int = 42,
     max_results: int = 5,
+    search: str = "bnb",
 ) -> List[Tuple[str, pd.DataFrame, Dict[str, Any]]]:
     """
     Επιστρέφει έως max_results σενάρια ως (label, DataFrame, metrics).
     Το DataFrame περιέχει στήλες εισόδου + «ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{k}» όπου k = id του ΒΗΜΑ1_ΣΕΝΑΡΙΟ_k.
+    search="bnb": branch-and-bound — κρατά μόνο τα φύλλα με το καλύτερο _selection_key και κόβει
+    υποδέντρα με κάτω φράγμα χειρότερο από αυτό· search="exhaustive": όλα τα εφικτά φύλλα.
+    Και τα δύο δίνουν την ίδια επιλογή σεναρίων.
     """
+    if search not in ("bnb", "exhaustive"):
+        raise ValueError(f"Άγνωστο search: {search!r} (bnb | exhaustive)")
     random.seed(seed)
     df = normalize_columns(df_in).copy()
     class_labels = [f"Α{i+1}" for i in range(num_classes)]
@@ -196,7 +300,14 @@ def step2_apply_FIXED_v3(
     to_place = df[(pd.isna(df[step1_col_name])) & ((df["ΖΩΗΡΟΣ"] == "Ν") | (df["ΙΔΙΑΙΤΕΡΟΤΗΤΑ"] == "Ν"))]["ΟΝΟΜΑ"].astype(str).tolist()
     targets = _compute_targets_global(df, step1_col=step1_col_name, class_labels=class_labels)
 
-    best: List[Tuple[pd.DataFrame, int, int, int, int]] = []
+    # Symmetry breaking: σε κάθε ομάδα εναλλάξιμων τμημάτων «ανοίγει» πρώτα το 1ο, μετά το 2ο, ...
+    # → κάθε διαμέριση παράγεται μία φορά (όχι m! φορές με μετονομασμένες ετικέτες)
+    class_groups = _interchangeable_classes(df, step1_col_name, class_labels, to_place, scope)
+    group_of = {cl: g for g, members in enumerate(class_groups) for cl in members}
+    rank_in_group = {cl: members.index(cl) for members in class_groups for cl in members}
+    opened = [0] * len(class_groups)
+
+    best: List[Tuple[Dict[str, str], int, int, int, int]] = []
     assign: Dict[str, str] = {}
 
     # Σειρά δυσκολίας
@@ -217,52 +328,204 @@ def step2_apply_FIXED_v3(
         ),
     )
 
-    def backtrack(i: int) -> None:
-        if i == len(to_place_sorted):
-            cand = df.copy()
-            cand_col = "ΒΗΜΑ2_TMP"
-            cand[cand_col] = cand[step1_col_name]
-            for n, cl in assign.items():
-                cand.loc[cand["ΟΝΟΜΑ"] == n, cand_col] = cl
-
+    # Forward checking: πεδίο κάθε μαθητή = bitset τμημάτων (bit k ↔ class_labels[k]).
+    # Κανόνες: σύγκρουση με fixed/ήδη τοποθετημένους του τμήματος + άνω όρια Ζ/Ι· εφαρμόζονται
+    # αμέσως σε ΟΛΟΥΣ τους ανεκχώρητους → κενό πεδίο ή ανέφικτα κάτω όρια = άμεσο backtrack.
+    yes = lambda v: str(v).strip() == "Ν"
+    has_conf = "ΣΥΓΚΡΟΥΣΗ" in df.columns
+    rows: Dict[str, Any] = {}
+    fixed_by_class: Dict[str, Set[str]] = {cl: set() for cl in class_labels}
+    type_cnt: List[Counter] = [Counter() for _ in class_labels]
+    base_class: Dict[str, str] = {}
+    for _, r in df.iterrows():
+        rows.setdefault(str(r["ΟΝΟΜΑ"]), r)
+        cl = r.get(step1_col_name)
+        if pd.isna(cl):
+            continue
+        base_class[str(r["ΟΝΟΜΑ"]).strip()] = str(cl)
+        if str(cl) in fixed_by_class:
+            fixed_by_class[str(cl)].add(str(r["ΟΝΟΜΑ"]))
+            t = (yes(r.get("ΖΩΗΡΟΣ", "")), yes(r.get("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "")))
+            if any(t):
+                type_cnt[class_labels.index(str(cl))][t] += 1
+    isZ = [yes(rows[n].get("ΖΩΗΡΟΣ", "")) for n in to_place_sorted]
+    isI = [yes(rows[n].get("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "")) for n in to_place_sorted]
+    toks = [set(parse_friends_cell(rows[n].get("ΣΥΓΚΡΟΥΣΗ", ""))) if has_conf else set()
+            for n in to_place_sorted]
+    conf_mask = [0] * len(to_place_sorted)
+    for a in range(len(to_place_sorted)):
+        for b in range(a + 1, len(to_place_sorted)):
+            if to_place_sorted[b] in toks[a] or to_place_sorted[a] in toks[b]:
+                conf_mask[a] |= 1 << b
+                conf_mask[b] |= 1 << a
+
+    Zmax, Imax = targets["Z"]["max"], targets["I"]["max"]
+    Zq, Iq = targets["Z"]["q"], targets["I"]["q"]
+    z_cnt = [targets["Z_step1"][cl] for cl in class_labels]
+    i_cnt = [targets["I_step1"][cl] for cl in class_labels]
+    full = (1 << len(class_labels)) - 1
+    domains = []
+    for j in range(len(to_place_sorted)):
+        d = full
+        for k, cl in enumerate(class_labels):
+            if (toks[j] & fixed_by_class[cl]) or (isZ[j] and z_cnt[k] >= Zmax) or (isI[j] and i_cnt[k] >= Imax):
+                d &= ~(1 << k)
+        domains.append(d)
+
+    def lower_bounds_ok(free: List[int], doms: List[int]) -> bool:
+        """Κάθε τμήμα πρέπει να μπορεί ακόμη να φτάσει το q σε Ζ και Ι."""
+        for flags, counts, q in ((isZ, z_cnt, Zq), (isI, i_cnt, Iq)):
+            movers = [j for j in free if flags[j]]
+            if sum(max(0, q - c) for c in counts) > len(movers):
+                return False
+            for k, c in enumerate(counts):
+                if c < q and c + sum(1 for j in movers if doms[j] >> k & 1) < q:
+                    return False
+        return True
+
+    # Μετρικά επιλογής σταδιακά, χωρίς DataFrame ανά φύλλο: οι συγκρούσεις του Βήματος 1
+    # μετρώνται μία φορά και κάθε ανάθεση προσθέτει τα ζεύγη της με τα Ζ/Ι μέλη του τμήματος.
+    k_of = {cl: k for k, cl in enumerate(class_labels)}
+    types = list(zip(isZ, isI))
+    ped_now = _count_ped_conflicts(df, step1_col_name)
+    conf_now = _sum_conflicts(df, step1_col_name)
+    pairs = mutual_pairs_in_scope(df, scope)
+    mover_of = {str(n).strip(): j for j, n in enumerate(to_place_sorted)}
+    pair_info = [(mover_of.get(a), mover_of.get(b), base_class.get(a), base_class.get(b)) for a, b in pairs]
+    placed_at: List[Any] = [None] * len(to_place_sorted)
+    best_key = None
+
+    def add_cost(j: int, k: int) -> Tuple[int, int]:
+        """(νέες παιδαγωγικές συγκρούσεις, νέο penalty) αν ο j μπει στο τμήμα k."""
+        ped = conf = 0
+        for t, c in type_cnt[k].items():
+            p = _pair_conflict_penalty(*types[j], *t)
+            ped += c * (p > 0)
+            conf += c * p
+        return ped, conf
+
+    def broken_now(doms: List[int]) -> int:
+        """Σπασμένα αμοιβαία ζεύγη· για εκκρεμείς μαθητές κάτω φράγμα από τα πεδία τους."""
+        n_broken = 0
+        for ja, jb, ca, cb in pair_info:
+            da = doms[ja] if ja is not None and placed_at[ja] is None else 0
+            db = doms[jb] if jb is not None and placed_at[jb] is None else 0
+            if ja is not None and not da:
+                ca = placed_at[ja]
+            if jb is not None and not db:
+                cb = placed_at[jb]
+            if da and db:
+                n_broken += not (da & db)
+            elif da:
+                n_broken += not (cb in k_of and da >> k_of[cb] & 1)
+            elif db:
+                n_broken += not (ca in k_of and db >> k_of[ca] & 1)
+            else:
+                n_broken += ca != cb
+        return n_broken
+
+    def bound_key(free: List[int], doms: List[int]) -> Tuple[int, int, int]:
+        """Admissible κάτω φράγμα του _selection_key για κάθε φύλλο του υποδέντρου."""
+        ped_lb, conf_lb = ped_now, conf_now
+        for u in free:
+            costs = [add_cost(u, k) for k in range(len(class_labels)) if doms[u] >> k & 1]
+            ped_lb += min(c[0] for c in costs)
+            conf_lb += min(c[1] for c in costs)
+        broken_lb = broken_now(doms)
+        return _selection_key(ped_lb, broken_lb, conf_lb + 5 * broken_lb)
+
+    def backtrack(free: List[int], doms: List[int]) -> None:
+        nonlocal ped_now, conf_now, best_key
+        count("step2.nodes")
+        if not free:
+            count("step2.candidates")
             # reject "όλοι στην ίδια τάξη"
             counts_new = {cl: 0 for cl in class_labels}
             for cl in assign.values():
                 counts_new[cl] += 1
             if sum(counts_new.values()) > 0 and max(counts_new.values()) == sum(counts_new.values()):
+                count("step2.prune.same_class")
                 return
 
             # έλεγχος στόχων Ζ/Ι
-            Zc = targets["Z_step1"].copy()
-            Ic = targets["I_step1"].copy()
-            for n, cl in assign.items():
-                row = df[df["ΟΝΟΜΑ"] == n].iloc[0]
-                if str(row.get("ΖΩΗΡΟΣ", "")).strip() == "Ν":
-                    Zc[cl] += 1
-                if str(row.get("ΙΔΙΑΙΤΕΡΟΤΗΤΑ", "")).strip() == "Ν":
-                    Ic[cl] += 1
-            for cl in class_labels:
-                if not (targets["Z"]["q"] <= Zc[cl] <= targets["Z"]["max"]):
+            for k in range(len(class_labels)):
+                if not (Zq <= z_cnt[k] <= Zmax) or not (Iq <= i_cnt[k] <= Imax):
+                    count("step2.prune.zi_targets")
                     return
-                if not (targets["I"]["q"] <= Ic[cl] <= targets["I"]["max"]):
+
+            broken = broken_now(doms)
+            total = conf_now + 5 * broken
+            key = _selection_key(ped_now, broken, total)
+            if search == "bnb":
+                if best_key is not None and key > best_key:
                     return
+                if best_key is None or key < best_key:
+                    best.clear()
+                    best_key = key
+            best.append((dict(assign), ped_now, broken, total, conf_now))
+            count("step2.solutions")
+            return
 
-            ped_cnt = _count_ped_conflicts(cand, cand_col)
-            conf_sum = _sum_conflicts(cand, cand_col)
-            broken = _broken_mutual_pairs(cand, cand_col, scope)
-            total = conf_sum + 5 * broken
-            best.append((cand, ped_cnt, broken, total, conf_sum))
+        if search == "bnb" and best_key is not None and bound_key(free, doms) > best_key:
+            count("step2.prune.bound")
             return
 
-        name = to_place_sorted[i]
-        for cl in class_labels:
-            if not _prereject(assign, name, cl, df, step1_col_name, class_labels, targets):
+        # MRV: ο μαθητής με τα λιγότερα διαθέσιμα τμήματα (ισοβαθμία → στατική σειρά δυσκολίας)
+        j = min(free, key=lambda u: (bin(doms[u]).count("1"), u))
+        name = to_place_sorted[j]
+        rest = [u for u in free if u != j]
+        for k, cl in enumerate(class_labels):
+            if not doms[j] >> k & 1:
                 continue
-            assign[name] = cl
-            backtrack(i + 1)
-            del assign[name]
-
-    backtrack(0)
+            g = group_of[cl]
+            if rank_in_group[cl] > opened[g]:
+                count("step2.prune.symmetry")
+                continue
+            z_cnt[k] += isZ[j]
+            i_cnt[k] += isI[j]
+            bit = 1 << k
+            new_doms = list(doms)
+            wiped = False
+            for u in rest:
+                d = doms[u]
+                if (conf_mask[j] >> u & 1) or (isZ[u] and z_cnt[k] >= Zmax) or (isI[u] and i_cnt[k] >= Imax):
+                    d &= ~bit
+                    if not d:
+                        wiped = True
+                        break
+                new_doms[u] = d
+            if wiped:
+                count("step2.prune.wipeout")
+            elif not lower_bounds_ok(rest, new_doms):
+                count("step2.prune.lower_bound")
+            else:
+                prev_opened = opened[g]
+                opened[g] = max(prev_opened, rank_in_group[cl] + 1)
+                d_ped, d_conf = add_cost(j, k)
+                ped_now += d_ped
+                conf_now += d_conf
+                type_cnt[k][types[j]] += 1
+                placed_at[j] = cl
+                assign[name] = cl
+                backtrack(rest, new_doms)
+                del assign[name]
+                placed_at[j] = None
+                type_cnt[k][types[j]] -= 1
+                ped_now -= d_ped
+                conf_now -= d_conf
+                opened[g] = prev_opened
+            z_cnt[k] -= isZ[j]
+            i_cnt[k] -= isI[j]
+
+    # Precheck (χωρητικότητες Ζ/Ι, κλίκες/DSATUR συγκρούσεων): αδύνατο → κατευθείαν pass-through
+    root = list(range(len(to_place_sorted)))
+    reason = _step2_precheck(domains, conf_mask, isZ, isI, z_cnt, i_cnt, targets)
+    if reason is None and not lower_bounds_ok(root, domains):
+        reason = "zi_lower_bounds"
+    if reason is not None:
+        count("step2.prune.root")
+    else:
+        backtrack(root, domains)
 
     # Αν δεν βρέθηκε τίποτα, «pass-through»
     if not best:
@@ -270,14 +533,15 @@ def step2_apply_FIXED_v3(
         # Στήλη Β2: να πάρει id από το step1_col_name
         base_id = _extract_step1_id(step1_col_name)
         tmp[f"ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{base_id}"] = tmp[step1_col_name]
-        return [("option_1", tmp, {"ped_conflicts": None, "broken": None, "penalty": None})]
+        return [("option_1", tmp, {"ped_conflicts": None, "broken": None, "penalty": None,
+                                   "reason": reason or "no_solution"})]
 
     # --- Επιλογή σεναρίων ---
     zero_ped = [x for x in best if x[1] == 0]
     selected = []
 
     # Για ρητή ορολογία «διατηρημένες φιλίες», υπολογίζουμε το σταθερό πλήθος συνολικών αμοιβαίων
-    total_pairs = len(mutual_pairs_in_scope(df, scope))
+    total_pairs = len(pairs)
 
     if zero_ped:
         # 1) λιγότερα broken
@@ -308,12 +572,14 @@ def step2_apply_FIXED_v3(
     # --- Κατασκευή αποτελεσμάτων ---
     results: List[Tuple[str, pd.DataFrame, Dict[str, Any]]] = []
     base_id = _extract_step1_id(step1_col_name)
-    for k, (cand, ped_cnt, broken, total, conf_sum) in enumerate(selected, start=1):
-        out = cand.copy()
+    for k, (placement, ped_cnt, broken, total, conf_sum) in enumerate(selected, start=1):
+        count("step2.df_copies")
+        out = df.copy()
         # ΠΑΝΤΑ οριστικοποιούμε τη στήλη ως «ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{base_id}»
         final_col = f"ΒΗΜΑ2_ΣΕΝΑΡΙΟ_{base_id}"
-        out[final_col] = out["ΒΗΜΑ2_TMP"]
-        out.drop(columns=["ΒΗΜΑ2_TMP"], inplace=True)
+        out[final_col] = out[step1_col_name]
+        for n, cl in placement.items():
+            out.loc[out["ΟΝΟΜΑ"] == n, final_col] = cl
         results.append(
             (
                 f"option_{k}",
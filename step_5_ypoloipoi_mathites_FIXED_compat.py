@@ -11,19 +11,33 @@ Forward/Backward compatible Βήμα 5, συμβατό με:
 
 Tip: Αν έχεις ήδη ενσωματώσει το utils/schema.normalize_dataset & ensure_step5_6_columns,
 το παρόν module θα λειτουργεί «out of the box».
+
+Μέθοδοι τοποθέτησης (step5_filikoi_omades(..., method=...)):
+- "bulk" (default): όλοι οι υπόλοιποι μαζί — ταξινόμηση ανά τύπο (φύλο, γνώση ελληνικών),
+  μοίρασμα στο τμήμα με το μικρότερο κόστος και τοπικό polish σε διανύσματα πλήθους
+  (πληθυσμός, αγόρια, κορίτσια, καλή γνώση). O(n log n), χωρίς τυχαιότητα.
+- "sequential": η παλιά τοποθέτηση ένας-ένας (πληθυσμός, μετά φύλο, random.choice).
 """
 
 from __future__ import annotations
-import random, re
+import heapq, random, re
 from typing import List, Dict, Tuple, Any, Optional
 import pandas as pd
 
+from friends_parser import parse_friends_cell, parse_friends_column
+from instrumentation import count
+
 RANDOM_SEED = 42
 random.seed(RANDOM_SEED)
 
 YES_TOKENS = {"Ν", "ΝΑΙ", "YES", "Y", "TRUE", "1"}
 NO_TOKENS  = {"Ο", "ΟΧΙ", "NO", "N", "FALSE", "0"}
 
+STEP5_METHODS = ("bulk", "sequential")
+MAX_PER_CLASS = 25
+POLISH_MAX_MOVES = 1000        # ανώτατο πλήθος βελτιώσεων στο polish της "bulk"
+_WEIGHTS = (3, 2, 2, 1)        # πληθυσμός, αγόρια, κορίτσια, καλή γνώση — βάρη του calculate_penalty_score
+
 def _norm_str(x) -> str:
     return str(x).strip().upper()
 
@@ -33,22 +47,7 @@ def _is_yes(x) -> bool:
 def _is_no(x) -> bool:
     return _norm_str(x) in NO_TOKENS
 
-def _parse_list_cell(x) -> List[str]:
-    if isinstance(x, list):
-        return [str(t).strip() for t in x if str(t).strip()]
-    s = "" if pd.isna(x) else str(x)
-    s = s.strip()
-    if not s or s.upper()=="NAN":
-        return []
-    # προσπαθησε python list
-    try:
-        v = eval(s, {}, {})
-        if isinstance(v, list):
-            return [str(t).strip() for t in v if str(t).strip()] 
-    except Exception:
-        pass
-    parts = re.split(r"[,\|\;/·\n]+", s)
-    return [p.strip() for p in parts if p.strip()]
+_parse_list_cell = parse_friends_cell   # ενιαίος parser (χωρίς eval)
 
 def _is_good_greek(row: pd.Series) -> bool:
     if "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ" in row:
@@ -57,6 +56,14 @@ def _is_good_greek(row: pd.Series) -> bool:
         return _norm_str(row.get("ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ")) in {"ΚΑΛΗ", "GOOD", "Ν"}
     return False
 
+def _good_greek_mask(df: pd.DataFrame) -> pd.Series:
+    """Ίδιο κριτήριο με _is_good_greek, ανά στήλη αντί ανά γραμμή."""
+    if "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ" in df.columns:
+        return df["ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ"].map(_is_yes).astype(bool)
+    if "ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ" in df.columns:
+        return df["ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ"].map(lambda x: _norm_str(x) in {"ΚΑΛΗ", "GOOD", "Ν"}).astype(bool)
+    return pd.Series(False, index=df.index)
+
 def _labels(df: pd.DataFrame, senario_col: str) -> List[str]:
     labs = sorted([str(v) for v in df[senario_col].dropna().unique() if re.match(r"^Α\d+$", str(v))])
     return labs or [f"Α{i+1}" for i in range(2)]
@@ -93,30 +100,113 @@ def calculate_penalty_score(df: pd.DataFrame, senario_col: str, num_classes: Opt
 
     return int(penalty)
 
-def step5_filikoi_omades(df: pd.DataFrame, senario_col: str, num_classes: Optional[int]=None):
+def _spread_penalty(spread: List[int]) -> int:
+    """calculate_penalty_score χωρίς τις σπασμένες φιλίες, από τις διαφορές max−min (πληθυσμός, αγόρια, κορίτσια, καλή)."""
+    return (max(0, spread[0] - 1) * 3 + max(0, spread[1] - 1) * 2 + max(0, spread[2] - 1) * 2
+            + max(0, spread[3] - 2))
+
+def _sq(v: List[int]) -> int:
+    return sum(w * x * x for w, x in zip(_WEIGHTS, v))
+
+def _place_bulk(df: pd.DataFrame, senario_col: str, labs: List[str], remaining: pd.DataFrame) -> None:
     """
-    Τοποθετεί διαδοχικά τους μη τοποθετημένους μαθητές που ΔΕΝ έχουν πλήρως αμοιβαίες φιλίες,
-    με προτεραιότητα: (1) μικρότερος πληθυσμός, (2) ισορροπία φύλου.
+    Τοποθέτηση όλων των υπολοίπων μαζί. Μαθητές ίδιου τύπου (φύλο, καλή γνώση) είναι
+    ισοδύναμοι για την ποινή, άρα λύνεται πρόβλημα πλήθους ανά (τμήμα, τύπο):
+    (1) ταξινόμηση ανά τύπο (πολυπληθέστεροι πρώτα) και μοίρασμα στο τμήμα με το μικρότερο
+    σταθμισμένο φορτίο στις διαστάσεις του τύπου (heap, O(n log C)), (2) polish με
+    μετακινήσεις/ανταλλαγές τύπων όσο μειώνεται η ποινή των διανυσμάτων πλήθους.
     """
-    df = df.copy()
-    labs = _labels(df, senario_col)
-    if num_classes is None:
-        num_classes = len(labs)
-
+    gender = df["ΦΥΛΟ"].astype(str).str.strip().str.upper()
+    good = _good_greek_mask(df)
+    vecs = [[int((df[senario_col] == lab).sum()),
+             int(((df[senario_col] == lab) & (gender == "Α")).sum()),
+             int(((df[senario_col] == lab) & (gender == "Κ")).sum()),
+             int(((df[senario_col] == lab) & good).sum())] for lab in labs]
+
+    # (1) sort-and-deal
+    rows_by_type: Dict[Tuple[int, int, int, int], List[Any]] = {}
+    for idx in remaining.index:
+        t = (1, int(gender[idx] == "Α"), int(gender[idx] == "Κ"), int(bool(good[idx])))
+        rows_by_type.setdefault(t, []).append(idx)
+    types = sorted(rows_by_type, key=lambda t: (-len(rows_by_type[t]), t))
+    placed = [[0] * len(types) for _ in labs]            # placed[c][t]
+
+    def load(c, dims):
+        return sum(w * vecs[c][d] for d, w in enumerate(_WEIGHTS) if dims[d])
+
+    for t, dims in enumerate(types):
+        heap = [(load(c, dims), c) for c in range(len(labs)) if vecs[c][0] < MAX_PER_CLASS]
+        heapq.heapify(heap)
+        count("step5.candidates", len(heap))
+        for _ in rows_by_type[dims]:
+            if not heap:
+                count("step5.prune.capacity")
+                continue
+            _, c = heapq.heappop(heap)
+            for d in range(4):
+                vecs[c][d] += dims[d]
+            placed[c][t] += 1
+            if vecs[c][0] < MAX_PER_CLASS:
+                heapq.heappush(heap, (load(c, dims), c))
+
+    # (2) polish: μετακίνηση ενός μαθητή τύπου t από a σε b, ή ανταλλαγή τύπων t ↔ u μεταξύ a, b.
+    #     Στόχος (ποινή, σταθμισμένο Σx²) — το 2ο σπάει τις ισοπαλίες προς πιο ισορροπημένα τμήματα.
+    #     Η ποινή πέφτει μόνο αν το a είναι μέγιστο ή το b ελάχιστο σε κάποια διάσταση· τα max/min
+    #     των υπόλοιπων τμημάτων βγαίνουν από τα 3 μεγαλύτερα/μικρότερα ανά διάσταση, κάθε κίνηση σε O(1).
+    C = len(labs)
+    moves = [(t, None, types[t]) for t in range(len(types))]
+    moves += [(t, u, tuple(x - y for x, y in zip(types[t], types[u])))
+              for t in range(len(types)) for u in range(len(types)) if t != u]
+    spread = [max(v[d] for v in vecs) - min(v[d] for v in vecs) for d in range(4)]
+    current = (_spread_penalty(spread), sum(_sq(v) for v in vecs))
+    for _ in range(POLISH_MAX_MOVES):
+        top3 = [heapq.nlargest(3, ((vecs[c][d], c) for c in range(C))) for d in range(4)]
+        bottom3 = [heapq.nsmallest(3, ((vecs[c][d], c) for c in range(C))) for d in range(4)]
+        tops = {ranked[0][1] for ranked in top3}
+        bottoms = {ranked[0][1] for ranked in bottom3}
+        pairs = {(a, b) for a in tops for b in range(C)} | {(a, b) for a in range(C) for b in bottoms}
+        best_move, best_obj = None, current
+        for a, b in sorted(pairs):
+            if a == b:
+                continue
+            hi = [next((x for x, c in ranked if c != a and c != b), float("-inf")) for ranked in top3]
+            lo = [next((x for x, c in ranked if c != a and c != b), float("inf")) for ranked in bottom3]
+            rest_sq = current[1] - _sq(vecs[a]) - _sq(vecs[b])
+            for t, u, delta in moves:
+                if not placed[a][t] or (u is not None and not placed[b][u]):
+                    continue
+                if u is None and vecs[b][0] >= MAX_PER_CLASS:
+                    continue
+                va = [x - k for x, k in zip(vecs[a], delta)]
+                vb = [x + k for x, k in zip(vecs[b], delta)]
+                obj = (_spread_penalty([max(hi[d], va[d], vb[d]) - min(lo[d], va[d], vb[d]) for d in range(4)]),
+                       rest_sq + _sq(va) + _sq(vb))
+                if obj < best_obj:
+                    best_move, best_obj = (a, b, t, u, va, vb), obj
+        if best_move is None:
+            break
+        a, b, t, u, va, vb = best_move
+        vecs[a], vecs[b] = va, vb
+        placed[a][t] -= 1; placed[b][t] += 1
+        if u is not None:
+            placed[b][u] -= 1; placed[a][u] += 1
+        current = best_obj
+        count("step5.polish_moves")
+
+    # Πλήθη → συγκεκριμένοι μαθητές (σειρά εμφάνισης, τμήματα με τη σειρά των labs)
+    for t, dims in enumerate(types):
+        rows = rows_by_type[dims]
+        start = 0
+        for c, lab in enumerate(labs):
+            if placed[c][t]:
+                df.loc[rows[start:start + placed[c][t]], senario_col] = lab
+                start += placed[c][t]
+        count("step5.placed", start)
+
+def _place_sequential(df: pd.DataFrame, senario_col: str, labs: List[str], remaining: pd.DataFrame) -> None:
+    """Παλιά τοποθέτηση ένας-ένας: (1) μικρότερος πληθυσμός, (2) ισορροπία φύλου, random.choice στις ισοπαλίες."""
     classes = {lab: df[df[senario_col] == lab]["ΟΝΟΜΑ"].astype(str).tolist() for lab in labs}
 
-    # --- Mask Step 5: δεν έχουν τοποθέτηση ΚΑΙ (χωρίς φίλους ή όχι-αμοιβαίοι ή σπασμένη φιλία) ---
-    friends_list = df["ΦΙΛΟΙ"].map(_parse_list_cell) if "ΦΙΛΟΙ" in df.columns else pd.Series([[]]*len(df))
-    fully_mut = df["ΠΛΗΡΩΣ_ΑΜΟΙΒΑΙΑ"].apply(_is_yes) if "ΠΛΗΡΩΣ_ΑΜΟΙΒΑΙΑ" in df.columns else pd.Series([False]*len(df))
-    broken    = df["ΣΠΑΣΜΕΝΗ_ΦΙΛΙΑ"].apply(_is_yes) if "ΣΠΑΣΜΕΝΗ_ΦΙΛΙΑ" in df.columns else pd.Series([False]*len(df))
-
-    mask_step5 = (
-        df[senario_col].isna()
-        & ((friends_list.map(len) == 0) | (~fully_mut) | (broken))
-    )
-
-    remaining = df[mask_step5].copy()
-
     for _, row in remaining.iterrows():
         name = str(row["ΟΝΟΜΑ"]).strip()
         gender = str(row["ΦΥΛΟ"]).strip().upper()
@@ -125,7 +215,9 @@ def step5_filikoi_omades(df: pd.DataFrame, senario_col: str, num_classes: Option
         population = {lab: len(classes[lab]) for lab in labs}
         min_pop = min(population.values())
         candidates = [lab for lab, cnt in population.items() if cnt == min_pop and cnt < 25]
+        count("step5.candidates", len(candidates))
         if not candidates:
+            count("step5.prune.capacity")
             continue
 
         if len(candidates) == 1:
@@ -150,13 +242,45 @@ def step5_filikoi_omades(df: pd.DataFrame, senario_col: str, num_classes: Option
 
         df.loc[df["ΟΝΟΜΑ"] == name, senario_col] = chosen
         classes[chosen].append(name)
+        count("step5.placed")
+
+def step5_filikoi_omades(df: pd.DataFrame, senario_col: str, num_classes: Optional[int]=None,
+                         method: str = "bulk"):
+    """
+    Τοποθετεί τους μη τοποθετημένους μαθητές που ΔΕΝ έχουν πλήρως αμοιβαίες φιλίες.
+    method: "bulk" (ισορροπία πληθυσμού/φύλου/γνώσης μαζί) | "sequential" (παλιά συμπεριφορά).
+    """
+    if method not in STEP5_METHODS:
+        raise ValueError(f"Άγνωστη μέθοδος Βήματος 5: {method!r} ({' | '.join(STEP5_METHODS)})")
+    count("step5.df_copies")
+    df = df.copy()
+    labs = _labels(df, senario_col)
+    if num_classes is None:
+        num_classes = len(labs)
+
+    # --- Mask Step 5: δεν έχουν τοποθέτηση ΚΑΙ (χωρίς φίλους ή όχι-αμοιβαίοι ή σπασμένη φιλία) ---
+    friends_list = pd.Series(parse_friends_column(df["ΦΙΛΟΙ"]), index=df.index) if "ΦΙΛΟΙ" in df.columns else pd.Series([[]]*len(df))
+    fully_mut = df["ΠΛΗΡΩΣ_ΑΜΟΙΒΑΙΑ"].apply(_is_yes) if "ΠΛΗΡΩΣ_ΑΜΟΙΒΑΙΑ" in df.columns else pd.Series([False]*len(df))
+    broken    = df["ΣΠΑΣΜΕΝΗ_ΦΙΛΙΑ"].apply(_is_yes) if "ΣΠΑΣΜΕΝΗ_ΦΙΛΙΑ" in df.columns else pd.Series([False]*len(df))
+
+    mask_step5 = (
+        df[senario_col].isna()
+        & ((friends_list.map(len) == 0) | (~fully_mut) | (broken))
+    )
+
+    remaining = df[mask_step5].copy()
+    if method == "bulk":
+        _place_bulk(df, senario_col, labs, remaining)
+    else:
+        _place_sequential(df, senario_col, labs, remaining)
 
     return df, calculate_penalty_score(df, senario_col, num_classes)
 
-def apply_step5_to_all_scenarios(scenarios_dict: Dict[str, pd.DataFrame], senario_col: str, num_classes: Optional[int]=None):
+def apply_step5_to_all_scenarios(scenarios_dict: Dict[str, pd.DataFrame], senario_col: str, num_classes: Optional[int]=None,
+                                 method: str = "bulk"):
     results = {}
     for scenario_name, scenario_df in scenarios_dict.items():
-        updated_df, score = step5_filikoi_omades(scenario_df, senario_col, num_classes)
+        updated_df, score = step5_filikoi_omades(scenario_df, senario_col, num_classes, method=method)
         results[scenario_name] = {"df": updated_df, "penalty_score": score}
 
     min_score = min(v["penalty_score"] for v in results.values()) if results else 0
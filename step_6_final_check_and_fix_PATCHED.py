@@ -10,6 +10,8 @@ from typing import Dict, List, Tuple, Optional
 import pandas as pd
 import numpy as np
 
+from instrumentation import count
+
 # --------------------------
 # Constants / Config
 # --------------------------
@@ -23,6 +25,8 @@ TARGET_POP_DIFF = 2
 TARGET_GENDER_DIFF = 3
 TARGET_LANG_DIFF = 3  # Στόχος: διαφορά γλώσσας ≤3
 
+_AUDIT_COLS = ("ΒΗΜΑ6_ΚΙΝΗΣΗ", "ΑΙΤΙΑ_ΑΛΛΑΓΗΣ", "ΠΗΓΗ_ΒΗΜΑ")
+
 MAX_ITER = 5
 
 # Αποδεκτές τιμές για στήλη ΒΗΜΑ_ΤΟΠΟΘΕΤΗΣΗΣ
@@ -140,6 +144,7 @@ def _apply_swap(df: pd.DataFrame, class_col: str,
                 reason: str, swap_idx: int,
                 step_col: str, group_col: str) -> pd.DataFrame:
     """Εφαρμόζει ανταλλαγή ανάμεσα σε δύο ΣΥΓΚΕΚΡΙΜΕΝΑ τμήματα (N-classes safe)."""
+    count("step6.df_copies")
     df = df.copy()
     if fromA_ids:
         df.loc[df[_IDCOL].isin(fromA_ids), class_col] = to_class_B
@@ -172,17 +177,21 @@ def _rank_candidates(df_before: pd.DataFrame, class_col: str, gender_col: str, l
     ranked = []
 
     for (fromA, classA, fromB, classB, reason) in candidates:
+        count("step6.candidates_evaluated")
         tmp = _apply_swap(df_before, class_col, fromA, classB, fromB, classA, reason, 9999,
                           step_col="ΒΗΜΑ_ΤΟΠΟΘΕΤΗΣΗΣ", group_col="GROUP_ID")
         if not _check_size_ok(tmp, class_col):
+            count("step6.prune.size")
             continue
         M = _metrics(tmp, class_col, gender_col, lang_col)
         d = M["deltas"]
         # 🔒 Population strictness
         if d["pop"] > TARGET_POP_DIFF:
+            count("step6.prune.pop")
             continue
         if base_d["pop"] <= TARGET_POP_DIFF and d["pop"] > base_d["pop"]:
             # μην επιδεινώνεις όταν ήδη εντός στόχου
+            count("step6.prune.pop")
             continue
 
         pen = penalty_score(tmp, class_col, gender_col, lang_col)
@@ -191,9 +200,10 @@ def _rank_candidates(df_before: pd.DataFrame, class_col: str, gender_col: str, l
         pen_gain     = base_pen - pen
 
         # Μη χειροτέρευση του άλλου δείκτη
-        if objective == "LANG"   and dgender_gain < 0: continue
-        if objective == "GENDER" and dlang_gain   < 0: continue
-        if objective == "BOTH"   and (dlang_gain < 0 or dgender_gain < 0): continue
+        if (objective == "LANG" and dgender_gain < 0) or (objective == "GENDER" and dlang_gain < 0) \
+                or (objective == "BOTH" and (dlang_gain < 0 or dgender_gain < 0)):
+            count("step6.prune.objective")
+            continue
 
         if objective in ("GENDER","BOTH"):
             key = (-dgender_gain, -dlang_gain, -pen_gain, len(fromA)+len(fromB))
@@ -308,6 +318,7 @@ def _commit_best_swap_if_improves(df: pd.DataFrame, class_col: str, gender_col:
     else:
         candidates = _enum_BOTH(df, class_col, gender_col, lang_col, step_col, group_col)
 
+    count("step6.candidates", len(candidates))
     ranked = _rank_candidates(df, class_col, gender_col, lang_col, candidates, objective)
     if not ranked: return df, False
 
@@ -318,15 +329,21 @@ def _commit_best_swap_if_improves(df: pd.DataFrame, class_col: str, gender_col:
     for (fromA, classA, fromB, classB, reason) in ranked:
         tmp = _apply_swap(df, class_col, fromA, classB, fromB, classA, reason, swap_idx, step_col, group_col)
         # Σκληροί έλεγχοι
-        if not _check_size_ok(tmp, class_col): continue
-        if not _no_new_broken_friendships(df, tmp, class_col, group_col): continue
+        if not _check_size_ok(tmp, class_col):
+            count("step6.prune.size"); continue
+        if not _no_new_broken_friendships(df, tmp, class_col, group_col):
+            count("step6.prune.friendship"); continue
         # Πληθυσμός: πάντα <=2 και μη-επιδείνωση όταν ήδη εντός
         d = _metrics(tmp, class_col, gender_col, lang_col)["deltas"]
-        if d["pop"] > TARGET_POP_DIFF: continue
-        if base_d["pop"] <= TARGET_POP_DIFF and d["pop"] > base_d["pop"]: continue
+        if d["pop"] > TARGET_POP_DIFF:
+            count("step6.prune.pop"); continue
+        if base_d["pop"] <= TARGET_POP_DIFF and d["pop"] > base_d["pop"]:
+            count("step6.prune.pop"); continue
         # Μείωση penalty
         if penalty_score(tmp, class_col, gender_col, lang_col) < base_pen:
+            count("step6.swaps")
             return tmp, True
+        count("step6.prune.no_gain")
     return df, False
 
 # --------------------------
@@ -404,10 +421,12 @@ def apply_step6(df: pd.DataFrame,
         df = df.copy()
         df[group_col] = np.nan
 
-    # Audit columns
-    for c in ["ΒΗΜΑ6_ΚΙΝΗΣΗ", "ΑΙΤΙΑ_ΑΛΛΑΓΗΣ", "ΠΗΓΗ_ΒΗΜΑ"]:
+    # Audit columns (object όσο γίνονται ανταλλαγές· Categorical στην έξοδο)
+    for c in _AUDIT_COLS:
         if c not in df.columns:
             df[c] = None
+        elif isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(object)
 
     # Iterations
     iterations = 0
@@ -443,6 +462,7 @@ def apply_step6(df: pd.DataFrame,
     if not final_ok:
         status = "IMPOSSIBLE"
 
+    count("step6.iterations", iterations)
     summary = dict(
         iterations=iterations,
         final_deltas=final_M["deltas"],
@@ -464,6 +484,10 @@ def apply_step6(df: pd.DataFrame,
     except Exception:
         pass
     df["ΒΗΜΑ6_ΤΜΗΜΑ"] = df.get("ΤΜΗΜΑ_ΜΕΤΑ_ΒΗΜΑ6", df.get(class_col))
+    # Στήλες ελέγχου: λίγες διακριτές τιμές → Categorical (κωδικοί αντί για strings ανά γραμμή)
+    for c in (*_AUDIT_COLS, "ΜΕΤΑΒΟΛΗ_ΤΜΗΜΑΤΟΣ", "ΤΜΗΜΑ_ΠΡΙΝ_ΒΗΜΑ6"):
+        if c in df.columns:
+            df[c] = df[c].astype("category")
     # Scenario-specific ΒΗΜΑ6_ΣΕΝΑΡΙΟ_N__1 if we detect N from Step 5 columns
     scen_num = None
     import re as _re
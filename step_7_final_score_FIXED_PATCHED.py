@@ -30,6 +30,8 @@ import pandas as pd
 import numpy as np
 import re
 
+from friends_parser import parse_friends_cell, parse_friends_column
+
 RANDOM_SEED = 42
 random.seed(RANDOM_SEED)
 
@@ -47,24 +49,7 @@ def _is_yes(x) -> bool:
 def _is_no(x) -> bool:
     return _norm_str(x) in NO_TOKENS
 
-def _parse_friends_cell(x) -> List[str]:
-    """Δέχεται λίστα ή string. Επιστρέφει λίστα ονομάτων (stripped)."""
-    if isinstance(x, list):
-        return [str(t).strip() for t in x if str(t).strip()]
-    s = str(x) if x is not None else ""
-    s = s.strip()
-    if not s or s.upper() == "NAN":
-        return []
-    # Προσπάθησε python-literal list
-    try:
-        val = eval(s, {}, {})
-        if isinstance(val, list):
-            return [str(t).strip() for t in val if str(t).strip()]
-    except Exception:
-        pass
-    # Αλλιώς split σε κοινούς διαχωριστές
-    parts = re.split(r"[,\|\;/·\n]+", s)
-    return [p.strip() for p in parts if p.strip()]
+_parse_friends_cell = parse_friends_cell   # ενιαίος parser (χωρίς eval)
 
 def _infer_num_classes_from_values(vals: Iterable[str]) -> int:
     """Επιστρέφει #τμημάτων κοιτώντας labels τύπου Α1, Α2, ..."""
@@ -138,11 +123,8 @@ def _mutual_pairs(df: pd.DataFrame) -> List[Tuple[str,str]]:
     """Βρίσκει όλες τις *πλήρως αμοιβαίες* δυάδες από «ΦΙΛΟΙ»."""
     if "ΦΙΛΟΙ" not in df.columns:
         return []
-    name2friends = {}
-    for _, r in df.iterrows():
-        name = str(r.get("ΟΝΟΜΑ")).strip()
-        friends = set(_parse_friends_cell(r.get("ΦΙΛΟΙ")))
-        name2friends[name] = friends
+    names = [str(x).strip() for x in df["ΟΝΟΜΑ"].tolist()] if "ΟΝΟΜΑ" in df.columns else ["None"] * len(df)
+    name2friends = {n: set(fs) for n, fs in zip(names, parse_friends_column(df["ΦΙΛΟΙ"]))}
     pairs = set()
     names = sorted(name2friends.keys())
     for i, a in enumerate(names):
@@ -175,63 +157,208 @@ def _broken_friendships_count(df: pd.DataFrame, scenario_col: str, critical_pair
             broken += 1
     return broken
 
+# ------------------------ Fused scorer (μία διέλευση) ------------------------
+# Οι παραπάνω helpers μένουν ως «reference» υλοποίηση. Το score_one_scenario
+# χρησιμοποιεί τα παρακάτω: ένα πέρασμα για ακέραια aggregates ανά τμήμα και
+# προϋπολογισμένη λίστα αμοιβαίων ακμών (δείκτες γραμμών).
+
+_CLASS_LABEL_RE = re.compile(r"^Α\d+$")
+
+def _token_mask(values, pred) -> np.ndarray:
+    """Εφαρμόζει το pred ΜΙΑ φορά ανά μοναδική τιμή (αντί για row-wise apply)."""
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        # Κανονικοποιημένο ρόστερ (roster_normalize): οι κωδικοί υπάρχουν ήδη
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    lut = np.array([bool(pred(u)) for u in uniques] + [bool(pred(np.nan))], dtype=bool)
+    return lut[codes]  # code -1 (NaN) → τελευταίο στοιχείο
+
+def _good_greek_mask(df: pd.DataFrame) -> np.ndarray:
+    """Ίδια λογική με _good_greek_filter, αλλά για όλη τη στήλη."""
+    if "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ" in df.columns:
+        return _token_mask(df["ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ"], _is_yes)
+    if "ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ" in df.columns:
+        return _token_mask(df["ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ"], lambda v: _norm_str(v) in {"ΚΑΛΗ", "Ν", "GOOD"})
+    return np.zeros(len(df), dtype=bool)
+
+def _flag_mask(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return _token_mask(df[col], _is_yes)
+
+def _mutual_edges(df: pd.DataFrame, critical_pairs: Optional[List[Tuple[str,str]]] = None) -> np.ndarray:
+    """Αμοιβαίες δυάδες ως πίνακας (E, 2) δεικτών γραμμών.
+       Όπως στο _mutual_pairs/_broken_friendships_count: σε διπλότυπα ονόματα κερδίζει η τελευταία γραμμή.
+       Δείκτης == len(df) σημαίνει «όνομα που δεν υπάρχει» (→ ατοποθέτητος).
+    """
+    names = [str(x).strip() for x in df["ΟΝΟΜΑ"].tolist()]
+    name2idx = {n: i for i, n in enumerate(names)}
+    missing = len(names)
+
+    if critical_pairs is not None:
+        rows = []
+        for a, b in critical_pairs:
+            a, b = sorted((str(a).strip(), str(b).strip()))
+            rows.append((name2idx.get(a, missing), name2idx.get(b, missing)))
+        return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+    if "ΦΙΛΟΙ" not in df.columns:
+        return np.empty((0, 2), dtype=np.int64)
+
+    cells = parse_friends_column(df["ΦΙΛΟΙ"])
+    friends: Dict[str, frozenset] = {n: frozenset(cells[i]) for n, i in name2idx.items()}
+
+    rows = []
+    for a, fa in friends.items():
+        for b in fa:
+            if a < b and b in friends and a in friends[b]:
+                rows.append((name2idx[a], name2idx[b]))
+    rows.sort()
+    return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+def _class_codes(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Κωδικοποιεί πίνακα αναθέσεων (μαθητές × σενάρια) με ΚΟΙΝΟ πίνακα ετικετών.
+       Επιστρέφει (codes, class_idx, labels):
+         codes     – κωδικός ανά κελί για σύγκριση str τιμών (−1 = NaN),
+         class_idx – δείκτης στο labels για τιμές τύπου Α1, Α2, … (−1 αλλιώς),
+         labels    – ταξινομημένες ετικέτες τμημάτων που εμφανίζονται σε οποιοδήποτε σενάριο.
+    """
+    raw_codes, raw_uniques = pd.factorize(matrix.ravel())
+    strs = np.array([str(u) for u in raw_uniques], dtype=object)
+    str_codes, str_uniques = pd.factorize(strs)
+    codes = np.where(raw_codes >= 0, str_codes[raw_codes] if len(strs) else raw_codes, -1)
+
+    labels = sorted(u for u in str_uniques if _CLASS_LABEL_RE.match(u))
+    pos = {lab: k for k, lab in enumerate(labels)}
+    lut = np.array([pos.get(u, -1) for u in str_uniques] + [-1], dtype=np.int64)
+    return codes.reshape(matrix.shape), lut[codes].reshape(matrix.shape), labels
+
+def _prepare_scoring(df: pd.DataFrame, critical_pairs: Optional[List[Tuple[str,str]]] = None) -> Dict[str, np.ndarray]:
+    """Όλα όσα ΔΕΝ εξαρτώνται από τη στήλη σεναρίου (φύλο, γνώση, Ζ/Ι, αμοιβαίες ακμές).
+       Υπολογίζονται μία φορά και μοιράζονται σε όλα τα σενάρια.
+    """
+    z = _flag_mask(df, "ΖΩΗΡΟΣ")
+    i = _flag_mask(df, "ΙΔΙΑΙΤΕΡΟΤΗΤΑ")
+    return {
+        "boys": _token_mask(df["ΦΥΛΟ"], lambda v: _norm_str(v) == "Α") if "ΦΥΛΟ" in df.columns else np.zeros(len(df), dtype=bool),
+        "girls": _token_mask(df["ΦΥΛΟ"], lambda v: _norm_str(v) == "Κ") if "ΦΥΛΟ" in df.columns else np.zeros(len(df), dtype=bool),
+        "good": _good_greek_mask(df),
+        # Για το penalty συγκρούσεων αρκεί: «έχει Ι» και «μόνο Ζ» (βλ. _pair_conflict_penalty)
+        "has_i": i,
+        "only_z": z & ~i,
+        "edges": _mutual_edges(df, critical_pairs),
+    }
+
+def _conflict_sum_from_counts(i_cnt: np.ndarray, z_cnt: np.ndarray) -> np.ndarray:
+    """Κλειστός τύπος του _class_conflict_sum: Ι–Ι → 5, Ι–Ζ → 4, Ζ–Ζ → 3 (άθροισμα στον τελευταίο άξονα)."""
+    return (5 * (i_cnt * (i_cnt - 1) // 2) + 4 * i_cnt * z_cnt + 3 * (z_cnt * (z_cnt - 1) // 2)).sum(axis=-1)
+
+def _score_prepared(prep: Dict[str, np.ndarray], matrix: np.ndarray, scenario_names: List[str],
+                    num_classes: Optional[int] = None,
+                    count_unassigned_as_broken: bool = False) -> List[Dict[str, Any]]:
+    """Βαθμολογεί ΟΛΑ τα σενάρια ενός πίνακα (μαθητές × σενάρια) διανυσματικά."""
+    n, S = matrix.shape
+    codes, cls, labels = _class_codes(matrix)
+    K = len(labels)
+
+    # Ανά (σενάριο, τμήμα): ένα bincount πάνω σε flat index s*K + k
+    placed = cls >= 0
+    flat = (cls + np.arange(S)[None, :] * K)[placed]
+    def per_class(mask: Optional[np.ndarray] = None) -> np.ndarray:
+        idx = flat if mask is None else flat[np.broadcast_to(mask[:, None], (n, S))[placed]]
+        return np.bincount(idx, minlength=S * K).reshape(S, K)
+
+    pops = per_class()
+    boys = per_class(prep["boys"])
+    girls = per_class(prep["girls"])
+    good = per_class(prep["good"])
+    conflicts = _conflict_sum_from_counts(per_class(prep["has_i"]), per_class(prep["only_z"]))
+
+    # Τα τμήματα κάθε σεναρίου = όσα εμφανίζονται σε αυτό (πληθυσμός > 0)
+    present = pops > 0
+    any_present = present.any(axis=1)
+    def spread(a: np.ndarray) -> np.ndarray:
+        if K == 0:
+            return np.zeros(S, dtype=np.int64)
+        hi = np.where(present, a, np.iinfo(np.int64).min).max(axis=1)
+        lo = np.where(present, a, np.iinfo(np.int64).max).min(axis=1)
+        return np.where(any_present, hi - lo, 0)
+
+    pop_diff = spread(pops)
+    boys_diff = spread(boys)
+    girls_diff = spread(girls)
+    greek_diff = spread(good)
+    population_penalty = np.maximum(0, pop_diff - 1) * 3
+    gender_penalty = np.maximum(0, boys_diff - 1) * 2 + np.maximum(0, girls_diff - 1) * 2
+    greek_penalty = np.maximum(0, greek_diff - 2) * 1
+
+    edges = prep["edges"]
+    ext = np.vstack([codes, np.full((1, S), -1, dtype=codes.dtype)])  # γραμμή n → «δεν υπάρχει»
+    ca = ext[edges[:, 0]]
+    cb = ext[edges[:, 1]]
+    unassigned = (ca < 0) | (cb < 0)
+    broken = ((ca != cb) & ~unassigned).sum(axis=0)
+    if count_unassigned_as_broken:
+        broken = broken + unassigned.sum(axis=0)
+    broken_penalty = 5 * broken
+
+    total = population_penalty + gender_penalty + greek_penalty + conflicts + broken_penalty
+
+    out = []
+    for s in range(S):
+        labs = [lab for lab, p in zip(labels, present[s]) if p]
+        as_dict = lambda a: {lab: int(v) for lab, v, p in zip(labels, a[s], present[s]) if p}
+        out.append({
+            "scenario_col": scenario_names[s],
+            "num_classes": num_classes if num_classes is not None else (len(labs) or 2),
+            "population_counts": as_dict(pops),
+            "boys_counts": as_dict(boys),
+            "girls_counts": as_dict(girls),
+            "good_greek_counts": as_dict(good),
+            "diff_population": int(pop_diff[s]),
+            "diff_gender": int(max(boys_diff[s], girls_diff[s])),  # για tie-break παίρνουμε τη χειρότερη από τις δύο
+            "diff_greek": int(greek_diff[s]),
+            "population_penalty": int(population_penalty[s]),
+            "gender_penalty": int(gender_penalty[s]),
+            "greek_penalty": int(greek_penalty[s]),
+            "conflict_penalty": int(conflicts[s]),
+            "broken_friendships": int(broken[s]),
+            "broken_friendships_penalty": int(broken_penalty[s]),
+            "total_score": int(total[s]),
+        })
+    return out
+
 # ------------------------ Public API ------------------------
 
 def score_one_scenario(df: pd.DataFrame, scenario_col: str, num_classes: Optional[int]=None,
                        critical_pairs: Optional[List[Tuple[str,str]]]=None,
                        count_unassigned_as_broken: bool=False) -> Dict[str, Any]:
-    """Υπολογίζει το αναλυτικό score για ένα σενάριο."""
-    df = df.copy()
-    if num_classes is None:
-        num_classes = _infer_num_classes_from_values(df[scenario_col].values)
-
-    # Πληθυσμός ανά τμήμα
-    pop_counts = _counts_per_class(df, scenario_col)
-    pops = list(pop_counts.values())
-    pop_diff = (max(pops) - min(pops)) if pops else 0
-    population_penalty = max(0, pop_diff - 1) * 3
-
-    # Φύλο ανά τμήμα
-    boys_counts = _counts_per_class(df, scenario_col, label_filter=_boys_filter)
-    girls_counts= _counts_per_class(df, scenario_col, label_filter=_girls_filter)
-    boys = list(boys_counts.values()); girls = list(girls_counts.values())
-    boys_diff = (max(boys) - min(boys)) if boys else 0
-    girls_diff = (max(girls) - min(girls)) if girls else 0
-    gender_penalty = max(0, boys_diff - 1) * 2 + max(0, girls_diff - 1) * 2
-
-    # Καλή γνώση ανά τμήμα
-    good_counts = _counts_per_class(df, scenario_col, label_filter=_good_greek_filter)
-    good = list(good_counts.values())
-    greek_diff = (max(good) - min(good)) if good else 0
-    greek_penalty = max(0, greek_diff - 2) * 1
-
-    # Παιδαγωγικές συγκρούσεις (σύνολο) — (3/4/5)
-    conflict_penalty = _all_conflicts_sum(df, scenario_col)
-
-    # Σπασμένες αμοιβαίες φιλίες
-    broken = _broken_friendships_count(df, scenario_col, critical_pairs, count_unassigned_as_broken)
-    broken_friendships_penalty = 5 * broken
-
-    total = population_penalty + gender_penalty + greek_penalty + conflict_penalty + broken_friendships_penalty
-
-    return {
-        "scenario_col": scenario_col,
-        "num_classes": num_classes,
-        "population_counts": pop_counts,
-        "boys_counts": boys_counts,
-        "girls_counts": girls_counts,
-        "good_greek_counts": good_counts,
-        "diff_population": int(pop_diff),
-        "diff_gender": int(max(boys_diff, girls_diff)),  # για tie-break παίρνουμε τη χειρότερη από τις δύο
-        "diff_greek": int(greek_diff),
-        "population_penalty": int(population_penalty),
-        "gender_penalty": int(gender_penalty),
-        "greek_penalty": int(greek_penalty),
-        "conflict_penalty": int(conflict_penalty),
-        "broken_friendships": int(broken),
-        "broken_friendships_penalty": int(broken_friendships_penalty),
-        "total_score": int(total),
-    }
+    """Υπολογίζει το αναλυτικό score για ένα σενάριο (fused: ένα πέρασμα, χωρίς df.copy())."""
+    prep = _prepare_scoring(df, critical_pairs)
+    matrix = df[scenario_col].to_numpy(dtype=object).reshape(-1, 1)
+    return _score_prepared(prep, matrix, [scenario_col], num_classes, count_unassigned_as_broken)[0]
+
+def score_scenarios_batch(df: pd.DataFrame, assignments, scenario_names: Optional[List[str]] = None,
+                          num_classes: Optional[int] = None,
+                          critical_pairs: Optional[List[Tuple[str,str]]] = None,
+                          count_unassigned_as_broken: bool = False) -> List[Dict[str, Any]]:
+    """Βαθμολογεί ΠΟΛΛΑ σενάρια μαζί.
+       assignments: 2-D πίνακας (μαθητές × σενάρια) με ετικέτες τμημάτων, ευθυγραμμισμένος με τις γραμμές του df
+       (π.χ. df[cols].to_numpy()). Τα χαρακτηριστικά (φύλο/γνώση/Ζ/Ι) και οι αμοιβαίες ακμές
+       υπολογίζονται ΜΙΑ φορά. Επιστρέφει λίστα dicts ίδιας μορφής με το score_one_scenario.
+    """
+    matrix = np.asarray(assignments, dtype=object)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(-1, 1)
+    if matrix.shape[0] != len(df):
+        raise ValueError(f"Ο πίνακας αναθέσεων έχει {matrix.shape[0]} γραμμές, το df έχει {len(df)}.")
+    if scenario_names is None:
+        scenario_names = [f"ΣΕΝΑΡΙΟ_{k+1}" for k in range(matrix.shape[1])]
+    if len(scenario_names) != matrix.shape[1]:
+        raise ValueError("Το πλήθος των scenario_names δεν ταιριάζει με τις στήλες του πίνακα.")
+    prep = _prepare_scoring(df, critical_pairs)
+    return _score_prepared(prep, matrix, list(scenario_names), num_classes, count_unassigned_as_broken)
 
 def pick_best_scenario(df: pd.DataFrame, scenario_cols: List[str], num_classes: Optional[int]=None,
                        critical_pairs: Optional[List[Tuple[str,str]]]=None,
@@ -247,8 +374,11 @@ def pick_best_scenario(df: pd.DataFrame, scenario_cols: List[str], num_classes:
     if num_classes is None and scenario_cols:
         num_classes = _infer_num_classes_from_values(df[scenario_cols[0]].values)
 
-    scores = [score_one_scenario(df, c, num_classes, critical_pairs, count_unassigned_as_broken)
-              for c in scenario_cols if c in df.columns]
+    cols = [c for c in scenario_cols if c in df.columns]
+    if not cols:
+        return {"best": None, "scores": []}
+    scores = score_scenarios_batch(df, df[cols].to_numpy(dtype=object), cols, num_classes,
+                                   critical_pairs, count_unassigned_as_broken)
 
     if not scores:
         return {"best": None, "scores": []}
@@ -275,14 +405,214 @@ def pick_best_scenario(df: pd.DataFrame, scenario_cols: List[str], num_classes:
 
     return {"best": best, "scores": scores_sorted[:max(k_best,1)]}
 
+# ------------------------ Incremental scoring (what-if) ------------------------
+
+def _is_missing(v) -> bool:
+    return v is None or (not isinstance(v, (list, tuple, set, dict)) and bool(pd.isna(v)))
+
+class ScoreState:
+    """Αυξητική βαθμολόγηση ΕΝΟΣ σεναρίου για μετακινήσεις/ανταλλαγές μαθητών.
+       Κρατά aggregates ανά τμήμα (πληθυσμός, αγόρια, κορίτσια, καλή γνώση, Ι, μόνο-Ζ),
+       το άθροισμα συγκρούσεων και τις σπασμένες αμοιβαίες δυάδες.
+       move()/swap() ενημερώνουν σε O(deg) και τα spreads διαβάζονται σε O(m).
+       Το to_dict() δίνει ό,τι θα έδινε το score_one_scenario στην τρέχουσα ανάθεση.
+    """
+
+    def __init__(self, df: pd.DataFrame, scenario_col: str, num_classes: Optional[int] = None,
+                 critical_pairs: Optional[List[Tuple[str,str]]] = None,
+                 count_unassigned_as_broken: bool = False):
+        prep = _prepare_scoring(df, critical_pairs)
+        self.scenario_col = scenario_col
+        self.num_classes = num_classes
+        self.count_unassigned_as_broken = count_unassigned_as_broken
+
+        self._boys = prep["boys"].tolist()
+        self._girls = prep["girls"].tolist()
+        self._good = prep["good"].tolist()
+        self._has_i = prep["has_i"].tolist()
+        self._only_z = prep["only_z"].tolist()
+        # Σε διπλότυπα ονόματα κερδίζει η τελευταία γραμμή (όπως στις αμοιβαίες δυάδες)
+        self._name2idx = {str(x).strip(): i for i, x in enumerate(df["ΟΝΟΜΑ"].tolist())}
+
+        n = len(df)
+        values = df[scenario_col].tolist()
+        self._cls: List[Optional[str]] = [None if _is_missing(v) else str(v) for v in values] + [None]  # θέση n → «δεν υπάρχει»
+
+        self._edges = [tuple(e) for e in prep["edges"].tolist()]
+        self._adj: List[List[int]] = [[] for _ in range(n + 1)]
+        for e, (a, b) in enumerate(self._edges):
+            self._adj[a].append(e)
+            if b != a:
+                self._adj[b].append(e)
+
+        self._agg: Dict[str, List[int]] = {}  # ετικέτα → [pop, boys, girls, good, i, z]
+        self._conflicts = 0
+        for i in range(n):
+            self._add(i, self._cls[i])
+        self._broken = 0
+        self._unassigned = 0
+        for e in range(len(self._edges)):
+            br, un = self._edge_state(e)
+            self._broken += br
+            self._unassigned += un
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, scenario_col: str, **kwargs) -> "ScoreState":
+        return cls(df, scenario_col, **kwargs)
+
+    # ---- εσωτερικά ----
+
+    def _index(self, student) -> int:
+        if isinstance(student, (int, np.integer)) and not isinstance(student, bool):
+            if not 0 <= int(student) < len(self._cls) - 1:
+                raise IndexError(f"Μη έγκυρη θέση μαθητή: {student}")
+            return int(student)
+        key = str(student).strip()
+        if key not in self._name2idx:
+            raise KeyError(f"Άγνωστος μαθητής: {student}")
+        return self._name2idx[key]
+
+    @staticmethod
+    def _class_term(i_cnt: int, z_cnt: int) -> int:
+        return 5 * (i_cnt * (i_cnt - 1) // 2) + 4 * i_cnt * z_cnt + 3 * (z_cnt * (z_cnt - 1) // 2)
+
+    def _update(self, i: int, label: Optional[str], sign: int) -> None:
+        if label is None or not _CLASS_LABEL_RE.match(label):
+            return
+        agg = self._agg.get(label)
+        if agg is None:
+            agg = self._agg[label] = [0, 0, 0, 0, 0, 0]
+        self._conflicts -= self._class_term(agg[4], agg[5])
+        agg[0] += sign
+        agg[1] += sign * self._boys[i]
+        agg[2] += sign * self._girls[i]
+        agg[3] += sign * self._good[i]
+        agg[4] += sign * self._has_i[i]
+        agg[5] += sign * self._only_z[i]
+        self._conflicts += self._class_term(agg[4], agg[5])
+        if agg[0] == 0:
+            del self._agg[label]  # άδειο τμήμα δεν «εμφανίζεται» στο σενάριο
+
+    def _add(self, i: int, label: Optional[str]) -> None:
+        self._update(i, label, +1)
+
+    def _remove(self, i: int, label: Optional[str]) -> None:
+        self._update(i, label, -1)
+
+    def _edge_state(self, e: int) -> Tuple[int, int]:
+        a, b = self._edges[e]
+        ca, cb = self._cls[a], self._cls[b]
+        if ca is None or cb is None:
+            return 0, 1
+        return int(ca != cb), 0
+
+    # ---- δημόσιο API ----
+
+    def move(self, student, new_class) -> int:
+        """Μετακινεί τον μαθητή (όνομα ή θέση γραμμής) στο new_class (None/NaN = ατοποθέτητος).
+           Επιστρέφει το νέο total_score."""
+        i = self._index(student)
+        old = self._cls[i]
+        new = None if _is_missing(new_class) else str(new_class)
+        if old == new:
+            return self.total_score
+        for e in self._adj[i]:
+            br, un = self._edge_state(e)
+            self._broken -= br
+            self._unassigned -= un
+        self._remove(i, old)
+        self._cls[i] = new
+        self._add(i, new)
+        for e in self._adj[i]:
+            br, un = self._edge_state(e)
+            self._broken += br
+            self._unassigned += un
+        return self.total_score
+
+    def swap(self, a, b) -> int:
+        """Ανταλλάσσει τα τμήματα δύο μαθητών. Επιστρέφει το νέο total_score."""
+        ia, ib = self._index(a), self._index(b)
+        ca, cb = self._cls[ia], self._cls[ib]
+        self.move(ia, cb)
+        return self.move(ib, ca)
+
+    def delta_move(self, student, new_class) -> int:
+        """Μεταβολή του total_score ΑΝ ο μαθητής πήγαινε στο new_class (χωρίς να αλλάξει η κατάσταση)."""
+        i = self._index(student)
+        old = self._cls[i]
+        before = self.total_score
+        after = self.move(i, new_class)
+        self.move(i, old)
+        return after - before
+
+    def class_of(self, student) -> Optional[str]:
+        return self._cls[self._index(student)]
+
+    @property
+    def assignment(self) -> List[Optional[str]]:
+        """Τρέχουσα ανάθεση ανά γραμμή του αρχικού df (None = ατοποθέτητος)."""
+        return self._cls[:-1]
+
+    @property
+    def broken_friendships(self) -> int:
+        return self._broken + (self._unassigned if self.count_unassigned_as_broken else 0)
+
+    def _spread(self, k: int) -> int:
+        vals = [agg[k] for agg in self._agg.values()]
+        return max(vals) - min(vals) if vals else 0
+
+    def components(self) -> Dict[str, int]:
+        pop_diff, boys_diff, girls_diff, greek_diff = (self._spread(k) for k in range(4))
+        broken = self.broken_friendships
+        comp = {
+            "diff_population": pop_diff,
+            "diff_gender": max(boys_diff, girls_diff),
+            "diff_greek": greek_diff,
+            "population_penalty": max(0, pop_diff - 1) * 3,
+            "gender_penalty": max(0, boys_diff - 1) * 2 + max(0, girls_diff - 1) * 2,
+            "greek_penalty": max(0, greek_diff - 2) * 1,
+            "conflict_penalty": self._conflicts,
+            "broken_friendships": broken,
+            "broken_friendships_penalty": 5 * broken,
+        }
+        comp["total_score"] = (comp["population_penalty"] + comp["gender_penalty"] + comp["greek_penalty"]
+                               + comp["conflict_penalty"] + comp["broken_friendships_penalty"])
+        return comp
+
+    @property
+    def total_score(self) -> int:
+        return self.components()["total_score"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Ίδια μορφή με το score_one_scenario."""
+        labels = sorted(self._agg)
+        comp = self.components()
+        return {
+            "scenario_col": self.scenario_col,
+            "num_classes": self.num_classes if self.num_classes is not None else (len(labels) or 2),
+            "population_counts": {lab: self._agg[lab][0] for lab in labels},
+            "boys_counts": {lab: self._agg[lab][1] for lab in labels},
+            "girls_counts": {lab: self._agg[lab][2] for lab in labels},
+            "good_greek_counts": {lab: self._agg[lab][3] for lab in labels},
+            "diff_population": comp["diff_population"],
+            "diff_gender": comp["diff_gender"],
+            "diff_greek": comp["diff_greek"],
+            "population_penalty": comp["population_penalty"],
+            "gender_penalty": comp["gender_penalty"],
+            "greek_penalty": comp["greek_penalty"],
+            "conflict_penalty": comp["conflict_penalty"],
+            "broken_friendships": comp["broken_friendships"],
+            "broken_friendships_penalty": comp["broken_friendships_penalty"],
+            "total_score": comp["total_score"],
+        }
+
 # ------------------------ Convenience: score many & to Excel ------------------------
 
 def score_to_dataframe(df: pd.DataFrame, scenario_cols: List[str], **kwargs) -> pd.DataFrame:
     rows = []
-    for c in scenario_cols:
-        if c not in df.columns:
-            continue
-        s = score_one_scenario(df, c, **kwargs)
+    cols = [c for c in scenario_cols if c in df.columns]
+    scores = score_scenarios_batch(df, df[cols].to_numpy(dtype=object), cols, **kwargs) if cols else []
+    for c, s in zip(cols, scores):
         rows.append({
             "SCENARIO": c,
             "TOTAL": s["total_score"],
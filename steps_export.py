@@ -5,12 +5,24 @@
 # Περιλαμβάνει:
 #   - create_steps_excel_file(final_results: dict) -> bytes
 #   - create_steps_excel_download_ui(step_results: dict) -> None
+#   - stream_download_package(final_results: dict) -> SpooledTemporaryFile
+#
+# Όλα τα workbooks γράφονται με xlsxwriter σε constant_memory mode
+# (γραμμή-γραμμή, κομμάτια CHUNK_ROWS) και τα μέλη του zip γράφονται
+# απευθείας σε SpooledTemporaryFile → η μνήμη μένει φραγμένη ακόμη και
+# για 10k γραμμές × 20 σενάρια.
 # --------------------------------------------------------------
 
 from __future__ import annotations
 import io
-from typing import Dict, Any
+import tempfile
+import zipfile
+from typing import Dict, Any, Iterable, Tuple
+import numpy as np
 import pandas as pd
+import xlsxwriter
+
+from statistics_generator import generate_statistics_table
 
 try:
     import streamlit as st  # μόνο για το UI helper
@@ -22,6 +34,90 @@ BASE_COLS = [
     "ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ","ΦΙΛΟΙ","ΣΥΓΚΡΟΥΣΗ","ΠΡΟΤΕΙΝΟΜΕΝΟ_ΤΜΗΜΑ","ΤΜΗΜΑ"
 ]
 
+CHUNK_ROWS = 2000
+SPOOL_MAX_BYTES = 16 * 1024 * 1024   # πάνω από αυτό το zip «χύνεται» σε αρχείο στον δίσκο
+
+# ------------------------ Streaming εγγραφή ------------------------
+
+def _cell(v):
+    # xlsxwriter δεν γράφει λίστες/dicts/numpy scalars· τα κενά (NaN/None) → blank
+    if v is None:
+        return None
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, (list, tuple, dict, set)):
+        return str(v)
+    return v
+
+def _write_frame(ws, df: pd.DataFrame, index: bool = False) -> None:
+    """Header + γραμμές με αύξουσα σειρά (απαίτηση του constant_memory), σε κομμάτια."""
+    if index:
+        df = df.reset_index()
+    ws.write_row(0, 0, [str(c) for c in df.columns])
+    row = 1
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        values = chunk.astype(object).where(chunk.notna(), None).to_numpy().tolist()
+        for record in values:
+            ws.write_row(row, 0, [_cell(v) for v in record])
+            row += 1
+
+def write_frames_xlsx(target, sheets: Iterable[Tuple[str, pd.DataFrame, bool]]) -> None:
+    """Γράφει (όνομα φύλλου, DataFrame, index) σε xlsx (path ή file-like) με constant_memory."""
+    wb = xlsxwriter.Workbook(target, {"constant_memory": True, "nan_inf_to_errors": True})
+    try:
+        for sheet_name, df, index in sheets:
+            _write_frame(wb.add_worksheet(sheet_name[:31]), df, index=index)
+    finally:
+        wb.close()
+
+def _scenario_sheets(scenario_name: str, result: Dict[str, Any]):
+    """Φύλλα του «Πλήρη_Αποτελέσματα» ενός σεναρίου (παράγονται ένα-ένα)."""
+    df = result['df']
+    yield 'Αποτελέσματα', df, False
+    try:
+        final_col = result['final_column']
+        df_assigned = df.loc[df[final_col].notna()].assign(ΤΜΗΜΑ=lambda d: d[final_col])
+        yield 'Στατιστικά', generate_statistics_table(df_assigned), True
+    except Exception as e:
+        print(f"Σφάλμα στα στατιστικά {scenario_name}: {e}")
+    if 'final_score' in result:
+        yield 'Μετρικές', pd.DataFrame([result['final_score']]), False
+
+def _comparison_frame(final_results: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    rows = []
+    for name, result in final_results.items():
+        if 'final_score' in result:
+            score = result['final_score']
+            rows.append({
+                'Σενάριο': name,
+                'Συνολικό Score': score['total_score'],
+                'Διαφορά Πληθυσμού': score['diff_population'],
+                'Διαφορά Φύλου': score['diff_gender'],
+                'Διαφορά Γνώσης': score['diff_greek'],
+                'Σπασμένες Φιλίες': score['broken_friendships']
+            })
+    return pd.DataFrame(rows)
+
+def stream_download_package(final_results: Dict[str, Dict[str, Any]],
+                            spool_max: int = SPOOL_MAX_BYTES) -> tempfile.SpooledTemporaryFile:
+    '''
+    Zip με ένα «<Σενάριο>_Πλήρη_Αποτελέσματα.xlsx» ανά σενάριο + «ΣΥΝΟΨΗ_Σύγκριση_Σεναρίων.xlsx».
+    Κάθε workbook γράφεται κατευθείαν μέσα στο μέλος του zip (χωρίς ενδιάμεσο BytesIO).
+    Επιστρέφει το SpooledTemporaryFile στη θέση 0 — ο caller το κλείνει.
+    '''
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max)
+    with zipfile.ZipFile(spool, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for scenario_name, result in final_results.items():
+            with zf.open(f"{scenario_name}_Πλήρη_Αποτελέσματα.xlsx", 'w', force_zip64=True) as member:
+                write_frames_xlsx(member, _scenario_sheets(scenario_name, result))
+        summary_df = _comparison_frame(final_results)
+        if not summary_df.empty:
+            with zf.open("ΣΥΝΟΨΗ_Σύγκριση_Σεναρίων.xlsx", 'w') as member:
+                write_frames_xlsx(member, [('Σύγκριση_Σεναρίων', summary_df, False)])
+    spool.seek(0)
+    return spool
+
 def _scenario_number(scenario_name: str) -> str:
     digits = "".join(ch for ch in scenario_name if ch.isdigit())
     return digits or "1"
@@ -33,6 +129,41 @@ def _ensure_alias_step6(df: pd.DataFrame, scen_num: str, final_col: str | None)
         df[alias6] = df[final_col]
     return df
 
+def _steps_sheets(final_results: Dict[str, Dict[str, Any]]):
+    """(όνομα φύλλου, DataFrame, index) ανά σενάριο — ένα-ένα, χωρίς να κρατιούνται όλα μαζί."""
+    used_sheet_names = set()
+    for scenario_key, payload in final_results.items():
+        if not isinstance(payload, dict) or "df" not in payload:
+            # Αγνόησε μη αναμενόμενη δομή
+            continue
+
+        scen_num = _scenario_number(str(scenario_key))
+        df = payload["df"]
+        final_col = payload.get("final_column")
+
+        # Δημιούργησε/εξασφάλισε alias για ΒΗΜΑ6_ΣΕΝΑΡΙΟ_Ν
+        df = _ensure_alias_step6(df, scen_num, final_col)
+
+        # Στήσιμο σωστής σειράς στηλών
+        out_cols = [c for c in BASE_COLS if c in df.columns]
+        for step in range(1, 7):
+            col = f"ΒΗΜΑ{step}_ΣΕΝΑΡΙΟ_{scen_num}"
+            if col in df.columns and col not in out_cols:
+                out_cols.append(col)
+
+        if not out_cols:
+            out_cols = df.columns.tolist()
+
+        # Όνομα φύλλου (μοναδικό)
+        sheet_name = f"ΣΕΝΑΡΙΟ_{scen_num}"
+        ix = 2
+        while sheet_name in used_sheet_names:
+            sheet_name = f"ΣΕΝΑΡΙΟ_{scen_num} ({ix})"
+            ix += 1
+        used_sheet_names.add(sheet_name)
+
+        yield sheet_name, df[out_cols], False
+
 def create_steps_excel_file(final_results: Dict[str, Dict[str, Any]]) -> bytes:
     '''
     Δημιουργεί Excel με ένα sheet ανά ΣΕΝΑΡΙΟ.
@@ -41,40 +172,7 @@ def create_steps_excel_file(final_results: Dict[str, Dict[str, Any]]) -> bytes:
     τελική στήλη (final_column) του αντίστοιχου σεναρίου.
     '''
     buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-        used_sheet_names = set()
-        for scenario_key, payload in final_results.items():
-            if not isinstance(payload, dict) or "df" not in payload:
-                # Αγνόησε μη αναμενόμενη δομή
-                continue
-
-            scen_num = _scenario_number(str(scenario_key))
-            df = payload["df"].copy()
-            final_col = payload.get("final_column")
-
-            # Δημιούργησε/εξασφάλισε alias για ΒΗΜΑ6_ΣΕΝΑΡΙΟ_Ν
-            df = _ensure_alias_step6(df, scen_num, final_col)
-
-            # Στήσιμο σωστής σειράς στηλών
-            out_cols = [c for c in BASE_COLS if c in df.columns]
-            for step in range(1, 7):
-                col = f"ΒΗΜΑ{step}_ΣΕΝΑΡΙΟ_{scen_num}"
-                if col in df.columns and col not in out_cols:
-                    out_cols.append(col)
-
-            if not out_cols:
-                out_cols = df.columns.tolist()
-
-            # Όνομα φύλλου (μοναδικό)
-            sheet_name = f"ΣΕΝΑΡΙΟ_{scen_num}"
-            ix = 2
-            while sheet_name in used_sheet_names:
-                sheet_name = f"ΣΕΝΑΡΙΟ_{scen_num} ({ix})"
-                ix += 1
-            used_sheet_names.add(sheet_name)
-
-            df[out_cols].to_excel(writer, sheet_name=sheet_name, index=False)
-
+    write_frames_xlsx(buffer, _steps_sheets(final_results))
     return buffer.getvalue()
 
 def create_steps_excel_download_ui(step_results: Dict[str, Any]) -> None:
@@ -7,13 +7,12 @@ Streamlit App - Σύστημα Ανάθεσης Μαθητών σε Τμήματ
 import streamlit as st
 import pandas as pd
 import numpy as np
-import zipfile
-import io
 import tempfile
 import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 import traceback
+import time
 
 # Προαιρετικά imports για γραφήματα
 try:
@@ -36,13 +35,19 @@ try:
     from step_1_helpers_FIXED import load_and_normalize, enumerate_all, write_outputs
     from step_2_zoiroi_idiaterotites_FIXED_v3_PATCHED import step2_apply_FIXED_v3
     from step3_amivaia_filia_FIXED import step3_run_all_from_step2
-    from step4_filikoi_omades_beltiosi_FIXED import apply_step4_strict
+    from step4_filikoi_omades_beltiosi_FIXED import apply_step4_relaxed
     from step_5_ypoloipoi_mathites_FIXED_compat import apply_step5_to_all_scenarios
     from step_6_final_check_and_fix_PATCHED import apply_step6_to_step5_scenarios
     from step_7_final_score_FIXED_PATCHED import score_one_scenario_auto, pick_best_scenario
     from friendship_filters_fixed import filter_scenarios_fixed
-    from statistics_generator import generate_statistics_table, export_statistics_to_excel
-    from steps_export import create_steps_excel_download_ui
+    from statistics_generator import export_statistics_to_excel
+    from steps_export import create_steps_excel_download_ui, stream_download_package
+    from roster_cache import load_roster_cached
+    from roster_normalize import normalize_roster
+    from pipeline_engine import Pipeline, PipelineConfig
+    from stage_cache import get_stage_cache, memoize_frame_stage
+    from job_runner import get_job_runner
+    from instrumentation import Profiler, profiling, span, report_frame
 except ImportError as e:
     st.error(f"Σφάλμα εισαγωγής modules: {e}")
     st.stop()
@@ -63,49 +68,37 @@ def init_session_state():
         st.session_state.step_results = {}
     if 'current_step' not in st.session_state:
         st.session_state.current_step = 1
+    if 'job_id' not in st.session_state:
+        # Επανασύνδεση browser → το job_id επιβιώνει στο URL (?job=...)
+        st.session_state.job_id = getattr(st, "query_params", {}).get("job")  # st.query_params: streamlit>=1.30
+        st.session_state.job_events = []
+        st.session_state.job_offset = 0
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = Profiler()   # συσσωρεύει τα βήματα που τρέχουν ένα-ένα
+
+def run_profiled(stage, fn, *args):
+    """Εκτέλεση βήματος του UI υπό τον Profiler του session (για το panel Profiling)"""
+    with profiling(st.session_state.profiler), span(stage):
+        return fn(*args)
 
 def load_data(uploaded_file):
-    """Φόρτωση και κανονικοποίηση δεδομένων"""
+    """Φόρτωση και κανονικοποίηση δεδομένων (cache με κλειδί το SHA-256 του αρχείου)"""
     try:
-        if uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
+        if not uploaded_file.name.endswith(('.xlsx', '.csv')):
             st.error("Υποστηρίζονται μόνο αρχεία .xlsx και .csv")
             return None
         
-        # Κανονικοποίηση στηλών
-        rename_map = {}
-        for col in df.columns:
-            col_str = str(col).strip().upper()
-            if any(x in col_str for x in ['ΟΝΟΜΑ', 'NAME', 'ΜΑΘΗΤΗΣ']):
-                rename_map[col] = 'ΟΝΟΜΑ'
-            elif any(x in col_str for x in ['ΦΥΛΟ', 'GENDER']):
-                rename_map[col] = 'ΦΥΛΟ'
-            elif 'ΓΝΩΣΗ' in col_str and 'ΕΛΛΗΝΙΚ' in col_str:
-                rename_map[col] = 'ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ'
-            elif 'ΠΑΙΔΙ' in col_str and 'ΕΚΠΑΙΔΕΥΤΙΚ' in col_str:
-                rename_map[col] = 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ'
-            elif 'ΦΙΛΟΙ' in col_str or 'FRIEND' in col_str:
-                rename_map[col] = 'ΦΙΛΟΙ'
-        
-        if rename_map:
-            df = df.rename(columns=rename_map)
-        
-        # Κανονικοποίηση τιμών
-        if 'ΦΥΛΟ' in df.columns:
-            df['ΦΥΛΟ'] = df['ΦΥΛΟ'].astype(str).str.upper().map({'Α':'Α', 'Κ':'Κ', 'ΑΓΟΡΙ':'Α', 'ΚΟΡΙΤΣΙ':'Κ'}).fillna('Α')
-        
-        for col in ['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ', 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ']:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.upper().map({'ΝΑΙ':'Ν', 'ΟΧΙ':'Ο', 'YES':'Ν', 'NO':'Ο', '1':'Ν', '0':'Ο'}).fillna('Ο')
-        
+        df = load_roster_cached(uploaded_file, _normalize_roster, namespace="streamlit_app")
         return df
     except Exception as e:
         st.error(f"Σφάλμα φόρτωσης αρχείου: {e}")
         return None
 
+def _normalize_roster(df):
+    """Κανονικοποίηση στηλών/τιμών ενός ρόστερ (εκτελείται μόνο σε cache miss)"""
+    # Άγνωστο/κενό φύλο → 'Α', όπως πριν
+    return normalize_roster(df, gender_default='Α')
+
 def display_scenario_statistics(df, scenario_col, scenario_name):
     """Εμφάνιση στατιστικών για ένα σενάριο"""
     try:
@@ -371,27 +364,35 @@ def run_step2(step1_results):
             
             progress_bar.progress(50)
             
-            # Εκτέλεση Step 2
-            results = step2_apply_FIXED_v3(
-                df, 
-                num_classes=2, 
-                step1_col_name=step1_col,
-                max_results=5
+            # Εκτέλεση Step 2 (memoized: ίδιο df + παράμετροι → χωρίς νέο backtracking)
+            def compute(frame):
+                results = step2_apply_FIXED_v3(
+                    frame, 
+                    num_classes=2, 
+                    step1_col_name=step1_col,
+                    max_results=5
+                )
+                if not results:
+                    return None, {'count': 0}
+                # Επιλογή καλύτερου αποτελέσματος (το πρώτο είναι συνήθως το καλύτερο)
+                return results[0][1], {'count': len(results), 'metrics': results[0][2]}
+            
+            df_step2, info = memoize_frame_stage(
+                get_stage_cache(), "app_step2", df,
+                {'step1_col': step1_col, 'num_classes': 2, 'max_results': 5, 'seed': 42}, compute
             )
             
             progress_bar.progress(100)
             
-            if results:
-                # Επιλογή καλύτερου αποτελέσματος
-                best_result = results[0]  # Το πρώτο είναι συνήθως το καλύτερο
+            if df_step2 is not None:
                 step2_results[scenario_name] = {
-                    'df': best_result[1],
-                    'metrics': best_result[2],
-                    'column': best_result[1].columns[-1]  # Η νέα στήλη
+                    'df': df_step2,
+                    'metrics': info['metrics'],
+                    'column': df_step2.columns[-1]  # Η νέα στήλη
                 }
                 
-                st.success(f"✅ {scenario_name}: {len(results)} αποτελέσματα")
-                st.json(best_result[2])
+                st.success(f"✅ {scenario_name}: {info['count']} αποτελέσματα")
+                st.json(info['metrics'])
             else:
                 st.warning(f"⚠️ {scenario_name}: Δεν βρέθηκαν λύσεις")
                 
@@ -417,7 +418,10 @@ def run_step3(step2_results):
             from step_3_helpers_FIXED import apply_step3_on_sheet
             
 
-            df_step3, metrics = apply_step3_on_sheet(df, step2_col, num_classes=2)
+            df_step3, metrics = memoize_frame_stage(
+                get_stage_cache(), "app_step3", df, {'step2_col': step2_col, 'num_classes': 2},
+                lambda frame: apply_step3_on_sheet(frame, step2_col, num_classes=2)
+            )
             
             step3_results[scenario_name] = {
                 'df': df_step3,
@@ -448,23 +452,24 @@ def run_step4(step3_results):
             
             progress_bar = st.progress(0)
             
-            # Εκτέλεση Step 4
-            results = apply_step4_strict(
-                df, 
-                assigned_column=step3_col, 
-                num_classes=2,
-                max_results=3,
-                max_nodes=50000
-            )
-            
-            progress_bar.progress(100)
-            
-            if results:
+            step4_col = step3_col.replace('ΒΗΜΑ3', 'ΒΗΜΑ4')
+            
+            # Εκτέλεση Step 4 (memoized)
+            def compute(frame):
+                relaxed = apply_step4_relaxed(
+                    frame, 
+                    assigned_column=step3_col, 
+                    num_classes=2,
+                    max_results=3,
+                    max_nodes=50000
+                )
+                results = relaxed['results']
+                if not results:
+                    return None, (None, None)
                 best_placement, best_penalty = results[0]
                 
                 # Εφαρμογή ανάθεσης
-                df_step4 = df.copy()
-                step4_col = step3_col.replace('ΒΗΜΑ3', 'ΒΗΜΑ4')
+                df_step4 = frame.copy()
                 df_step4[step4_col] = df_step4[step3_col]
                 
                 # Ανάθεση ομάδων
@@ -472,7 +477,17 @@ def run_step4(step3_results):
                     for student in group:
                         mask = df_step4['ΟΝΟΜΑ'] == student
                         df_step4.loc[mask, step4_col] = class_assigned
-                
+                return df_step4, (best_penalty, relaxed['thresholds'] if relaxed['level'] else None)
+            
+            df_step4, (best_penalty, relaxed_limits) = memoize_frame_stage(
+                get_stage_cache(), "app_step4", df,
+                {'step3_col': step3_col, 'num_classes': 2, 'max_results': 3, 'max_nodes': 50000, 'relax': True},
+                compute
+            )
+            
+            progress_bar.progress(100)
+            
+            if df_step4 is not None:
                 step4_results[scenario_name] = {
                     'df': df_step4,
                     'penalty': best_penalty,
@@ -480,6 +495,8 @@ def run_step4(step3_results):
                 }
                 
                 st.success(f"✅ {scenario_name}: Penalty = {best_penalty}")
+                if relaxed_limits:
+                    st.info(f"ℹ️ {scenario_name}: Χαλαρωμένα όρια Βήματος 4: {relaxed_limits}")
             else:
                 st.warning(f"⚠️ {scenario_name}: Δεν βρέθηκαν λύσεις")
                 
@@ -498,49 +515,56 @@ def run_steps_5_6_7(step4_results):
         st.write(f"**Τελικοποίηση {scenario_name}**")
         
         try:
-            df = step4_data['df']
             step4_col = step4_data['column']
             
-            # Step 5: Υπόλοιποι μαθητές
-            df_step5, penalty5 = apply_step5_to_all_scenarios(
-                {scenario_name: df}, 
-                step4_col, 
-                num_classes=2
-            )
-            if df_step5 is not None:
-                df = df_step5
-            
-            # Step 6: Τελικός έλεγχος
-            step5_col = step4_col.replace('ΒΗΜΑ4', 'ΒΗΜΑ5')
-            if step5_col not in df.columns:
-                df[step5_col] = df[step4_col]
+            def compute(df):
+                # Step 5: Υπόλοιποι μαθητές
+                df_step5, penalty5 = apply_step5_to_all_scenarios(
+                    {scenario_name: df}, 
+                    step4_col, 
+                    num_classes=2
+                )
+                if df_step5 is not None:
+                    df = df_step5
+                
+                # Step 6: Τελικός έλεγχος
+                step5_col = step4_col.replace('ΒΗΜΑ4', 'ΒΗΜΑ5')
+                if step5_col not in df.columns:
+                    df[step5_col] = df[step4_col]
+                
+                step6_output = apply_step6_to_step5_scenarios(
+                    {scenario_name: df},
+                    class_col=step5_col
+                )
+                
+                if scenario_name in step6_output:
+                    df_final = step6_output[scenario_name]['df']
+                    summary6 = step6_output[scenario_name]['summary']
+                else:
+                    df_final = df
+                    summary6 = {}
+                
+                # Step 7: Τελικό σκορ
+                step6_col = 'ΒΗΜΑ6_ΤΜΗΜΑ'
+                if step6_col not in df_final.columns:
+                    step6_col = step5_col
+                
+                final_score = score_one_scenario_auto(df_final, step6_col)
+                return df_final, {
+                    'step5_penalty': penalty5,
+                    'step6_summary': summary6,
+                    'final_score': final_score,
+                    'final_column': step6_col
+                }
             
-            step6_output = apply_step6_to_step5_scenarios(
-                {scenario_name: df},
-                class_col=step5_col
+            # Memoized: αλλαγή σε μεταγενέστερο βήμα δεν ξανατρέχει τα 5-7 για ίδια είσοδο
+            df_final, info = memoize_frame_stage(
+                get_stage_cache(), "app_steps_5_6_7", step4_data['df'],
+                {'step4_col': step4_col, 'num_classes': 2, 'scenario': scenario_name}, compute
             )
+            final_score = info['final_score']
             
-            if scenario_name in step6_output:
-                df_final = step6_output[scenario_name]['df']
-                summary6 = step6_output[scenario_name]['summary']
-            else:
-                df_final = df
-                summary6 = {}
-            
-            # Step 7: Τελικό σκορ
-            step6_col = 'ΒΗΜΑ6_ΤΜΗΜΑ'
-            if step6_col not in df_final.columns:
-                step6_col = step5_col
-            
-            final_score = score_one_scenario_auto(df_final, step6_col)
-            
-            final_results[scenario_name] = {
-                'df': df_final,
-                'step5_penalty': penalty5 if 'penalty5' in locals() else 0,
-                'step6_summary': summary6,
-                'final_score': final_score,
-                'final_column': step6_col
-            }
+            final_results[scenario_name] = {'df': df_final, **info}
             
             st.success(f"✅ {scenario_name} ολοκληρώθηκε")
             st.write(f"**Τελικό Score:** {final_score['total_score']}")
@@ -551,6 +575,76 @@ def run_steps_5_6_7(step4_results):
     
     return final_results
 
+def run_full_pipeline(df):
+    """Εκτέλεση Βημάτων 1-7 σε ένα πέρασμα (headless Pipeline, χωρίς ενδιάμεσα DataFrames)"""
+    st.subheader("⚡ Βήματα 1-7: Εκτέλεση σε ένα πέρασμα")
+    
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def on_progress(stage, fraction, message):
+        progress_bar.progress(int(fraction * 100))
+        status_text.text(f"{stage}: {message}")
+    
+    try:
+        result = Pipeline(PipelineConfig(num_classes=2), progress=on_progress, cache=get_stage_cache()).run(df)
+        final_results = result.to_app_results()
+        
+        for stage, stage_result in result.stages.items():
+            for scenario_name, message in stage_result.errors:
+                st.warning(f"⚠️ {stage} / {scenario_name}: {message}")
+        
+        st.success(f"✅ Ολοκληρώθηκαν {len(final_results)} σενάρια — καλύτερο: {result.best}")
+        st.json({stage: round(sec, 2) for stage, sec in result.timings.items()})
+        return final_results
+        
+    except Exception as e:
+        st.error(f"Σφάλμα στην εκτέλεση του pipeline: {e}")
+        st.code(traceback.format_exc())
+        return None
+
+def attach_job(job_id):
+    """Σύνδεση του session με εργασία παρασκηνίου (νέα ή υπάρχουσα, με βάση το job_id)"""
+    st.session_state.job_id = job_id
+    st.session_state.job_events = []
+    st.session_state.job_offset = 0
+    if hasattr(st, "query_params"):
+        st.query_params["job"] = job_id
+
+def display_background_job(job_id):
+    """Κατάσταση/πρόοδος εργασίας παρασκηνίου. Επιστρέφει True όσο η εργασία είναι ενεργή."""
+    runner = get_job_runner()
+    job = runner.status(job_id)
+    if job is None:
+        st.warning(f"⚠️ Δεν βρέθηκε εργασία {job_id}")
+        return False
+    
+    events, st.session_state.job_offset = runner.events(job_id, st.session_state.job_offset)
+    st.session_state.job_events.extend(events)
+    last = st.session_state.job_events[-1] if st.session_state.job_events else None
+    
+    st.subheader(f"🧵 Εργασία παρασκηνίου: {job_id}")
+    st.write(f"**Κατάσταση:** {job['status']}" + (f" — {job['label']}" if job.get('label') else ""))
+    st.progress(int((last['fraction'] if last else 0) * 100))
+    if last:
+        st.caption(f"{last['stage']}: {last['message']} ({last['t']}s)")
+    
+    with st.expander("📜 Events"):
+        st.dataframe(pd.DataFrame(st.session_state.job_events), use_container_width=True)
+    
+    if job['status'] == 'failed':
+        st.error(f"Σφάλμα στην εργασία: {job.get('error')}")
+        if job.get('traceback'):
+            st.code(job['traceback'])
+    elif job['status'] == 'done' and st.session_state.get('job_loaded') != job_id:
+        result = runner.result(job_id)
+        st.session_state.step_results['final'] = result.to_app_results()
+        st.session_state.job_loaded = job_id
+        st.session_state.current_step = 6
+        st.success(f"✅ Ολοκληρώθηκε σε {job.get('seconds')}s — καλύτερο: {result.best}")
+    
+    return job['status'] in ('queued', 'running')
+
 def display_final_results(final_results):
     """Εμφάνιση τελικών αποτελεσμάτων"""
     st.subheader("🏆 Τελικά Αποτελέσματα")
@@ -604,59 +698,35 @@ def display_final_results(final_results):
     
     return comparison_df
 
+def display_profiling(report):
+    """Panel «Profiling»: χρόνοι ανά βήμα (spans) και μετρητές (κόμβοι, prunes, υποψήφιοι, αντίγραφα DataFrame)"""
+    st.subheader("📈 Profiling")
+    if not report or not report.get("spans"):
+        st.info("Δεν υπάρχουν ακόμη μετρήσεις για αυτή την εκτέλεση.")
+        return
+    spans_df, counters_df = report_frame(report)
+    st.metric("Συνολικός χρόνος (s)", round(report.get("wall_seconds", 0.0), 2))
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Χρόνοι (spans)**")
+        st.dataframe(spans_df, use_container_width=True)
+    with col2:
+        st.write("**Μετρητές**")
+        st.dataframe(counters_df, use_container_width=True)
+    top = spans_df[spans_df["span"].str.count("/") == spans_df["span"].str.count("/").max()]
+    if not top.empty:
+        st.bar_chart(top.set_index("span")["seconds"])
+
 def create_download_package(final_results):
-    """Δημιουργία πακέτου download"""
-    zip_buffer = io.BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for scenario_name, result in final_results.items():
-            # DataFrame σε Excel
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                # Κύρια δεδομένα
-                result['df'].to_excel(writer, sheet_name='Αποτελέσματα', index=False)
-                
-                # Στατιστικά
-                try:
-                    df_assigned = result['df'][result['df'][result['final_column']].notna()].copy()
-                    df_assigned['ΤΜΗΜΑ'] = df_assigned[result['final_column']]
-                    stats_df = generate_statistics_table(df_assigned)
-                    stats_df.to_excel(writer, sheet_name='Στατιστικά', index=True)
-                except Exception as e:
-                    print(f"Σφάλμα στα στατιστικά {scenario_name}: {e}")
-                
-                # Μετρικές
-                if 'final_score' in result:
-                    metrics_df = pd.DataFrame([result['final_score']])
-                    metrics_df.to_excel(writer, sheet_name='Μετρικές', index=False)
-            
-            zip_file.writestr(
-                f"{scenario_name}_Πλήρη_Αποτελέσματα.xlsx",
-                excel_buffer.getvalue()
-            )
-        
-        # Συνολικός πίνακας σύγκρισης
-        summary_buffer = io.BytesIO()
-        comparison_data = []
-        for name, result in final_results.items():
-            if 'final_score' in result:
-                score = result['final_score']
-                comparison_data.append({
-                    'Σενάριο': name,
-                    'Συνολικό Score': score['total_score'],
-                    'Διαφορά Πληθυσμού': score['diff_population'],
-                    'Διαφορά Φύλου': score['diff_gender'],
-                    'Διαφορά Γνώσης': score['diff_greek'],
-                    'Σπασμένες Φιλίες': score['broken_friendships']
-                })
-        
-        if comparison_data:
-            summary_df = pd.DataFrame(comparison_data)
-            with pd.ExcelWriter(summary_buffer, engine='openpyxl') as writer:
-                summary_df.to_excel(writer, sheet_name='Σύγκριση_Σεναρίων', index=False)
-            zip_file.writestr("ΣΥΝΟΨΗ_Σύγκριση_Σεναρίων.xlsx", summary_buffer.getvalue())
-    
-    return zip_buffer.getvalue()
+    """
+    Δημιουργία πακέτου download (streaming xlsxwriter + zip σε spooled temp file).
+    Το st.download_button δέχεται μόνο bytes/str/reader και κρατά ΟΛΟ το payload στη μνήμη
+    (media file manager) όπως κι αν δοθεί, άρα ένα τελικό αντίγραφο του zip είναι αναπόφευκτο.
+    Το spool φράσσει μόνο τη μνήμη κατά τη δημιουργία (όχι xlsx + zip μαζί)· εδώ διαβάζεται
+    μία φορά και κλείνει αμέσως, ώστε να μη μένουν δύο αντίγραφα.
+    """
+    with stream_download_package(final_results) as spool:
+        return spool.read()
 
 def main():
     """Κύρια συνάρτηση εφαρμογής"""
@@ -692,7 +762,7 @@ def main():
             # Βήμα 1
             if st.sidebar.button("▶️ Εκτέλεση Βήματος 1", disabled=st.session_state.current_step > 1):
                 with st.spinner("Εκτέλεση Βήματος 1..."):
-                    result = run_step1(st.session_state.data)
+                    result = run_profiled("step1", run_step1, st.session_state.data)
                     if result:
                         st.session_state.step_results['step1'] = result
                         st.session_state.current_step = 2
@@ -701,7 +771,7 @@ def main():
             if st.sidebar.button("▶️ Εκτέλεση Βήματος 2", disabled=st.session_state.current_step != 2):
                 if 'step1' in st.session_state.step_results:
                     with st.spinner("Εκτέλεση Βήματος 2..."):
-                        result = run_step2(st.session_state.step_results['step1'])
+                        result = run_profiled("step2", run_step2, st.session_state.step_results['step1'])
                         if result:
                             st.session_state.step_results['step2'] = result
                             st.session_state.current_step = 3
@@ -710,7 +780,7 @@ def main():
             if st.sidebar.button("▶️ Εκτέλεση Βήματος 3", disabled=st.session_state.current_step != 3):
                 if 'step2' in st.session_state.step_results:
                     with st.spinner("Εκτέλεση Βήματος 3..."):
-                        result = run_step3(st.session_state.step_results['step2'])
+                        result = run_profiled("step3", run_step3, st.session_state.step_results['step2'])
                         if result:
                             st.session_state.step_results['step3'] = result
                             st.session_state.current_step = 4
@@ -719,7 +789,7 @@ def main():
             if st.sidebar.button("▶️ Εκτέλεση Βήματος 4", disabled=st.session_state.current_step != 4):
                 if 'step3' in st.session_state.step_results:
                     with st.spinner("Εκτέλεση Βήματος 4..."):
-                        result = run_step4(st.session_state.step_results['step3'])
+                        result = run_profiled("step4", run_step4, st.session_state.step_results['step3'])
                         if result:
                             st.session_state.step_results['step4'] = result
                             st.session_state.current_step = 5
@@ -728,11 +798,36 @@ def main():
             if st.sidebar.button("▶️ Εκτέλεση Βημάτων 5-7", disabled=st.session_state.current_step != 5):
                 if 'step4' in st.session_state.step_results:
                     with st.spinner("Εκτέλεση Βημάτων 5-7..."):
-                        result = run_steps_5_6_7(st.session_state.step_results['step4'])
+                        result = run_profiled("steps_5_6_7", run_steps_5_6_7, st.session_state.step_results['step4'])
                         if result:
                             st.session_state.step_results['final'] = result
                             st.session_state.current_step = 6
             
+            # Όλα τα βήματα μαζί
+            if st.sidebar.button("⚡ Εκτέλεση Όλων (1-7)", disabled=st.session_state.current_step != 1):
+                with st.spinner("Εκτέλεση Βημάτων 1-7..."):
+                    result = run_full_pipeline(st.session_state.data)
+                    if result:
+                        st.session_state.step_results['final'] = result
+                        st.session_state.current_step = 6
+            
+            # Εκτέλεση στο παρασκήνιο (επιβιώνει σε reruns/επανασύνδεση)
+            st.sidebar.subheader("🧵 Παρασκήνιο")
+            if st.sidebar.button("🧵 Εκτέλεση Όλων στο παρασκήνιο", disabled=st.session_state.current_step != 1):
+                attach_job(get_job_runner().submit(
+                    st.session_state.data, PipelineConfig(num_classes=2), label=uploaded_file.name
+                ))
+            other_job = st.sidebar.text_input("Job ID", value=st.session_state.job_id or "")
+            if other_job and other_job != st.session_state.job_id:
+                attach_job(other_job)
+            auto_refresh = st.sidebar.checkbox("Αυτόματη ανανέωση", value=True)
+            
+            job_active = False
+            if st.session_state.job_id:
+                job_active = display_background_job(st.session_state.job_id)
+                if job_active and not auto_refresh and st.button("🔄 Ανανέωση"):
+                    st.rerun()
+            
             # Εμφάνιση τελικών αποτελεσμάτων
             if 'final' in st.session_state.step_results:
                 comparison_df = display_final_results(st.session_state.step_results['final'])
@@ -749,10 +844,23 @@ def main():
                             mime="application/zip"
                         )
             
+            # Profiling: report του Pipeline (ή της εργασίας παρασκηνίου), αλλιώς των βημάτων ένα-ένα
+            if st.sidebar.checkbox("📈 Profiling", value=False):
+                final = st.session_state.step_results.get('final') or {}
+                report = next((r.get('profile') for r in final.values() if r.get('profile')), None)
+                display_profiling(report or st.session_state.profiler.report())
+            
             # Reset
             if st.sidebar.button("🔄 Επαναφορά"):
                 st.session_state.clear()
+                if hasattr(st, "query_params"):
+                    st.query_params.clear()
                 st.rerun()  # Χρήση st.rerun() αντί για st.experimental_rerun()
+            
+            # Polling: η εργασία τρέχει σε άλλη διεργασία, εδώ απλώς ξαναδιαβάζουμε τον δίσκο
+            if job_active and auto_refresh:
+                time.sleep(1.5)
+                st.rerun()
     
     else:
         st.info("👆 Παρακαλώ ανεβάστε ένα αρχείο Excel ή CSV για να ξεκινήσετε")
@@ -24,6 +24,9 @@ try:
     from step_7_final_score_FIXED_PATCHED import score_one_scenario_auto, pick_best_scenario
     from friendship_filters_fixed import filter_scenarios_fixed
     from statistics_generator import generate_statistics_table, export_statistics_to_excel
+    from steps_export import create_steps_excel_download_ui
+    from roster_cache import load_roster_cached
+    from roster_normalize import normalize_roster
 except ImportError as e:
     st.error(f"Σφάλμα εισαγωγής modules: {e}")
     st.error("Βεβαιωθείτε ότι όλα τα αρχεία .py είναι στον ίδιο φάκελο.")
@@ -47,47 +50,23 @@ def init_session_state():
         st.session_state.current_step = 1
 
 def load_data(uploaded_file):
-    """Φόρτωση και κανονικοποίηση δεδομένων"""
+    """Φόρτωση και κανονικοποίηση δεδομένων (cache με κλειδί το SHA-256 του αρχείου)"""
     try:
-        if uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
+        if not uploaded_file.name.endswith(('.xlsx', '.csv')):
             st.error("Υποστηρίζονται μόνο αρχεία .xlsx και .csv")
             return None
         
-        # Κανονικοποίηση στηλών
-        rename_map = {}
-        for col in df.columns:
-            col_str = str(col).strip().upper()
-            if any(x in col_str for x in ['ΟΝΟΜΑ', 'NAME', 'ΜΑΘΗΤΗΣ']):
-                rename_map[col] = 'ΟΝΟΜΑ'
-            elif any(x in col_str for x in ['ΦΥΛΟ', 'GENDER']):
-                rename_map[col] = 'ΦΥΛΟ'
-            elif 'ΓΝΩΣΗ' in col_str and 'ΕΛΛΗΝΙΚ' in col_str:
-                rename_map[col] = 'ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ'
-            elif 'ΠΑΙΔΙ' in col_str and 'ΕΚΠΑΙΔΕΥΤΙΚ' in col_str:
-                rename_map[col] = 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ'
-            elif 'ΦΙΛΟΙ' in col_str or 'FRIEND' in col_str:
-                rename_map[col] = 'ΦΙΛΟΙ'
-        
-        if rename_map:
-            df = df.rename(columns=rename_map)
-        
-        # Κανονικοποίηση τιμών
-        if 'ΦΥΛΟ' in df.columns:
-            df['ΦΥΛΟ'] = df['ΦΥΛΟ'].astype(str).str.upper().map({'Α':'Α', 'Κ':'Κ', 'ΑΓΟΡΙ':'Α', 'ΚΟΡΙΤΣΙ':'Κ'}).fillna('Α')
-        
-        for col in ['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ', 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ']:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.upper().map({'ΝΑΙ':'Ν', 'ΟΧΙ':'Ο', 'YES':'Ν', 'NO':'Ο', '1':'Ν', '0':'Ο'}).fillna('Ο')
-        
+        df = load_roster_cached(uploaded_file, _normalize_roster, namespace="streamlit_app_minimal")
         return df
     except Exception as e:
         st.error(f"Σφάλμα φόρτωσης αρχείου: {e}")
         return None
 
+def _normalize_roster(df):
+    """Κανονικοποίηση στηλών/τιμών ενός ρόστερ (εκτελείται μόνο σε cache miss)"""
+    # Άγνωστο/κενό φύλο → 'Α', όπως πριν
+    return normalize_roster(df, gender_default='Α')
+
 def display_data_summary(df):
     """Εμφάνιση περίληψης δεδομένων"""
     st.subheader("📊 Περίληψη Δεδομένων")
@@ -253,7 +232,6 @@ def run_all_steps(step1_results):
             progress_bar.progress(30)
             
             from step_3_helpers_FIXED import apply_step3_on_sheet
-from steps_export import create_steps_excel_download_ui
 
             df, step3_metrics = apply_step3_on_sheet(df, step2_col, num_classes=2)
             step3_col = step2_col.replace('ΒΗΜΑ2', 'ΒΗΜΑ3')
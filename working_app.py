@@ -11,6 +11,9 @@ import io
 from typing import Dict, List, Tuple, Any
 import traceback
 
+from roster_cache import load_roster_cached
+from roster_normalize import FLAG_COLS, normalize_roster, resolve_columns
+
 # Import των modules που χρειάζονται
 try:
     from statistics_generator import generate_statistics_table, export_statistics_to_excel
@@ -36,85 +39,35 @@ def init_session_state():
         st.session_state.results = {}
 
 def safe_load_data(uploaded_file):
-    """Ασφαλής φόρτωση και κανονικοποίηση δεδομένων"""
+    """Ασφαλής φόρτωση και κανονικοποίηση δεδομένων (cache με κλειδί το SHA-256 του αρχείου)"""
     try:
-        if uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
+        if not uploaded_file.name.endswith(('.xlsx', '.csv')):
             return None, "Μη υποστηριζόμενο format αρχείου"
         
-        # Debug: Εμφάνιση αρχικών στηλών
-        st.write("**DEBUG - Αρχικές στήλες:**", list(df.columns))
-        st.write("**DEBUG - Πρώτες 3 γραμμές:**")
-        st.dataframe(df.head(3))
-        
-        # Κανονικοποίηση στηλών με πιο επιθετική αναζήτηση
-        rename_map = {}
-        for col in df.columns:
-            col_str = str(col).strip().upper()
-            col_clean = col_str.replace(' ', '_').replace('-', '_')
-            
-            # Ονόματα
-            if any(x in col_clean for x in ['ΟΝΟΜΑ', 'ONOMA', 'NAME', 'ΜΑΘΗΤΗΣ', 'ΜΑΘΗΤΡΙΑ', 'STUDENT']):
-                rename_map[col] = 'ΟΝΟΜΑ'
-            # Φύλο    
-            elif any(x in col_clean for x in ['ΦΥΛΟ', 'FYLO', 'GENDER', 'SEX']):
-                rename_map[col] = 'ΦΥΛΟ'
-            # Γνώση Ελληνικών - περισσότερες παραλλαγές
-            elif any(pattern in col_clean for pattern in ['ΓΝΩΣΗ', 'ΓΝΩΣΕΙΣ', 'ΕΛΛΗΝΙΚ', 'ELLINIK', 'GREEK']):
-                rename_map[col] = 'ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ'
-            # Παιδιά εκπαιδευτικών - περισσότερες παραλλαγές  
-            elif any(pattern in col_clean for pattern in ['ΠΑΙΔΙ', 'PAIDI', 'ΕΚΠΑΙΔΕΥΤΙΚ', 'EKPEDEFTIK', 'TEACHER', 'ΔΑΣΚΑΛ']):
-                rename_map[col] = 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ'
-            # Φίλοι
-            elif any(x in col_clean for x in ['ΦΙΛΟΙ', 'FILOI', 'FRIEND']):
-                rename_map[col] = 'ΦΙΛΟΙ'
-            # Ζωηρότητα
-            elif any(x in col_clean for x in ['ΖΩΗΡ', 'ZOIR', 'ACTIVE', 'ENERGY']):
-                rename_map[col] = 'ΖΩΗΡΟΣ'
-            # Ιδιαιτερότητες
-            elif any(x in col_clean for x in ['ΙΔΙΑΙΤΕΡΟΤΗΤ', 'IDIETEROTIT', 'SPECIAL']):
-                rename_map[col] = 'ΙΔΙΑΙΤΕΡΟΤΗΤΑ'
-            # Συγκρούσεις
-            elif any(x in col_clean for x in ['ΣΥΓΚΡΟΥΣ', 'SYGKROUS', 'CONFLICT']):
-                rename_map[col] = 'ΣΥΓΚΡΟΥΣΗ'
-        
-        st.write("**DEBUG - Rename map:**", rename_map)
-        
-        if rename_map:
-            df = df.rename(columns=rename_map)
-            
-        st.write("**DEBUG - Μετά rename:**", list(df.columns))
-        
-        # Κανονικοποίηση τιμών με περισσότερες παραλλαγές
-        if 'ΦΥΛΟ' in df.columns:
-            # Κανονικοποίηση φύλου
-            df['ΦΥΛΟ'] = df['ΦΥΛΟ'].astype(str).str.strip().str.upper()
-            gender_map = {
-                'Α': 'Α', 'ΑΓΟΡΙ': 'Α', 'ΑΓΟΡΙΟΥ': 'Α', 'BOY': 'Α', 'MALE': 'Α', 'M': 'Α',
-                'Κ': 'Κ', 'ΚΟΡΙΤΣΙ': 'Κ', 'ΚΟΡΙΤΣΙΟΥ': 'Κ', 'GIRL': 'Κ', 'FEMALE': 'Κ', 'F': 'Κ'
-            }
-            df['ΦΥΛΟ'] = df['ΦΥΛΟ'].map(gender_map).fillna('Α')
-            st.write("**DEBUG - Φύλο unique values:**", df['ΦΥΛΟ'].unique())
-        
-        # Κανονικοποίηση boolean στηλών
-        bool_columns = ['ΚΑΛΗ_ΓΝΩΣΗ_ΕΛΛΗΝΙΚΩΝ', 'ΠΑΙΔΙ_ΕΚΠΑΙΔΕΥΤΙΚΟΥ', 'ΖΩΗΡΟΣ', 'ΙΔΙΑΙΤΕΡΟΤΗΤΑ']
-        for col in bool_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip().str.upper()
-                bool_map = {
-                    'Ν': 'Ν', 'ΝΑΙ': 'Ν', 'YES': 'Ν', 'Y': 'Ν', '1': 'Ν', 'TRUE': 'Ν', 'T': 'Ν',
-                    'Ο': 'Ο', 'ΟΧΙ': 'Ο', 'NO': 'Ο', 'N': 'Ο', '0': 'Ο', 'FALSE': 'Ο', 'F': 'Ο'
-                }
-                df[col] = df[col].map(bool_map).fillna('Ο')
-                st.write(f"**DEBUG - {col} unique values:**", df[col].unique())
-        
+        df = load_roster_cached(uploaded_file, _normalize_roster, namespace="working_app")
         return df, None
     except Exception as e:
         return None, f"Σφάλμα φόρτωσης: {str(e)}"
 
+def _normalize_roster(df):
+    """Κανονικοποίηση στηλών/τιμών (εκτελείται μόνο σε cache miss — τότε εμφανίζονται και τα DEBUG)"""
+    # Debug: Εμφάνιση αρχικών στηλών
+    st.write("**DEBUG - Αρχικές στήλες:**", list(df.columns))
+    st.write("**DEBUG - Πρώτες 3 γραμμές:**")
+    st.dataframe(df.head(3))
+    st.write("**DEBUG - Rename map:**", resolve_columns(tuple(df.columns)))
+    
+    # Άγνωστο/κενό φύλο → 'Α', όπως πριν
+    df = normalize_roster(df, gender_default='Α')
+    st.write("**DEBUG - Μετά rename:**", list(df.columns))
+    
+    if 'ΦΥΛΟ' in df.columns:
+        st.write("**DEBUG - Φύλο unique values:**", df['ΦΥΛΟ'].unique())
+    for col in FLAG_COLS:
+        st.write(f"**DEBUG - {col} unique values:**", df[col].unique())
+    
+    return df
+
 def display_basic_info(df):
     """Βασικές πληροφορίες με debug"""
     st.subheader("📊 Βασικές Πληροφορίες")
@@ -323,74 +276,6 @@ def run_simple_assignment(df):
         
         return df_result
         
-    except Exception as e:
-        st.error(f"Σφάλμα στην ανάθεση: {e}")
-        st.code(traceback.format_exc())
-        return None: Ανάθεση υπόλοιπων μαθητών...")
-        progress_bar.progress(40)
-        
-        # Βήμα 2: Υπόλοιποι μαθητές
-        status_text.text("Βήμα 2: Ανάθεση υπόλοιπων μαθητών...")
-        
-        remaining = df_result[df_result['ΤΜΗΜΑ'].isna()].index.tolist()
-        st.write(f"**DEBUG - Υπόλοιποι μαθητές:** {len(remaining)}")
-        
-        if 'ΦΥΛΟ' in df_result.columns:
-            # Διαχωρισμός ανά φύλο
-            boys = [idx for idx in remaining if df_result.loc[idx, 'ΦΥΛΟ'] == 'Α']
-            girls = [idx for idx in remaining if df_result.loc[idx, 'ΦΥΛΟ'] == 'Κ']
-            
-            st.write(f"**DEBUG - Αγόρια για ανάθεση:** {len(boys)}")
-            st.write(f"**DEBUG - Κορίτσια για ανάθεση:** {len(girls)}")
-            
-            # Κατανομή αγοριών
-            for i, idx in enumerate(boys):
-                current_a1_boys = len(df_result[(df_result['ΤΜΗΜΑ'] == 'Α1') & (df_result['ΦΥΛΟ'] == 'Α')])
-                current_a2_boys = len(df_result[(df_result['ΤΜΗΜΑ'] == 'Α2') & (df_result['ΦΥΛΟ'] == 'Α')])
-                
-                if current_a1_boys <= current_a2_boys:
-                    df_result.loc[idx, 'ΤΜΗΜΑ'] = 'Α1'
-                else:
-                    df_result.loc[idx, 'ΤΜΗΜΑ'] = 'Α2'
-            
-            progress_bar.progress(60)
-            
-            # Κατανομή κοριτσιών
-            for i, idx in enumerate(girls):
-                current_a1_girls = len(df_result[(df_result['ΤΜΗΜΑ'] == 'Α1') & (df_result['ΦΥΛΟ'] == 'Κ')])
-                current_a2_girls = len(df_result[(df_result['ΤΜΗΜΑ'] == 'Α2') & (df_result['ΦΥΛΟ'] == 'Κ')])
-                
-                if current_a1_girls <= current_a2_girls:
-                    df_result.loc[idx, 'ΤΜΗΜΑ'] = 'Α1'
-                else:
-                    df_result.loc[idx, 'ΤΜΗΜΑ'] = 'Α2'
-        else:
-            st.warning("⚠️ Δεν βρέθηκε στήλη ΦΥΛΟ - απλή εναλλακτική κατανομή")
-            # Απλή εναλλακτική κατανομή
-            for i, idx in enumerate(remaining):
-                tmima = 'Α1' if i % 2 == 0 else 'Α2'
-                df_result.loc[idx, 'ΤΜΗΜΑ'] = tmima
-        
-        progress_bar.progress(80)
-        
-        # Τελικοποίηση και έλεγχος
-        status_text.text("Τελικοποίηση...")
-        
-        # Έλεγχος αποτελεσμάτων
-        a1_count = len(df_result[df_result['ΤΜΗΜΑ'] == 'Α1'])
-        a2_count = len(df_result[df_result['ΤΜΗΜΑ'] == 'Α2'])
-        unassigned = len(df_result[df_result['ΤΜΗΜΑ'].isna()])
-        
-        st.write(f"**DEBUG - Τελικά αποτελέσματα:**")
-        st.write(f"- Α1: {a1_count} μαθητές")
-        st.write(f"- Α2: {a2_count} μαθητές") 
-        st.write(f"- Ατοποθέτητοι: {unassigned} μαθητές")
-        
-        progress_bar.progress(100)
-        status_text.text("✅ Ανάθεση ολοκληρώθηκε!")
-        
-        return df_result
-        
     except Exception as e:
         st.error(f"Σφάλμα στην ανάθεση: {e}")
         st.code(traceback.format_exc())